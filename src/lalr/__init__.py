@@ -1,11 +1,22 @@
+from lalr.actions import Actions
 from lalr.analysis import ParseTable
+from lalr.batch import parse_many
 from lalr.exceptions import ProductionSpecParseError
+from lalr.glr import parse_forest
 from lalr.grammar import Grammar, Left, Precedence, Production, Right
-from lalr.parsing import parse
+from lalr.incremental import IncrementalParser
+from lalr.parsing import Parser, parse, parse_async
+from lalr.persistent import PersistentParser
+from lalr.prefix import PrefixCache
+from lalr.recognizer import recognize
+from lalr.recovery import parse_with_recovery
+from lalr.streaming import iterparse
+from lalr.trees import parse_tree
 
 __version__ = "0.2.0"
 
 __all__ = [
+    "Actions",
     "ParseTable",
     "ProductionSpecParseError",
     "Grammar",
@@ -13,5 +24,16 @@ __all__ = [
     "Precedence",
     "Left",
     "Right",
+    "IncrementalParser",
+    "Parser",
+    "PersistentParser",
     "parse",
+    "parse_async",
+    "parse_many",
+    "parse_forest",
+    "parse_with_recovery",
+    "parse_tree",
+    "iterparse",
+    "recognize",
+    "PrefixCache",
 ]
@@ -0,0 +1,215 @@
+import functools
+
+from lalr.grammar import Production
+
+# Ways of computing the value for a reduction, as resolved for each
+# production by :meth:`Actions._resolve`.  Anything other than `_CALL` is
+# handled by the parser loop without calling any python code.
+_CALL = 0
+_KEEP_LAST = 1
+_CHILD = 2
+_MAKE_LIST = 3
+_APPEND = 4
+_DROP = 5
+
+
+class _Builtin(object):
+    """
+    A built-in handler, as returned by :func:`child`, :func:`make_list`,
+    :func:`append` and :func:`drop`.
+    """
+
+    __slots__ = ("kind", "indexes")
+
+    def __init__(self, kind, indexes):
+        self.kind = kind
+        self.indexes = indexes
+
+    def __call__(self, *values):
+        # Only used when a parser can not dispatch on the kind of handler
+        # itself, for example with compressed tables.
+        if self.kind == _CHILD:
+            return values[self.indexes[0]]
+        if self.kind == _MAKE_LIST:
+            if not self.indexes:
+                return list(values)
+            return [values[index] for index in self.indexes]
+        if self.kind == _APPEND:
+            result = values[self.indexes[0]]
+            result.append(values[self.indexes[1]])
+            return result
+        return None
+
+    def __reduce__(self):
+        return (type(self), (self.kind, self.indexes))
+
+    def __repr__(self):
+        name = {
+            _CHILD: "child",
+            _MAKE_LIST: "make_list",
+            _APPEND: "append",
+            _DROP: "drop",
+        }[self.kind]
+        return f"{name}({', '.join(str(index) for index in self.indexes)})"
+
+
+def child(index):
+    """
+    A handler that passes through the value of the symbol at `index` in the
+    production, for example the expression in `("(", "expr", ")")`.
+    Negative indexes count back from the end of the production.
+    """
+    return _Builtin(_CHILD, (index,))
+
+
+def make_list(*indexes):
+    """
+    A handler that returns a new list of the values of the symbols at
+    `indexes` in the production, or of every symbol if no indexes are given.
+    """
+    return _Builtin(_MAKE_LIST, indexes)
+
+
+def append(list_index=0, item_index=-1):
+    """
+    A handler that appends the value of the symbol at `item_index` to the
+    list at `list_index`, and returns the list.  The defaults suit left
+    recursive productions such as `("list", ",", "item")`.
+
+    The list is modified in place, so this should not be used with parsers
+    that share values between parses, such as
+    :class:`lalr.PersistentParser`.
+    """
+    return _Builtin(_APPEND, (list_index, item_index))
+
+
+def drop():
+    """
+    A handler that discards the values of all of the symbols in the
+    production, and returns `None`.
+    """
+    return _Builtin(_DROP, ())
+
+
+def _offset(index, length, production):
+    # Converts an index into the production into an offset from the top of
+    # the result stack.
+    if not -length <= index < length:
+        raise ValueError(f"index {index} out of range for {production}")
+    if index >= 0:
+        index -= length
+    return index
+
+
+class Actions(object):
+    """
+    A registry of handlers for reductions, that can be passed to
+    :func:`lalr.parse` and friends in place of a single `action` callable.
+
+    Handlers are registered for individual productions, or for every
+    production of a non-terminal, and are called with the values of the
+    symbols in the production.  Handlers for productions take precedence
+    over handlers for non-terminals.  Productions with no handler fall back
+    to `default`, which is called with the production followed by the
+    values, like a regular action.
+
+    Handlers are resolved into a list indexed by production number the first
+    time that the registry is used with a parse table.  The plain parser loop
+    uses this list directly, and computes the values for the built-in
+    handlers returned by :func:`child`, :func:`make_list`, :func:`append`
+    and :func:`drop` without calling any python code.  Other parsers call the
+    registry like any other action.
+    """
+
+    def __init__(self, default=None):
+        self._default = default
+        self._production_handlers = {}
+        self._nonterminal_handlers = {}
+
+        # The tables that handlers were last resolved for, and the result.
+        self._resolved_tables = None
+        self._resolved = None
+
+    def on_production(self, production, handler):
+        """
+        Registers a handler for a single production.
+        """
+        if not isinstance(production, Production):
+            raise TypeError(
+                f"expected Production, but got {type(production).__name__}"
+            )
+        self._production_handlers[production] = handler
+        self._resolved_tables = self._resolved = None
+
+    def on_nonterminal(self, name, handler):
+        """
+        Registers a handler for every production of a non-terminal.
+        """
+        self._nonterminal_handlers[name] = handler
+        self._resolved_tables = self._resolved = None
+
+    def _handler(self, production):
+        handler = self._production_handlers.get(production)
+        if handler is None:
+            handler = self._nonterminal_handlers.get(production.name)
+        if handler is None:
+            if self._default is None:
+                raise ValueError(f"no handler for {production}")
+            handler = functools.partial(self._default, production)
+        return handler
+
+    def _resolve(self, tables):
+        """
+        Returns a tuple of three lists, indexed by production number, of the
+        kind of each handler, the callable for handlers that must be called,
+        and the stack offsets used by built-in handlers.  Production zero is
+        never reduced, so its entries are placeholders.
+        """
+        if self._resolved_tables is tables:
+            return self._resolved
+
+        kinds = [_DROP]
+        handlers = [None]
+        offsets = [None]
+
+        for production in tables.productions[1:]:
+            handler = self._handler(production)
+            length = len(production)
+
+            if not isinstance(handler, _Builtin):
+                kinds.append(_CALL)
+                handlers.append(handler)
+                offsets.append(None)
+                continue
+
+            if handler.kind == _MAKE_LIST and not handler.indexes:
+                indexes = range(length)
+            else:
+                indexes = handler.indexes
+            production_offsets = tuple(
+                _offset(index, length, production) for index in indexes
+            )
+
+            kind = handler.kind
+            if kind == _CHILD and production_offsets == (-1,):
+                # The value is already on the top of the stack.
+                kind = _KEEP_LAST
+
+            kinds.append(kind)
+            handlers.append(None)
+            offsets.append(
+                production_offsets[0] if kind == _CHILD else production_offsets
+            )
+
+        self._resolved = kinds, handlers, offsets
+        self._resolved_tables = tables
+        return self._resolved
+
+    def __call__(self, production, *values):
+        return self._handler(production)(*values)
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_resolved_tables"] = None
+        state["_resolved"] = None
+        return state
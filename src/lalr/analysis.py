@@ -1,9 +1,19 @@
+import io
+from array import array
 from types import MappingProxyType
 
-from lalr.constants import EOF, START
-from lalr.exceptions import ReduceReduceConflictError, ShiftReduceConflictError
+from lalr import shared
+from lalr.cache import DEFAULT_MAX_SIZE, TableCache, fingerprint
+from lalr.compression import compress
+from lalr.constants import EOF, ERROR, START
+from lalr.exceptions import (
+    ReduceReduceConflictError,
+    ShiftReduceConflictError,
+    TableFormatError,
+)
 from lalr.grammar import Associativity, Production
-from lalr.utils import Queue
+from lalr.tables import CompiledTables
+from lalr.utils import Queue, iter_bits
 
 
 class _Item(object):
@@ -71,7 +81,7 @@ class _Item(object):
         The set of terminal symbols that can come next if the string matches
         this production.
         """
-        return set(self._follow_set)
+        return self._follow_set
 
     def __eq__(self, other):
         if not isinstance(other, self.__class__):
@@ -104,183 +114,450 @@ class _Item(object):
         )
 
 
-class _ItemSet(object):
-    def __init__(self, kernel, derived):
-        self._kernel = frozenset(kernel)
-        self._derived = frozenset(derived)
+# Sentinel used in place of the next symbol for items with the cursor at the
+# end of their production.
+_END = object()
 
-    @property
-    def kernel(self):
-        return set(self._kernel)
+# The synthetic start production is always the first production in an item
+# table, so the item with the cursor at its beginning is always item zero, and
+# the accepting item is always item one.
+_START_ITEM = 0
+_ACCEPT_ITEM = 1
 
-    @property
-    def derived(self):
-        return set(self._derived)
 
-    @property
-    def items(self):
-        return set.union(
-            self.kernel,
-            self.derived,
-        )
+class _ItemTable(object):
+    """
+    Interns every item of every production in a grammar as a dense integer.
 
-    def __iter__(self):
-        return iter(self.items)
+    Productions are numbered, with the synthetic start production first, and
+    the items of each production are numbered consecutively with the cursor
+    at the beginning first.  This means that advancing the cursor of an item
+    is just a matter of adding one.
+    """
 
-    def __eq__(self, other):
-        return self.kernel == other.kernel
+    __slots__ = (
+        "grammar",
+        "productions",
+        "item_productions",
+        "item_cursors",
+        "item_symbols",
+        "derivations",
+        "_closures",
+        "_derived_items",
+        "_derived_successors",
+    )
+
+    def __init__(self, grammar, start_production):
+        self.grammar = grammar
+        self.productions = (start_production, *grammar.indexed_productions())
+
+        # Parallel lists, indexed by item, of the index of the production the
+        # item belongs to, the position of the cursor in that production, and
+        # the symbol immediately after the cursor.
+        self.item_productions = []
+        self.item_cursors = []
+        self.item_symbols = []
 
+        # A map from non-terminals to tuples of the items with the cursor at
+        # the beginning of each of the non-terminal's productions.
+        derivations = {}
+
+        for production_index, production in enumerate(self.productions):
+            derivations.setdefault(production.name, []).append(
+                len(self.item_symbols)
+            )
+            for cursor in range(len(production) + 1):
+                self.item_productions.append(production_index)
+                self.item_cursors.append(cursor)
+                self.item_symbols.append(
+                    production[cursor] if cursor < len(production) else _END
+                )
+
+        self.derivations = {
+            name: tuple(items) for name, items in derivations.items()
+        }
 
-def _build_derived_items(grammar, kernel):
+        # Caches of the results of calls to `closure`, `derived_items` and
+        # `derived_successors`.
+        self._closures = {}
+        self._derived_items = {}
+        self._derived_successors = {}
+
+    def production(self, item):
+        return self.productions[self.item_productions[item]]
+
+    def closure(self, symbol):
+        """
+        Returns a tuple of all of the items, with the cursor at the beginning,
+        that will be added to the closure of any item set containing an item
+        that expects the given non-terminal.
+
+        This depends only on the grammar, so it is computed once for each
+        non-terminal and then cached.
+        """
+        closure = self._closures.get(symbol)
+        if closure is None:
+            closure = []
+
+            symbol_queue = Queue([symbol])
+            for symbol_ in symbol_queue:
+                for item in self.derivations[symbol_]:
+                    closure.append(item)
+                    if self.item_symbols[item] in self.derivations:
+                        symbol_queue.add(self.item_symbols[item])
+
+            closure = tuple(closure)
+            self._closures[symbol] = closure
+        return closure
+
+    def expected_nonterminals(self, kernel):
+        """
+        Returns a tuple of the distinct non-terminals expected by the items in
+        a kernel, in order of first appearance.
+        """
+        return tuple(
+            dict.fromkeys(
+                self.item_symbols[item]
+                for item in kernel
+                if self.item_symbols[item] in self.derivations
+            )
+        )
+
+    def derived_items(self, symbols):
+        """
+        Returns a tuple of all of the items that will be added to the closure
+        of an item set containing items that expect each of the given
+        non-terminals.  Combinations of non-terminals tend to recur across item
+        sets, so the merged closures are cached as well.
+        """
+        if len(symbols) == 1:
+            return self.closure(symbols[0])
+
+        derived = self._derived_items.get(symbols)
+        if derived is None:
+            derived = {}
+            for symbol in symbols:
+                derived.update(dict.fromkeys(self.closure(symbol)))
+            derived = tuple(derived)
+            self._derived_items[symbols] = derived
+        return derived
+
+    def derived_successors(self, symbols):
+        """
+        Groups the items returned by :meth:`derived_items` by the symbol they
+        expect, and returns a dictionary mapping from each symbol to a tuple
+        of the same items with their cursors advanced past it.
+        """
+        successors = self._derived_successors.get(symbols)
+        if successors is None:
+            successors = {}
+            for item in self.derived_items(symbols):
+                successors.setdefault(self.item_symbols[item], []).append(
+                    item + 1
+                )
+            successors = {
+                symbol: tuple(items) for symbol, items in successors.items()
+            }
+            self._derived_successors[symbols] = successors
+        return successors
+
+
+def _build_closure(table, kernel):
     """
-    Given a core set of items and a grammar, recursively expand non-terminals
-     into new items until there are no non-terminals left.
+    Returns the LR(0) closure of a kernel as a tuple of items.
+
+    Items in the kernel come first, followed by an item, with the cursor at the
+    beginning, for every production that can be reached by repeatedly
+    expanding the first expected symbol of another item.
 
-    :param grammar:
-        A grammar, obviously.
+    :param table:
+        The :class:`_ItemTable` that the items were taken from.
 
     :param kernel:
-        A :class:`set` of :class:`Item`s that make up the kernel of an item
-        set.
+        An iterable of items.
     """
     # We assume that (with the exception of the starting symbol which we can't
     # reach from any other rule), the cursor will never appear at the beginning
     # of an item in a kernel.  This means that items in the kernel will not
     # also be in the derived set.
+    #
+    # The derived items depend only on which non-terminals are expected by the
+    # kernel, and are cached by the item table.
+    return (*kernel, *table.derived_items(table.expected_nonterminals(kernel)))
+
+
+class _ItemSet(object):
+    """
+    A view of a single state in the LR(0) automaton, annotated with LALR(1)
+    lookaheads.
+
+    Only the kernel is stored, as a sorted tuple of items and a matching list
+    of lookahead bitmasks.  Derived items are recomputed when requested, and
+    take their lookaheads from the follow sets of the non-terminal transitions
+    out of the state.  :class:`_Item` objects are only created for
+    inspection.
+    """
 
-    # A map from symbols to sets of terminals that can follow them.  This is
-    # used at the end when transforming productions to items
-    follow_sets = {}
+    __slots__ = ("table", "kernel_items", "kernel_lookaheads", "follow_sets")
 
-    # Queue of symbols that should be processed into items
-    symbol_queue = Queue()
+    def __init__(self, table, kernel_items, kernel_lookaheads, follow_sets):
+        self.table = table
+        self.kernel_items = kernel_items
+        self.kernel_lookaheads = kernel_lookaheads
+        self.follow_sets = follow_sets
 
-    for item in kernel:
-        if not item.expected:
-            continue
+    def _item(self, item, lookahead):
+        return _Item(
+            self.table.production(item),
+            self.table.item_cursors[item],
+            self.table.grammar.masked_terminals(lookahead),
+        )
 
-        symbol, *rest = item.expected
+    @property
+    def kernel(self):
+        return frozenset(
+            self._item(item, lookahead)
+            for item, lookahead in zip(
+                self.kernel_items, self.kernel_lookaheads
+            )
+        )
 
-        if grammar.is_terminal(symbol):
-            continue
+    @property
+    def derived(self):
+        closure = _build_closure(self.table, self.kernel_items)
+        return frozenset(
+            self._item(
+                item, self.follow_sets[self.table.production(item).name]
+            )
+            for item in closure[len(self.kernel_items) :]
+        )
 
-        # Add new non-terminals to the follow set
-        follow_set = follow_sets.setdefault(symbol, set())
+    @property
+    def items(self):
+        return frozenset.union(self.kernel, self.derived)
 
-        if rest:
-            follow_set.update(grammar.first_set(rest[0]))
-        else:
-            follow_set.update(item.follow_set)
+    def __iter__(self):
+        return iter(self.items)
 
-        # Queue for processing
-        symbol_queue.add(symbol)
+    def __eq__(self, other):
+        return self.kernel == other.kernel
 
-    productions = set()
 
-    immediate_dependants = {}
+def _build_lr0_automaton(table):
+    """
+    Builds the canonical LR(0) collection of item sets for a grammar.
 
-    # Expand set of derived productions
-    for symbol in symbol_queue:
-        for production in grammar.productions(symbol):
-            productions.add(production)
+    Returns a list of kernels, and a list of dictionaries mapping from symbols
+    to the indexes of the states that they transition to.  Kernels are sorted
+    tuples of items, which can be compared and hashed cheaply, and state zero
+    is always the state containing the start item.
+    """
+    item_symbols = table.item_symbols
 
-            # Find the next symbol and the tuple of symbols following it.
-            # As the grammar should have been converted to epsilon free form,
-            # and the cursor will always be at the beginning, we can be sure
-            # that there will be at least one item and the check can be skipped
-            first, *rest = production.symbols
+    kernels = [(_START_ITEM,)]
+    states_by_kernel = {kernels[0]: 0}
+    transitions = []
 
-            if grammar.is_terminal(first):
+    state = 0
+    while state < len(kernels):
+        kernel = kernels[state]
+
+        # The successors of the derived items are cached by the item table, so
+        # only the kernel items need to be advanced here.
+        successors = {
+            symbol: list(items)
+            for symbol, items in table.derived_successors(
+                table.expected_nonterminals(kernel)
+            ).items()
+        }
+        for item in kernel:
+            symbol = item_symbols[item]
+            if symbol is _END:
                 continue
+            successors.setdefault(symbol, []).append(item + 1)
 
-            symbol_queue.add(first)
+        state_transitions = {}
+        for symbol, kernel in successors.items():
+            kernel = tuple(sorted(kernel))
+            if kernel not in states_by_kernel:
+                states_by_kernel[kernel] = len(kernels)
+                kernels.append(kernel)
+            state_transitions[symbol] = states_by_kernel[kernel]
 
-            # First we update the follow sets for each symbol.
-            # As cycles are possible we need to make sure that we update the
-            # follow sets of non-terminals that we have already expanded
-            if rest:
-                new_items = grammar.first_set(rest[0])
-            else:
-                new_items = follow_sets.get(production.name, set())
+        transitions.append(state_transitions)
+        state += 1
 
-                # Make sure that the first symbol gets updated when new items
-                # are added to the follow set of the current symbol
-                immediate_dependants.setdefault(production.name, set()).add(
-                    first
-                )
+    return kernels, transitions
 
-            follow_sets.setdefault(first, set()).update(new_items)
 
-            # The set of non-terminals that can be reduced to the current
-            # symbol, either directly or via some number of intermediate steps
-            dependants = set()
+def _digraph(relation, initial):
+    """
+    Computes the smallest function `F` such that `F(x)` is a superset of
+    `initial[x]`, and of `F(y)` for every `y` in `relation[x]`.
 
-            # We build up the set of dependants by iterating over the symbols
-            # that are a dependant of the first symbol, and recursively over
-            # their dependants, processing each symbol only once.
-            # The dependants queue keeps track of what has been done, and what
-            # needs to be done.
-            dependants_queue = Queue({first})
+    This is the digraph algorithm from DeRemer and Pennello's "Efficient
+    Computation of LALR(1) Look-Ahead Sets".  Strongly connected components are
+    collapsed as they are found, so each node and edge is visited only once.
+    The recursive traversal from the paper is unrolled to avoid hitting the
+    recursion limit on large grammars.
 
-            # Build the set
-            for dependant in dependants_queue:
-                if dependant not in immediate_dependants:
-                    continue
+    Nodes are identified by consecutive integers, starting from zero.
 
-                dependants_queue.update(immediate_dependants[dependant])
-                dependants.update(immediate_dependants[dependant])
+    :param relation:
+        A list, indexed by node, of lists of related nodes.
 
-            # Update the follow sets of all dependant symbols
-            for dependant in dependants:
-                follow_sets[dependant].update(new_items)
+    :param initial:
+        A list, indexed by node, of initial sets, represented as integer
+        bitmasks.
 
-    # Turn productions and follow sets into items
-    return {
-        _Item(production, cursor=0, follow_set=follow_sets[production.name])
-        for production in productions
-    }
+    :return:
+        A list, indexed by node, of bitmasks.
+    """
+    finished = len(initial) + 1
+    depths = [0] * len(initial)
+    result = list(initial)
+    stack = []
 
+    for root in range(len(initial)):
+        if depths[root]:
+            continue
 
-def _merge_kernels(kernel_a, kernel_b):
-    kernel_a_lookup = {
-        (item.production, item.cursor): item for item in kernel_a
-    }
+        stack.append(root)
+        depths[root] = len(stack)
+        work = [(root, len(stack), iter(relation[root]))]
 
-    kernel = []
-    for item_b in kernel_b:
-        item_a = kernel_a_lookup[(item_b.production, item_b.cursor)]
-        kernel.append(
-            _Item(
-                item_a.production,
-                item_a._cursor,
-                set.union(item_a.follow_set, item_b.follow_set),
-            )
-        )
+        while work:
+            node, depth, related = work[-1]
 
-    return frozenset(kernel)
+            for other in related:
+                if not depths[other]:
+                    stack.append(other)
+                    depths[other] = len(stack)
+                    work.append((other, len(stack), iter(relation[other])))
+                    break
 
+                depths[node] = min(depths[node], depths[other])
+                result[node] |= result[other]
 
-def _build_item_set(grammar, kernel):
-    return _ItemSet(kernel, _build_derived_items(grammar, kernel))
+            else:
+                work.pop()
 
+                if depths[node] == depth:
+                    # Node is the root of a strongly connected component.  All
+                    # members share the same result.
+                    while True:
+                        other = stack.pop()
+                        depths[other] = finished
+                        result[other] = result[node]
+                        if other == node:
+                            break
 
-def _item_set_transitions(grammar, item_set):
-    kernels = {}
+                if work:
+                    parent = work[-1][0]
+                    depths[parent] = min(depths[parent], depths[node])
+                    result[parent] |= result[node]
 
-    for item in item_set:
-        if not item.expected:
-            continue
+    return result
 
-        symbol, *rest = item.expected
 
-        kernel = kernels.setdefault(symbol, set())
-        kernel.add(_Item(item.production, item.cursor + 1, item.follow_set))
+def _build_lookaheads(table, kernels, transitions):
+    """
+    Computes LALR(1) lookaheads for an LR(0) automaton using the method
+    described by DeRemer and Pennello.
+
+    Returns a list, with one entry for each state, of lists of lookahead
+    bitmasks matching the items in the kernel of the state, and a list of
+    dictionaries mapping from the non-terminals that can be shifted in each
+    state to the bitmasks of the terminals that can follow them.  The latter
+    are the lookaheads of the derived items of each state.
+    """
+    grammar = table.grammar
+    item_symbols = table.item_symbols
+    derivations = table.derivations
+
+    # Every transition on a non-terminal symbol, identified by the state that
+    # the transition starts from and the symbol.  The relations below are
+    # indexed by the position of the transition in this list.
+    nonterminal_transitions = [
+        (state, symbol)
+        for state, state_transitions in enumerate(transitions)
+        for symbol in state_transitions
+        if grammar.is_nonterminal(symbol)
+    ]
+    transition_indexes = {
+        transition: index
+        for index, transition in enumerate(nonterminal_transitions)
+    }
 
-    return {symbol: frozenset(kernel) for symbol, kernel in kernels.items()}
+    # The terminals that can be shifted immediately after each non-terminal
+    # transition.  The only transition that can be followed by the end of the
+    # file is the transition from the start state on the target.
+    eof_mask = grammar.terminal_mask([EOF])
+    direct_reads = []
+    for state, symbol in nonterminal_transitions:
+        successor = transitions[state][symbol]
+        direct_read = grammar.terminal_mask(
+            terminal
+            for terminal in transitions[successor]
+            if not grammar.is_nonterminal(terminal)
+        )
+        if _ACCEPT_ITEM in kernels[successor]:
+            direct_read |= eof_mask
+        direct_reads.append(direct_read)
+
+    # As the grammar is epsilon free, no non-terminal transition can read the
+    # terminals read by another and the `reads` relation from the paper is
+    # always empty.  The read sets are therefore just the direct read sets.
+
+    # `(p, A)` includes `(p', B)` if there is a production `B -> b A`, and the
+    # parser will be in state `p` after reading `b` from `p'`.  Anything that
+    # can follow `B` from `p'` can then follow `A` from `p`.
+    includes = [[] for _ in nonterminal_transitions]
+    for index, (state, symbol) in enumerate(nonterminal_transitions):
+        for item in derivations[symbol]:
+            current = state
+            while item_symbols[item + 1] is not _END:
+                current = transitions[current][item_symbols[item]]
+                item += 1
+
+            if grammar.is_nonterminal(item_symbols[item]):
+                includes[
+                    transition_indexes[(current, item_symbols[item])]
+                ].append(index)
+
+    follow_sets = _digraph(includes, direct_reads)
+
+    # Finally we walk each production forward from every state in which it is
+    # expected, attaching the follow set of the non-terminal transition to
+    # every kernel item along the way.  The sets for the reduce items are the
+    # `lookback` sets from the paper.
+    lookaheads = {
+        (0, _START_ITEM): eof_mask,
+        (transitions[0][item_symbols[_START_ITEM]], _ACCEPT_ITEM): eof_mask,
+    }
+    for (state, symbol), follow_set in zip(
+        nonterminal_transitions, follow_sets
+    ):
+        for item in derivations[symbol]:
+            current = state
+            while item_symbols[item] is not _END:
+                current = transitions[current][item_symbols[item]]
+                item += 1
+                key = (current, item)
+                lookaheads[key] = lookaheads.get(key, 0) | follow_set
+
+    kernel_lookaheads = [
+        [lookaheads[(state, item)] for item in kernel]
+        for state, kernel in enumerate(kernels)
+    ]
 
+    state_follow_sets = [{} for _ in kernels]
+    for (state, symbol), follow_set in zip(
+        nonterminal_transitions, follow_sets
+    ):
+        state_follow_sets[state][symbol] = follow_set
 
-def _kernel_core(kernel):
-    return frozenset((item.production, item.cursor) for item in kernel)
+    return kernel_lookaheads, state_follow_sets
 
 
 def _build_transition_table(grammar, target):
@@ -288,61 +565,18 @@ def _build_transition_table(grammar, target):
     Build the item sets, and map out the corresponding transitions for a
     grammar that accepts the given target.
     """
-    starting_item = _Item(
-        Production(START, (target,)),
-        cursor=0,
-        follow_set={EOF},
-    )
-
-    # A list of item sets.  Item sets are identified by index.  We initialise
-    # it with a new item set with the start symbol as its kernel
-    item_sets = []
-
-    # A list, with items corresponding to the sets `item_sets`  of
-    # dictionaries mapping from symbols to item set indexes
-    transitions = []
+    table = _ItemTable(grammar, Production(START, (target,)))
 
-    kernel_queue = Queue([frozenset({starting_item})])
-
-    # A map from kernel cores, frozen sets of tuples of matched and expected
-    # strings without a follow set, to item set indexes.  This is used to do
-    # LALR state merging
-    # TODO does the starting item need to be put in this map?
-    item_sets_by_core = {}
-
-    for kernel in kernel_queue:
-        if _kernel_core(kernel) in item_sets_by_core:
-            item_set_index = item_sets_by_core[_kernel_core(kernel)]
-            kernel = _merge_kernels(item_sets[item_set_index].kernel, kernel)
-            item_set = _build_item_set(grammar, kernel)
-            item_sets[item_set_index] = item_set
-            transitions[item_set_index] = _item_set_transitions(
-                grammar, item_set
-            )
-        else:
-            item_set_index = len(item_sets)
-            item_set = _build_item_set(grammar, kernel)
-            item_sets_by_core[_kernel_core(kernel)] = item_set_index
-            item_sets.append(item_set)
-            transitions.append(_item_set_transitions(grammar, item_set))
-
-        # TODO items are queued in an order that is predictable in practice,
-        # but technically non-deterministic.  This should have no effect when
-        # building a parser for valid grammars, but may impact error messages
-        # and testing.  Sort explicitly by first appearance of each terminal
-        # to fix.
-        kernel_queue.update(
-            transitions[item_set_index][terminal]
-            for terminal in transitions[item_set_index]
-        )
+    kernels, transitions = _build_lr0_automaton(table)
+    kernel_lookaheads, follow_sets = _build_lookaheads(
+        table, kernels, transitions
+    )
 
-    transitions = [
-        {
-            symbol: item_sets_by_core[_kernel_core(kernel)]
-            for symbol, kernel in transition_map.items()
-        }
-        for transition_map in transitions
+    item_sets = [
+        _ItemSet(table, *state)
+        for state in zip(kernels, kernel_lookaheads, follow_sets)
     ]
+
     return item_sets, transitions
 
 
@@ -383,7 +617,9 @@ def _build_goto_table(grammar, item_sets, item_set_transitions):
     return gotos
 
 
-def _build_reduction_table(grammar, item_sets, item_set_transitions):
+def _build_reduction_table(
+    grammar, item_sets, item_set_transitions, conflicts=None
+):
     """
     Returns a list of dictionaries mapping from terminal symbols to reduce
     actions.
@@ -391,27 +627,51 @@ def _build_reduction_table(grammar, item_sets, item_set_transitions):
     Reduce actions are represented simply by a reference to a production.
     The items in the list of reduction dictionaries correspond to items in the
     list of item sets.
+
+    If a list is passed as `conflicts` then, rather than raising a
+    `ReduceReduceConflictError`, a dictionary is appended to it for each item
+    set mapping from terminal symbols to a list of the other productions that
+    could also be reduced.
     """
+    terminals = grammar.indexed_terminals()
+
     reductions = []
     for item_set in item_sets:
         item_set_reductions = {}
-        for item in item_set:
-            if item.expected:
+        item_set_conflicts = {}
+        reduced = 0
+
+        # Productions are never empty, so the cursor can only be at the end of
+        # a production for items in the kernel.
+        for item, lookahead in zip(
+            item_set.kernel_items, item_set.kernel_lookaheads
+        ):
+            if item_set.table.item_symbols[item] is not _END:
                 continue
 
-            for terminal in item.follow_set:
-                if terminal in item_set_reductions:
+            production = item_set.table.production(item)
+
+            overlap = reduced & lookahead
+            if overlap:
+                if conflicts is None:
                     raise ReduceReduceConflictError()
-                item_set_reductions[terminal] = item.production
+                for index in iter_bits(overlap):
+                    item_set_conflicts.setdefault(terminals[index], []).append(
+                        production
+                    )
+                lookahead &= ~overlap
+            reduced |= lookahead
+
+            for index in iter_bits(lookahead):
+                item_set_reductions[terminals[index]] = production
         reductions.append(item_set_reductions)
+        if conflicts is not None:
+            conflicts.append(item_set_conflicts)
     return reductions
 
 
 def _build_accept_table(grammar, item_sets, items_set_transitions):
-    return [
-        any(item.name == START and not item.expected for item in item_set)
-        for item_set in item_sets
-    ]
+    return [_ACCEPT_ITEM in item_set.kernel_items for item_set in item_sets]
 
 
 def _apply_precedence_rules(shifts, reductions, grammar):
@@ -461,6 +721,206 @@ def _check_shift_reduce_conflicts(shifts, reductions):
             raise ShiftReduceConflictError()
 
 
+def _eliminate_unit_reductions(
+    shifts, gotos, reductions, accepts, transparent, reduction_conflicts=None
+):
+    """
+    Shortcuts the transitions into states that do nothing but reduce by one
+    of the `transparent` unit productions, so that the parser goes straight
+    to the state that it would reach after the reduction.
+
+    A state that only reduces `A -> B` is only ever reached by a transition
+    on `B`, and, whatever the lookahead, is always left immediately by
+    popping back to the state that the transition started from and taking
+    its goto on `A`.  The transition on `B` can therefore be pointed at the
+    target of the goto on `A` instead.  Any error in the lookahead is
+    detected in the new state instead, still before the lookahead is
+    shifted.  The tables are updated in place.
+
+    Returns the set of productions that some reductions were skipped for.
+    """
+    # Maps from states that can be skipped to the production that they
+    # reduce by.
+    skipped = {}
+    for state, state_reductions in enumerate(reductions):
+        if shifts[state] or accepts[state] or not state_reductions:
+            continue
+        if reduction_conflicts is not None and reduction_conflicts[state]:
+            continue
+        productions = set(state_reductions.values())
+        if len(productions) != 1:
+            continue
+        (production,) = productions
+        if production in transparent:
+            skipped[state] = production
+
+    removed = set()
+
+    def _resolve(state, target):
+        # Follows chains of skipped states.  Cycles of unit productions can
+        # only come from a broken grammar, but shouldn't hang the build.
+        seen = set()
+        while target in skipped and target not in seen:
+            seen.add(target)
+            removed.add(skipped[target])
+            target = gotos[state][skipped[target].name]
+        return target
+
+    for state in range(len(shifts)):
+        for transitions in (shifts[state], gotos[state]):
+            for symbol, target in transitions.items():
+                transitions[symbol] = _resolve(state, target)
+
+    return removed
+
+
+def _compile_tables(
+    grammar,
+    target,
+    item_sets,
+    shifts,
+    reductions,
+    gotos,
+    accepts,
+    reduction_conflicts=None,
+    skipped_productions=(),
+):
+    """
+    Flattens the per-state shift, reduction, goto and accept dictionaries into
+    the integer coded tables that are read by the parser loop.  See
+    :class:`lalr.tables.CompiledTables` for a description of the encoding.
+
+    If `reduction_conflicts` is given, then shifts and reductions for the
+    same terminal, and the extra reductions that it lists, are kept in the
+    table of conflicts rather than being treated as an error.
+
+    `skipped_productions` are the productions that reductions were removed
+    for by :func:`_eliminate_unit_reductions`.
+    """
+    terminals = grammar.indexed_terminals()
+    terminal_ids = {
+        terminal: index for index, terminal in enumerate(terminals)
+    }
+
+    nonterminals = grammar.indexed_nonterminals()
+    nonterminal_ids = {
+        nonterminal: index for index, nonterminal in enumerate(nonterminals)
+    }
+
+    productions = (
+        Production(START, (target,)),
+        *grammar.indexed_productions(),
+    )
+    production_ids = {
+        production: index for index, production in enumerate(productions)
+    }
+
+    n_terminals = len(terminals)
+    n_nonterminals = len(nonterminals)
+
+    action_table = array("i", [0]) * (len(shifts) * n_terminals)
+    conflicts = {}
+    goto_table = array("i", [0]) * (len(gotos) * n_nonterminals)
+
+    for state, (state_shifts, state_reductions, state_accepts) in enumerate(
+        zip(shifts, reductions, accepts)
+    ):
+        offset = state * n_terminals
+        for terminal, production in state_reductions.items():
+            action_table[offset + terminal_ids[terminal]] = ~production_ids[
+                production
+            ]
+        for terminal, target_state in state_shifts.items():
+            action_table[offset + terminal_ids[terminal]] = target_state
+        if reduction_conflicts is not None:
+            state_conflicts = reduction_conflicts[state]
+            for terminal in set(state_conflicts).union(
+                set(state_shifts).intersection(state_reductions)
+            ):
+                actions = []
+                if terminal in state_shifts:
+                    actions.append(state_shifts[terminal])
+                if terminal in state_reductions:
+                    actions.append(~production_ids[state_reductions[terminal]])
+                actions.extend(
+                    ~production_ids[production]
+                    for production in state_conflicts.get(terminal, ())
+                )
+
+                cell = offset + terminal_ids[terminal]
+                if len(actions) == 1:
+                    action_table[cell] = actions[0]
+                else:
+                    action_table[cell] = 0
+                    conflicts[cell] = tuple(actions)
+        if state_accepts:
+            action_table[offset + terminal_ids[EOF]] = ~0
+
+    for state, state_gotos in enumerate(gotos):
+        offset = state * n_nonterminals
+        for nonterminal, target_state in state_gotos.items():
+            goto_table[offset + nonterminal_ids[nonterminal]] = target_state
+
+    # Symbols appearing immediately after the cursor in the kernel of each
+    # state, for use in error messages.
+    expected_offsets = array("i", [0])
+    expected_symbols = array("i")
+    for item_set in item_sets:
+        for item in item_set.kernel_items:
+            symbol = item_set.table.item_symbols[item]
+            if symbol is _END or symbol is ERROR:
+                continue
+            if symbol in terminal_ids:
+                symbol_id = terminal_ids[symbol]
+            else:
+                symbol_id = n_terminals + nonterminal_ids[symbol]
+            if symbol_id not in expected_symbols[expected_offsets[-1] :]:
+                expected_symbols.append(symbol_id)
+        expected_offsets.append(len(expected_symbols))
+
+    # The terminals, other than the end of file marker, that each state
+    # reduces on, for use in error messages.  The symbols expected after a
+    # reduction depend on the states further down the stack, so can't be
+    # computed in advance.
+    reducing_offsets = array("i", [0])
+    reducing_terminals = array("i")
+    for state in range(len(shifts)):
+        offset = state * n_terminals
+        for terminal in range(1, n_terminals):
+            if (
+                action_table[offset + terminal] < ~0
+                and terminals[terminal] is not ERROR
+            ):
+                reducing_terminals.append(terminal)
+        reducing_offsets.append(len(reducing_terminals))
+
+    return CompiledTables(
+        terminals=terminals,
+        nonterminals=nonterminals,
+        productions=productions,
+        production_lhs=array(
+            "i",
+            [
+                nonterminal_ids.get(production.name, -1)
+                for production in productions
+            ],
+        ),
+        production_lengths=array(
+            "i", [len(production) for production in productions]
+        ),
+        action_table=action_table,
+        goto_table=goto_table,
+        expected_offsets=expected_offsets,
+        expected_symbols=expected_symbols,
+        reducing_offsets=reducing_offsets,
+        reducing_terminals=reducing_terminals,
+        conflicts=conflicts,
+        skipped_productions=frozenset(
+            production_ids[production] for production in skipped_productions
+        ),
+    )
+
+
 class _State(object):
     """
     An opaque reference type pointing to a state in a parse table.
@@ -476,66 +936,290 @@ class _State(object):
         if not isinstance(other, self.__class__):
             return NotImplemented
 
-        return (
-            self._table._item_sets[self._index]
-            == other._table._item_sets[self._index]
-        )
+        return self._table is other._table and self._index == other._index
 
     def __hash__(self):
         return hash(self._index)
 
 
 class ParseTable(object):
-    def __init__(self, grammar, target):
+    def __init__(
+        self,
+        grammar,
+        target,
+        *,
+        compressed=False,
+        generalized=False,
+        transparent=(),
+    ):
+        """
+        Builds the LALR(1) parse table for a grammar.
+
+        :param transparent:
+            An iterable of unit productions, with a single symbol on the right
+            hand side, whose actions return the value of that symbol
+            unchanged.  Where possible, the table skips reductions by these
+            productions entirely, so the action is never called for them.
+            This removes most of the chain reductions from grammars with
+            cascades of non-terminals such as `expression -> term`.
+
+            Anything that observes individual reductions sees the skipped
+            ones disappear.  Actions, including handlers registered with
+            :class:`lalr.Actions`, are not called for them, parse trees built
+            with :func:`lalr.parse_tree` leave out their nodes, and
+            :func:`lalr.iterparse` raises a `ValueError` if asked to emit a
+            non-terminal that some reductions were skipped for.  Some errors
+            are detected a step later, and so may report different expected
+            symbols.
+
+        :param generalized:
+            If true, conflicts that are not resolved by precedence rules are
+            kept in the table instead of raising a
+            :class:`lalr.exceptions.ConflictError`.  Tables with conflicts can
+            only be used with :func:`lalr.parse_forest`.  Other parsers treat
+            the conflicting actions as errors.  Generalized tables can not be
+            compressed or serialized.
+
+        :param compressed:
+            If true, the parse table is stored in a compressed form that uses
+            significantly less memory, at some cost to parsing speed, and item
+            sets are not available.  Some errors are detected only after default
+            reductions, and so may report different expected symbols.
+            Compressed tables can not be serialized.  See
+            :class:`lalr.compression.CompressedTables`.
+        """
+        if compressed and generalized:
+            raise ValueError("generalized parse tables can not be compressed")
+
+        transparent = frozenset(transparent)
+        for production in transparent:
+            if production not in grammar.productions() or len(production) != 1:
+                raise ValueError(
+                    f"{production} is not a unit production in the grammar"
+                )
+
         item_sets, transitions = _build_transition_table(grammar, target)
-        self._item_sets, self._transitions = item_sets, transitions
 
-        self._reductions = _build_reduction_table(
+        # Item sets are only needed for debugging, so are rebuilt on demand
+        # rather than being kept alive for the lifetime of the table.
+        self._item_sets = None
+        self._source = None if compressed else (grammar, target)
+
+        reduction_conflicts = [] if generalized else None
+        reductions = _build_reduction_table(
             grammar,
             item_sets,
             transitions,
+            reduction_conflicts,
         )
-        self._shifts = _build_shift_table(
+        shifts = _build_shift_table(
             grammar,
             item_sets,
             transitions,
         )
-        self._gotos = _build_goto_table(
+        gotos = _build_goto_table(
             grammar,
             item_sets,
             transitions,
         )
-        self._accepts = _build_accept_table(
+        accepts = _build_accept_table(
             grammar,
             item_sets,
             transitions,
         )
 
-        _apply_precedence_rules(self._shifts, self._reductions, grammar)
+        _apply_precedence_rules(shifts, reductions, grammar)
+
+        if not generalized:
+            _check_shift_reduce_conflicts(shifts, reductions)
+
+        skipped_productions = ()
+        if transparent:
+            skipped_productions = _eliminate_unit_reductions(
+                shifts,
+                gotos,
+                reductions,
+                accepts,
+                transparent,
+                reduction_conflicts,
+            )
+
+        self._tables = _compile_tables(
+            grammar,
+            target,
+            item_sets,
+            shifts,
+            reductions,
+            gotos,
+            accepts,
+            reduction_conflicts,
+            skipped_productions,
+        )
+
+        if compressed:
+            self._tables = compress(self._tables)
 
-        _check_shift_reduce_conflicts(self._shifts, self._reductions)
+    @classmethod
+    def cached(
+        cls, grammar, target, *, cache_dir=None, max_size=DEFAULT_MAX_SIZE
+    ):
+        """
+        Returns a parse table for the grammar and target, loading it from an
+        on-disk cache if it has been built before, and building and storing it
+        if not.
+
+        Cache entries are keyed by a fingerprint of the productions,
+        precedence rules and target, and of the library version.  Symbols must
+        be picklable, and should have a stable `repr`.
+
+        :param cache_dir:
+            The directory to store tables in.  Defaults to
+            `~/.cache/python-lalr`.
+
+        :param max_size:
+            The maximum total size, in bytes, of the tables in the cache
+            directory.  The least recently used tables are deleted to keep the
+            cache within this limit.
+        """
+        cache = TableCache(cache_dir, max_size=max_size)
+        key = fingerprint(grammar, target)
+
+        data = cache.read(key)
+        if data is not None:
+            try:
+                return cls.from_buffer(data)
+            except TableFormatError:
+                # Entries are written atomically, so this should only happen
+                # if the file has been tampered with.  Just rebuild.
+                pass
+
+        parse_table = cls(grammar, target)
+        cache.write(key, parse_table.dump)
+        return parse_table
+
+    @classmethod
+    def load(cls, fp):
+        """
+        Reads a parse table that was written using :meth:`dump` from a binary
+        file object.
+
+        The table is loaded as is, without reference to the grammar it was
+        built from.  Parse tables are stored using :mod:`pickle`, and so should
+        only be loaded from trusted sources.
+        """
+        return cls.from_buffer(fp.read())
+
+    @classmethod
+    def from_buffer(cls, buffer):
+        """
+        Reads a parse table that was written using :meth:`dump` from a
+        bytes-like object, such as an :class:`mmap.mmap`.  The integer tables
+        are read in place and not copied, so the buffer must outlive the
+        parse table.
+        """
+        self = cls.__new__(cls)
+        self._item_sets = None
+        self._source = None
+        self._tables = CompiledTables.from_buffer(buffer)
+        return self
+
+    def dump(self, fp):
+        """
+        Writes the parse table to a binary file object in a compact, versioned
+        format that can be read back using :meth:`load`.
+        """
+        if not isinstance(self._tables, CompiledTables):
+            raise ValueError("compressed parse tables can not be serialized")
+        if self._tables.conflicts:
+            raise ValueError("generalized parse tables can not be serialized")
+        self._tables.dump(fp)
+
+    def share(self, name=None):
+        """
+        Publishes the parse table to a new block of shared memory, and returns
+        the :class:`multiprocessing.shared_memory.SharedMemory` object.  Other
+        processes can then use the table, without copying it, by passing the
+        name of the block to :meth:`attach`.
+
+        The caller is responsible for unlinking the block once all processes
+        are finished with it.  Requires python 3.8 or later.  On older
+        versions, write the table to a file with :meth:`dump` and memory map
+        it with :meth:`from_buffer` instead.
+        """
+        buffer = io.BytesIO()
+        self.dump(buffer)
+        return shared.create(buffer.getbuffer(), name)
+
+    @classmethod
+    def attach(cls, name):
+        """
+        Returns a parse table that reads directly from a block of shared
+        memory created by :meth:`share`.  The block must not be unlinked
+        while the table is in use.
+        """
+        buffer, owner = shared.attach(name)
+        self = cls.from_buffer(buffer)
+        # Keep the block open for as long as the table refers to it.
+        self._shared_memory = owner
+        return self
+
+    def __reduce_ex__(self, protocol):
+        # Pickle the serialized tables rather than the item sets.
+        if (
+            not isinstance(self._tables, CompiledTables)
+            or self._tables.conflicts
+        ):
+            return super().__reduce_ex__(protocol)
+        buffer = io.BytesIO()
+        self.dump(buffer)
+        return (type(self).from_buffer, (buffer.getvalue(),))
 
     def states(self):
         """
         Returns an iterator over states identifiers in the parse table.
         """
-        return (_State(self, index) for index in range(len(self._item_sets)))
+        return (_State(self, index) for index in range(self._tables.n_states))
 
     def start_state(self):
         return _State(self, 0)
 
     def item_set(self, state):
-        # TODO needed for error reporting, but is something of an abstraction
-        # leak.  Find a better alternative.
+        # TODO needed for debugging, but is something of an abstraction leak.
+        # Find a better alternative.
+        if self._item_sets is None:
+            if self._source is None:
+                raise ValueError(
+                    "item sets are not available for loaded or compressed "
+                    "tables"
+                )
+            self._item_sets, _ = _build_transition_table(*self._source)
         return self._item_sets[state._index]
 
+    def _actions(self, state):
+        tables = self._tables
+        return [
+            tables.action(state._index, terminal)
+            for terminal in range(len(tables.terminals))
+        ]
+
     def reductions(self, state):
         """
         Returns a dictionary mapping from terminal symbols to reduce actions.
 
         A reduce action is represented simply be a reference to a production.
+        In the accepting state, the end of file maps to the production that
+        reduces the target to the start symbol.
         """
-        return MappingProxyType(self._reductions[state._index])
+        tables = self._tables
+        return MappingProxyType(
+            {
+                terminal: tables.productions[~action]
+                for terminal, action in zip(
+                    tables.terminals, self._actions(state)
+                )
+                if action < 0
+            }
+        )
 
     def shifts(self, state):
         """
@@ -546,11 +1230,21 @@ class ParseTable(object):
         """
         return MappingProxyType(
             {
-                terminal: _State(self, index)
-                for terminal, index in self._shifts[state._index].items()
+                terminal: _State(self, action)
+                for terminal, action in zip(
+                    self._tables.terminals, self._actions(state)
+                )
+                if action > 0
             }
         )
 
+    def _gotos(self, state):
+        tables = self._tables
+        return [
+            tables.goto(state._index, nonterminal)
+            for nonterminal in range(len(tables.nonterminals))
+        ]
+
     def gotos(self, state):
         """
         Returns a dictionary mapping from non terminal symbols to shift
@@ -558,8 +1252,11 @@ class ParseTable(object):
         """
         return MappingProxyType(
             {
-                nonterminal: _State(self, index)
-                for nonterminal, index in self._gotos[state._index].items()
+                nonterminal: _State(self, target)
+                for nonterminal, target in zip(
+                    self._tables.nonterminals, self._gotos(state)
+                )
+                if target
             }
         )
 
@@ -568,4 +1265,12 @@ class ParseTable(object):
         Returns True if and end-of-file token in the given state will result in
         the string being accepted.
         """
-        return self._accepts[state._index]
+        return self._tables.action(state._index, 0) == ~0
+
+    def __getstate__(self):
+        # Item sets are only kept for debugging, and neither they nor the
+        # grammar are picklable.
+        state = dict(self.__dict__)
+        state["_item_sets"] = None
+        state["_source"] = None
+        return state
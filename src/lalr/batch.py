@@ -0,0 +1,196 @@
+import collections
+import io
+import itertools
+import multiprocessing
+import queue
+
+from lalr.analysis import ParseTable
+from lalr.exceptions import ParseError
+from lalr.parsing import _advance, _default_token_symbol, _default_token_value
+
+# The parse table and callbacks used by the current worker process.  Set
+# once, when the worker starts, by `_initialize_worker`.
+_worker_state = None
+
+
+def _initialize_worker(data, action, token_symbol, token_value):
+    global _worker_state
+    _worker_state = (
+        ParseTable.from_buffer(data),
+        action,
+        token_symbol,
+        token_value,
+    )
+
+
+def _parse_sequential(
+    parse_table, token_streams, *, action, token_symbol, token_value
+):
+    # The same stacks are reused for every input to avoid reallocating them.
+    state_stack = [0]
+    result_stack = []
+
+    for tokens in token_streams:
+        del state_stack[1:]
+        del result_stack[:]
+        try:
+            yield _advance(
+                parse_table,
+                state_stack,
+                result_stack,
+                tokens,
+                action=action,
+                token_symbol=token_symbol,
+                token_value=token_value,
+                final=True,
+            )
+        except ParseError as exc:
+            yield exc
+
+
+def _parse_chunk(offset, chunk):
+    parse_table, action, token_symbol, token_value = _worker_state
+    results = _parse_sequential(
+        parse_table,
+        chunk,
+        action=action,
+        token_symbol=token_symbol,
+        token_value=token_value,
+    )
+    return offset, list(results)
+
+
+def _chunks(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        chunk = [tuple(tokens) for tokens in itertools.islice(iterator, size)]
+        if not chunk:
+            return
+        yield chunk
+
+
+def _parse_parallel(
+    parse_table,
+    token_streams,
+    *,
+    action,
+    token_symbol,
+    token_value,
+    workers,
+    chunksize,
+    ordered,
+):
+    buffer = io.BytesIO()
+    parse_table.dump(buffer)
+
+    # Limit the number of chunks that are waiting to be parsed so that the
+    # token streams are not all read into memory at once.
+    max_pending = workers * 4
+
+    chunks = (
+        (index * chunksize, chunk)
+        for index, chunk in enumerate(_chunks(token_streams, chunksize))
+    )
+
+    with multiprocessing.Pool(
+        workers,
+        initializer=_initialize_worker,
+        initargs=(buffer.getvalue(), action, token_symbol, token_value),
+    ) as pool:
+        if ordered:
+            pending = collections.deque()
+            for task in itertools.islice(chunks, max_pending):
+                pending.append(pool.apply_async(_parse_chunk, task))
+            while pending:
+                _, results = pending.popleft().get()
+                for task in itertools.islice(chunks, 1):
+                    pending.append(pool.apply_async(_parse_chunk, task))
+                yield from results
+
+        else:
+            completed = queue.Queue()
+
+            def _submit(task):
+                pool.apply_async(
+                    _parse_chunk,
+                    task,
+                    callback=completed.put,
+                    error_callback=completed.put,
+                )
+
+            n_pending = 0
+            for task in itertools.islice(chunks, max_pending):
+                _submit(task)
+                n_pending += 1
+            while n_pending:
+                outcome = completed.get()
+                n_pending -= 1
+                if isinstance(outcome, BaseException):
+                    raise outcome
+                for task in itertools.islice(chunks, 1):
+                    _submit(task)
+                    n_pending += 1
+                offset, results = outcome
+                yield from enumerate(results, offset)
+
+
+def parse_many(
+    parse_table,
+    token_streams,
+    *,
+    action,
+    token_symbol=_default_token_symbol,
+    token_value=_default_token_value,
+    workers=None,
+    chunksize=64,
+    ordered=True,
+):
+    """
+    Parses each of a sequence of token streams, returning an iterator over
+    the results.
+
+    A :class:`lalr.exceptions.ParseError` in one stream does not stop the
+    others from being parsed.  Instead, the exception is returned in place of
+    the result for that stream.  Any other exception is raised.
+
+    Other arguments are as for :func:`lalr.parse`.
+
+    :param workers:
+        The number of worker processes to parse in.  If `None`, parsing is
+        done in the current process.  Otherwise the parse table is serialized
+        once and sent to each worker when it starts.  The action and token
+        callbacks, the tokens and the results must all be picklable, and the
+        parse table must not be compressed.
+
+    :param chunksize:
+        The number of token streams to send to a worker at a time.  Each
+        stream is read into a tuple before being sent.
+
+    :param ordered:
+        If true, the default, results are returned in the same order as the
+        token streams.  If false, `(index, result)` pairs are returned as soon
+        as they are available, where `index` is the position of the token
+        stream in the input.
+    """
+    if workers is None:
+        results = _parse_sequential(
+            parse_table,
+            token_streams,
+            action=action,
+            token_symbol=token_symbol,
+            token_value=token_value,
+        )
+        if not ordered:
+            results = enumerate(results)
+        return results
+
+    return _parse_parallel(
+        parse_table,
+        token_streams,
+        action=action,
+        token_symbol=token_symbol,
+        token_value=token_value,
+        workers=workers,
+        chunksize=chunksize,
+        ordered=ordered,
+    )
@@ -0,0 +1,165 @@
+import hashlib
+import os
+import tempfile
+
+from lalr.tables import FORMAT_VERSION
+
+# The default upper bound on the total size of the files in a cache directory.
+DEFAULT_MAX_SIZE = 64 * 1024 * 1024
+
+_SUFFIX = ".lalr"
+
+
+def default_cache_dir():
+    """
+    Returns the directory used to cache parse tables if none is specified.
+    This is a `python-lalr` directory under `$XDG_CACHE_HOME`, or under
+    `~/.cache` if that is not set.
+    """
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(
+        os.path.expanduser("~"), ".cache"
+    )
+    return os.path.join(base, "python-lalr")
+
+
+def fingerprint(grammar, target):
+    """
+    Returns a string that uniquely identifies the parse table that would be
+    built for a grammar and target.
+
+    The fingerprint covers the productions, in order, the precedence and
+    associativity of every terminal, the target, and the versions of the
+    library and of the table format.  Symbols are identified by their `repr`,
+    so symbols without a stable `repr` will never be found in the cache.
+    """
+    # Imported here as the package imports this module while it is still being
+    # initialised.
+    from lalr import __version__
+
+    hasher = hashlib.sha256()
+
+    def _update(*values):
+        hasher.update(repr(values).encode("utf-8"))
+        hasher.update(b"\n")
+
+    _update("lalr", __version__, FORMAT_VERSION)
+    _update("target", target)
+    for production in grammar.indexed_productions():
+        _update("production", production.name, production.symbols)
+    for terminal in grammar.indexed_terminals()[1:]:
+        _update(
+            "terminal",
+            terminal,
+            grammar.precedence(terminal),
+            grammar.associativity(terminal),
+        )
+
+    return hasher.hexdigest()
+
+
+class TableCache(object):
+    """
+    A directory of serialized parse tables, keyed by fingerprint.
+
+    Entries are written atomically, so concurrent readers will only ever see
+    complete files.  Reading an entry marks it as recently used by updating its
+    modification time, and once the total size of the directory exceeds
+    `max_size` the least recently used entries are removed.
+    """
+
+    def __init__(self, cache_dir=None, *, max_size=DEFAULT_MAX_SIZE):
+        if cache_dir is None:
+            cache_dir = default_cache_dir()
+        self._cache_dir = os.fspath(cache_dir)
+        self._max_size = max_size
+
+    def _path(self, key):
+        return os.path.join(self._cache_dir, key + _SUFFIX)
+
+    def read(self, key):
+        """
+        Returns the contents of the entry for a key, or `None` if there is no
+        such entry.
+        """
+        path = self._path(key)
+        try:
+            with open(path, "rb") as fp:
+                data = fp.read()
+        except FileNotFoundError:
+            return None
+
+        try:
+            os.utime(path)
+        except OSError:
+            # The entry may have been evicted by another process in the
+            # meantime.  This doesn't affect the data that was read.
+            pass
+
+        return data
+
+    def write(self, key, dump):
+        """
+        Creates or replaces the entry for a key.
+
+        :param dump:
+            A callable that will be passed a binary file object to write the
+            contents of the entry to.
+        """
+        os.makedirs(self._cache_dir, exist_ok=True)
+
+        fd, temp_path = tempfile.mkstemp(
+            dir=self._cache_dir, prefix=".tmp-", suffix=_SUFFIX
+        )
+        try:
+            with os.fdopen(fd, "wb") as fp:
+                dump(fp)
+                # Make sure that the data is on disk before the entry is
+                # renamed into place, so a crash can't leave it truncated.
+                fp.flush()
+                os.fsync(fp.fileno())
+            os.replace(temp_path, self._path(key))
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+
+        self.evict(keep=key)
+
+    def evict(self, *, keep=None):
+        """
+        Deletes the least recently used entries until the total size of the
+        cache is no more than `max_size`.
+
+        :param keep:
+            An optional key for an entry that should not be deleted, even if
+            it is the least recently used.
+        """
+        entries = []
+        with os.scandir(self._cache_dir) as scan:
+            for entry in scan:
+                if entry.name.startswith(".") or not entry.name.endswith(
+                    _SUFFIX
+                ):
+                    continue
+                if keep is not None and entry.name == keep + _SUFFIX:
+                    continue
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+
+        total_size = sum(size for _, size, _ in entries)
+        if keep is not None:
+            try:
+                total_size += os.stat(self._path(keep)).st_size
+            except FileNotFoundError:
+                pass
+
+        for _, size, path in sorted(entries):
+            if total_size <= self._max_size:
+                break
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass
+            total_size -= size
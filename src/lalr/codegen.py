@@ -0,0 +1,332 @@
+import ast
+import string
+import sys
+import zlib
+
+from lalr import __version__
+from lalr.tables import CompiledTables, _int_array
+
+# The source of the generated module.  This mirrors `lalr.parsing` closely,
+# and any changes to the parser loop there should be reflected here.
+_TEMPLATE = string.Template('''\
+"""
+Parser for $module_name.
+
+Generated by python-lalr $version.  Do not edit.
+"""
+import sys
+import zlib
+from array import array
+
+__all__ = ["EOF", "ParseError", "Production", "parse"]
+
+
+class _EndOfFile(object):
+    __slots__ = ()
+
+    def __repr__(self):
+        return "EOF"
+
+    def __str__(self):
+        return "$$"
+
+
+EOF = _EndOfFile()
+
+
+class ParseError(Exception):
+    def __init__(self, message, *, lookahead_token, expected_symbols):
+        super().__init__(message)
+        self.lookahead_token = lookahead_token
+        self.expected_symbols = expected_symbols
+
+
+class Production(object):
+
+    __slots__ = ("name", "symbols")
+
+    def __init__(self, name, symbols):
+        object.__setattr__(self, "name", name)
+        object.__setattr__(self, "symbols", symbols)
+
+    def __setattr__(self, attr, value):
+        raise AttributeError("can't set attributes on productions")
+
+    def __getitem__(self, index):
+        return self.symbols[index]
+
+    def __len__(self):
+        return len(self.symbols)
+
+    def __eq__(self, other):
+        return self.name == other.name and self.symbols == other.symbols
+
+    def __hash__(self):
+        return hash(self.name) ^ hash(self.symbols)
+
+    def __repr__(self):
+        return "Production({name}, {symbols})".format(
+            name=self.name,
+            symbols=self.symbols,
+        )
+
+    def __str__(self):
+        return "{name} -> {symbols}".format(
+            name=self.name,
+            symbols=" ".join(str(symbol) for symbol in self.symbols),
+        )
+
+
+def _table(data):
+    table = array("i")
+    table.frombytes(zlib.decompress(data))
+    if sys.byteorder == "big":
+        table.byteswap()
+    return table
+
+
+_TERMINALS = (EOF,) + $terminals
+_TERMINAL_IDS = {terminal: index for index, terminal in enumerate(_TERMINALS)}
+_NONTERMINALS = $nonterminals
+_PRODUCTIONS = (None,) + tuple(
+    Production(name, symbols) for name, symbols in $productions
+)
+_PRODUCTION_LHS = $production_lhs
+_PRODUCTION_LENGTHS = $production_lengths
+_ACTION_TABLE = _table($action_table)
+_GOTO_TABLE = _table($goto_table)
+_EXPECTED_OFFSETS = $expected_offsets
+_EXPECTED_SYMBOLS = $expected_symbols
+_REDUCING_OFFSETS = $reducing_offsets
+_REDUCING_TERMINALS = $reducing_terminals
+
+
+def _or_list(values):
+    # Values may not be sortable so we convert to strings first.
+    names = sorted(str(value) for value in values)
+    if len(names) > 1:
+        return ", ".join(names[:-1]) + " or " + names[-1]
+    else:
+        return names[0]
+
+
+def _default_token_symbol(token):
+    return token
+
+
+def _default_token_value(token):
+    return token
+
+
+def parse(
+    tokens,
+    *,
+    action,
+    token_symbol=_default_token_symbol,
+    token_value=_default_token_value,
+):
+    """
+    Parses a sequence of tokens.  Arguments are as for `lalr.parse`.
+    """
+    terminal_ids = _TERMINAL_IDS
+    productions = _PRODUCTIONS
+    production_lhs = _PRODUCTION_LHS
+    production_lengths = _PRODUCTION_LENGTHS
+    action_table = _ACTION_TABLE
+    goto_table = _GOTO_TABLE
+
+    tokens = iter(tokens)
+
+    state = 0
+    state_stack = [state]
+    result_stack = []
+
+    while True:
+        try:
+            lookahead_token = next(tokens)
+        except StopIteration:
+            lookahead_token, lookahead_symbol, lookahead_value = (
+                None,
+                EOF,
+                None,
+            )
+        else:
+            lookahead_symbol = token_symbol(lookahead_token)
+            lookahead_value = token_value(lookahead_token)
+
+        lookahead = terminal_ids.get(lookahead_symbol)
+        if lookahead is None:
+            _raise_parse_error(state_stack, lookahead_token, lookahead_symbol)
+
+        while True:
+            act = action_table[state * $n_terminals + lookahead]
+
+            if act > 0:
+                state = act
+                state_stack.append(state)
+                result_stack.append(lookahead_value)
+                break
+
+            if act == 0:
+                _raise_parse_error(
+                    state_stack, lookahead_token, lookahead_symbol
+                )
+
+            production_index = ~act
+
+            if production_index == 0:
+                assert len(result_stack) == 1
+                return result_stack[0]
+
+            length = production_lengths[production_index]
+            values = result_stack[-length:]
+            del result_stack[-length:]
+            result_stack.append(action(productions[production_index], *values))
+
+            del state_stack[-length:]
+
+            state = goto_table[
+                state_stack[-1] * $n_nonterminals
+                + production_lhs[production_index]
+            ]
+            state_stack.append(state)
+
+
+def _symbol(symbol_id):
+    if symbol_id < $n_terminals:
+        return _TERMINALS[symbol_id]
+    return _NONTERMINALS[symbol_id - $n_terminals]
+
+
+def _expected(state):
+    return _EXPECTED_SYMBOLS[
+        _EXPECTED_OFFSETS[state] : _EXPECTED_OFFSETS[state + 1]
+    ]
+
+
+def _raise_parse_error(state_stack, lookahead_token, lookahead_symbol):
+    state = state_stack[-1]
+
+    expected_symbols = {_symbol(symbol_id) for symbol_id in _expected(state)}
+
+    for terminal in _REDUCING_TERMINALS[
+        _REDUCING_OFFSETS[state] : _REDUCING_OFFSETS[state + 1]
+    ]:
+        depth = len(state_stack)
+        pushed = []
+        top = state
+        act = _ACTION_TABLE[top * $n_terminals + terminal]
+        while act < ~0:
+            production_index = ~act
+            length = _PRODUCTION_LENGTHS[production_index]
+            if length < len(pushed):
+                del pushed[-length:]
+            else:
+                depth -= length - len(pushed)
+                pushed = []
+            below = pushed[-1] if pushed else state_stack[depth - 1]
+            top = _GOTO_TABLE[
+                below * $n_nonterminals + _PRODUCTION_LHS[production_index]
+            ]
+            pushed.append(top)
+            act = _ACTION_TABLE[top * $n_terminals + terminal]
+
+        for symbol_id in _expected(top):
+            expected_symbols.add(_symbol(symbol_id))
+
+    if expected_symbols:
+        message = "expected {} before {}".format(
+            _or_list(expected_symbols),
+            lookahead_token if lookahead_symbol is not EOF else "EOF",
+        )
+    else:
+        message = "expected EOF instead of {}".format(lookahead_symbol)
+
+    raise ParseError(
+        message,
+        lookahead_token=lookahead_token,
+        expected_symbols=expected_symbols,
+    )
+''')
+
+
+def _literal(value):
+    """
+    Returns a python expression that evaluates to a value, or raises a
+    `ValueError` if there isn't one.
+    """
+    source = repr(value)
+    try:
+        evaluated = ast.literal_eval(source)
+    except (ValueError, SyntaxError):
+        evaluated = None
+    if type(evaluated) is not type(value) or evaluated != value:
+        raise ValueError(
+            f"symbol {source} can not be written as a python literal"
+        )
+    return source
+
+
+def _symbols(symbols):
+    return "({})".format(
+        "".join(f"{_literal(symbol)}, " for symbol in symbols)
+    )
+
+
+def _ints(values):
+    return "({})".format("".join(f"{value}, " for value in values))
+
+
+def _packed_ints(values):
+    values = _int_array(values)
+    if sys.byteorder == "big":
+        values.byteswap()
+    return repr(zlib.compress(values.tobytes(), 9))
+
+
+def generate(parse_table, module_name):
+    """
+    Returns the source code of a python module that can parse input using a
+    parse table without depending on `lalr`.
+
+    The generated module exposes a `parse` function that takes the same
+    arguments as :func:`lalr.parse`, minus the parse table, as well as its own
+    `ParseError`, `Production` and `EOF`.  Productions passed to actions
+    compare equal to the equivalent :class:`lalr.Production`.
+
+    Terminals and non-terminals are embedded in the module using their
+    `repr`, so must be strings, numbers or other python literals.  A
+    `ValueError` is raised if this is not the case.
+
+    :param module_name:
+        The name that the generated module will be imported as.  This is
+        only used for documentation.
+    """
+    tables = parse_table._tables
+    if not isinstance(tables, CompiledTables):
+        raise ValueError("can not generate code from compressed tables")
+    if tables.conflicts:
+        raise ValueError("can not generate code from generalized tables")
+
+    return _TEMPLATE.substitute(
+        module_name=module_name,
+        version=__version__,
+        terminals=_symbols(tables.terminals[1:]),
+        nonterminals=_symbols(tables.nonterminals),
+        productions="({})".format(
+            "".join(
+                f"({_literal(production.name)}, {_symbols(production)}), "
+                for production in tables.productions[1:]
+            )
+        ),
+        production_lhs=_ints(tables.production_lhs),
+        production_lengths=_ints(tables.production_lengths),
+        action_table=_packed_ints(tables.action_table),
+        goto_table=_packed_ints(tables.goto_table),
+        expected_offsets=_ints(tables.expected_offsets),
+        expected_symbols=_ints(tables.expected_symbols),
+        reducing_offsets=_ints(tables.reducing_offsets),
+        reducing_terminals=_ints(tables.reducing_terminals),
+        n_terminals=len(tables.terminals),
+        n_nonterminals=len(tables.nonterminals),
+    )
@@ -0,0 +1,292 @@
+import re
+from array import array
+
+from lalr.tables import _int_array
+
+
+class CompressedTables(object):
+    """
+    A compact alternative to :class:`lalr.tables.CompiledTables`.
+
+    Action rows are compressed in three steps:
+
+      - States that reduce by exactly one production, and do not accept, use
+        that reduction as their default action.  The individual reduce
+        entries are dropped from the row, and any lookahead without an
+        explicit entry is reduced.  This delays the detection of some errors
+        until after one or more default reductions, but never changes the
+        result of a successful parse.
+      - States with identical rows share a single copy of the row.
+      - The remaining sparse rows are overlapped in a single comb vector.
+        Row `r` starts at `action_base[r]`, and an entry in the `action_next`
+        array belongs to the row if the corresponding entry in `action_check`
+        is equal to the row's base.  Each distinct row has a distinct base, so
+        a state's row can be identified by its base alone.
+
+    Gotos are compressed in the same way, without defaults.  A goto is only
+    ever looked up after a reduction, at which point it is guaranteed to
+    exist, so the parser loop does not need to consult `goto_check`.
+
+    Actions and gotos are encoded as in :class:`lalr.tables.CompiledTables`.
+    Terminals, non-terminals, productions, expected symbols, reducing
+    terminals and skipped productions are shared with the uncompressed
+    tables.
+    """
+
+    __slots__ = (
+        "terminals",
+        "terminal_ids",
+        "nonterminals",
+        "productions",
+        "production_lhs",
+        "production_lengths",
+        "action_default",
+        "action_base",
+        "action_check",
+        "action_next",
+        "goto_base",
+        "goto_check",
+        "goto_next",
+        "expected_offsets",
+        "expected_symbols",
+        "reducing_offsets",
+        "reducing_terminals",
+        "skipped_productions",
+    )
+
+    def __init__(
+        self,
+        *,
+        terminals,
+        terminal_ids,
+        nonterminals,
+        productions,
+        production_lhs,
+        production_lengths,
+        action_default,
+        action_base,
+        action_check,
+        action_next,
+        goto_base,
+        goto_check,
+        goto_next,
+        expected_offsets,
+        expected_symbols,
+        reducing_offsets,
+        reducing_terminals,
+        skipped_productions,
+    ):
+        self.terminals = terminals
+        self.terminal_ids = terminal_ids
+        self.nonterminals = nonterminals
+        self.productions = productions
+        self.production_lhs = production_lhs
+        self.production_lengths = production_lengths
+        self.action_default = action_default
+        self.action_base = action_base
+        self.action_check = action_check
+        self.action_next = action_next
+        self.goto_base = goto_base
+        self.goto_check = goto_check
+        self.goto_next = goto_next
+        self.expected_offsets = expected_offsets
+        self.expected_symbols = expected_symbols
+        self.reducing_offsets = reducing_offsets
+        self.reducing_terminals = reducing_terminals
+        self.skipped_productions = skipped_productions
+
+    @property
+    def n_states(self):
+        return len(self.action_base)
+
+    def action(self, state, terminal):
+        """
+        Returns the encoded action for a state and terminal index.
+        """
+        base = self.action_base[state]
+        if self.action_check[base + terminal] == base:
+            return self.action_next[base + terminal]
+        return self.action_default[state]
+
+    def goto(self, state, nonterminal):
+        """
+        Returns the state to go to from a state after reducing to a
+        non-terminal, or zero if there is no such state.
+        """
+        base = self.goto_base[state]
+        if self.goto_check[base + nonterminal] == base:
+            return self.goto_next[base + nonterminal]
+        return 0
+
+    def symbol(self, symbol_id):
+        """
+        Returns the terminal or non-terminal identified by a symbol id from
+        the expected symbol table.
+        """
+        if symbol_id < len(self.terminals):
+            return self.terminals[symbol_id]
+        return self.nonterminals[symbol_id - len(self.terminals)]
+
+    def expected(self, state):
+        """
+        Returns the ids of the symbols expected by the kernel of a state.
+        """
+        return self.expected_symbols[
+            self.expected_offsets[state] : self.expected_offsets[state + 1]
+        ]
+
+    def reducing(self, state):
+        """
+        Returns the indexes of the terminals, other than the end of file
+        marker, that a state reduces on in the uncompressed tables.
+        """
+        return self.reducing_terminals[
+            self.reducing_offsets[state] : self.reducing_offsets[state + 1]
+        ]
+
+    def size(self):
+        """
+        Returns the number of integers in the compressed action and goto
+        tables.
+        """
+        return (
+            len(self.action_default)
+            + len(self.action_base)
+            + len(self.action_check)
+            + len(self.action_next)
+            + len(self.goto_base)
+            + len(self.goto_check)
+            + len(self.goto_next)
+        )
+
+
+def _pack(rows, width):
+    """
+    Overlaps sparse rows, each a tuple of `(column, value)` pairs, in a comb
+    vector.  Returns the base offset of each row, and the check and next
+    arrays.
+
+    Rows are placed first fit, densest first.  Identical rows are placed
+    once, and every distinct row, including empty rows, is given a distinct
+    base so that the check array can identify it.
+    """
+    bases = {}
+    used_bases = set()
+    check = []
+    values = []
+
+    # One byte per slot in the check array, zero if the slot is free.
+    occupied = bytearray()
+
+    for row in sorted(set(rows), key=len, reverse=True):
+        columns = [column for column, _ in row] or [0]
+
+        # A pattern that matches wherever all of the columns in the row would
+        # fall on free slots.  The slots past the end of the check array are
+        # free, so the search is done on a copy padded to the row width.
+        pattern = re.compile(
+            b"\\x00"
+            + b"".join(
+                b".{%d}\\x00" % (column - previous - 1)
+                for previous, column in zip(columns, columns[1:])
+            ),
+            re.DOTALL,
+        )
+        padded = occupied + bytes(width)
+
+        # Every slot before the first free slot is in use, so there is no
+        # need to search before it.
+        position = max(columns[0], padded.find(0))
+        while True:
+            position = pattern.search(padded, position).start()
+            base = position - columns[0]
+            if base not in used_bases:
+                break
+            position += 1
+
+        end = base + width
+        if end > len(check):
+            check.extend([-1] * (end - len(check)))
+            values.extend([0] * (end - len(values)))
+            occupied.extend(bytes(end - len(occupied)))
+
+        for column, value in row:
+            check[base + column] = base
+            values[base + column] = value
+            occupied[base + column] = 1
+
+        bases[row] = base
+        used_bases.add(base)
+
+    return (
+        _int_array(bases[row] for row in rows),
+        _int_array(check),
+        _int_array(values),
+    )
+
+
+def compress(tables):
+    """
+    Builds :class:`CompressedTables` from :class:`lalr.tables.CompiledTables`.
+    """
+    n_states = tables.n_states
+    n_terminals = len(tables.terminals)
+    n_nonterminals = len(tables.nonterminals)
+
+    action_default = array("i", [0]) * n_states
+    action_rows = []
+    for state in range(n_states):
+        offset = state * n_terminals
+        row = tables.action_table[offset : offset + n_terminals]
+
+        reductions = {action for action in row if action < ~0}
+        if len(reductions) == 1 and ~0 not in row:
+            (default,) = reductions
+            action_default[state] = default
+        else:
+            default = 0
+
+        action_rows.append(
+            tuple(
+                (terminal, action)
+                for terminal, action in enumerate(row)
+                if action != 0 and action != default
+            )
+        )
+
+    goto_rows = []
+    for state in range(n_states):
+        offset = state * n_nonterminals
+        goto_rows.append(
+            tuple(
+                (nonterminal, target)
+                for nonterminal, target in enumerate(
+                    tables.goto_table[offset : offset + n_nonterminals]
+                )
+                if target
+            )
+        )
+
+    action_base, action_check, action_next = _pack(action_rows, n_terminals)
+    goto_base, goto_check, goto_next = _pack(goto_rows, n_nonterminals)
+
+    return CompressedTables(
+        terminals=tables.terminals,
+        terminal_ids=tables.terminal_ids,
+        nonterminals=tables.nonterminals,
+        productions=tables.productions,
+        production_lhs=tables.production_lhs,
+        production_lengths=tables.production_lengths,
+        action_default=action_default,
+        action_base=action_base,
+        action_check=action_check,
+        action_next=action_next,
+        goto_base=goto_base,
+        goto_check=goto_check,
+        goto_next=goto_next,
+        expected_offsets=tables.expected_offsets,
+        expected_symbols=tables.expected_symbols,
+        reducing_offsets=tables.reducing_offsets,
+        reducing_terminals=tables.reducing_terminals,
+        skipped_productions=tables.skipped_productions,
+    )
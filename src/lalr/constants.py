@@ -1,6 +1,22 @@
+import typing
+
+# All constants, by name, so that unpickling a constant can return the
+# original object.
+_constants: typing.Dict[str, "_Constant"] = {}
+
+
+def _constant(name):
+    return _constants[name]
+
+
 class _Constant(object):
     def __init__(self, name):
         self._name = name
+        _constants[name] = self
+
+    def __reduce__(self):
+        # Constants are compared by identity.
+        return (_constant, (self._name,))
 
     def __repr__(self):
         return "<{name}>".format(name=self._name)
@@ -12,3 +28,8 @@ class _Constant(object):
 START = _Constant("S")
 EMPTY = _Constant("E")
 EOF = _Constant("$")
+
+# A pseudo-terminal that can be used in productions to mark where the parser
+# should resume after a syntax error.  Never produced by a lexer.  See
+# :func:`lalr.parse_with_recovery`.
+ERROR = _Constant("error")
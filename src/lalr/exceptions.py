@@ -1,3 +1,6 @@
+import functools
+
+
 class CompilationError(Exception):
     pass
 
@@ -23,3 +26,17 @@ class ParseError(Exception):
         super(ParseError, self).__init__(message)
         self.lookahead_token = lookahead_token
         self.expected_symbols = expected_symbols
+
+    def __reduce__(self):
+        return (
+            functools.partial(
+                type(self),
+                lookahead_token=self.lookahead_token,
+                expected_symbols=self.expected_symbols,
+            ),
+            self.args,
+        )
+
+
+class TableFormatError(Exception):
+    pass
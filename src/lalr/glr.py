@@ -0,0 +1,373 @@
+from lalr.constants import EOF
+from lalr.parsing import (
+    _default_token_symbol,
+    _default_token_value,
+    _raise_parse_error,
+)
+from lalr.tables import CompiledTables
+
+
+class ForestNode(object):
+    """
+    A node in the shared packed parse forest returned by :func:`parse_forest`.
+
+    Each node stands for every derivation of `symbol` from the tokens between
+    positions `start` and `end`.  Leaves stand for a single token, and hold
+    the token and its value.  Other nodes have a list of `alternatives`, each
+    a pair of a production and a tuple of child nodes.  Nodes are shared by
+    all of the derivations that contain them, so the forest stays polynomial
+    in the length of the input even when the number of parse trees is
+    exponential.
+    """
+
+    __slots__ = ("symbol", "start", "end", "token", "value", "alternatives")
+
+    def __init__(self, symbol, start, end, token, value, alternatives):
+        self.symbol = symbol
+        self.start = start
+        self.end = end
+        self.token = token
+        self.value = value
+        self.alternatives = alternatives
+
+    @property
+    def is_leaf(self):
+        return self.alternatives is None
+
+    @property
+    def is_ambiguous(self):
+        return self.alternatives is not None and len(self.alternatives) > 1
+
+    def evaluate(self, action, *, merge=None):
+        """
+        Computes a value for the node by calling `action` for each reduction,
+        as for :func:`lalr.parse`.  Each node is evaluated once, no matter how
+        many derivations share it.
+
+        For ambiguous nodes, `merge` is called with the node and a list of
+        the values for each of its alternatives, and should return the value
+        for the node.  If `merge` is not given, a `ValueError` is raised when
+        an ambiguous node is reached.
+        """
+        values = {}
+        entered = set()
+        stack = [self]
+        while stack:
+            node = stack[-1]
+            if node in values:
+                stack.pop()
+                continue
+
+            if node.alternatives is None:
+                values[node] = node.value
+                stack.pop()
+                continue
+
+            pending = [
+                child
+                for _, children in node.alternatives
+                for child in children
+                if child not in values
+            ]
+            if pending:
+                if node in entered:
+                    raise ValueError(f"{node!r} derives itself")
+                entered.add(node)
+                stack.extend(pending)
+                continue
+
+            stack.pop()
+            results = [
+                action(production, *[values[child] for child in children])
+                for production, children in node.alternatives
+            ]
+            if len(results) == 1:
+                values[node] = results[0]
+            elif merge is None:
+                raise ValueError(f"{node!r} is ambiguous")
+            else:
+                values[node] = merge(node, results)
+
+        return values[self]
+
+    def __repr__(self):
+        return f"<ForestNode {self.symbol!r} {self.start}:{self.end}>"
+
+
+class _StackNode(object):
+    """
+    A vertex in the graph structured stack.  Each link points to a vertex
+    below it on the stack, and is labelled with the forest node for the
+    symbol between them.
+    """
+
+    __slots__ = ("state", "position", "links")
+
+    def __init__(self, state, position):
+        self.state = state
+        self.position = position
+        self.links = []
+
+
+def _paths(node, length, first_link=None):
+    """
+    Yields the vertex at the bottom of each path of `length` links down from
+    `node`, along with a tuple of the forest nodes that label the path, from
+    left to right.
+    """
+    links = node.links if first_link is None else (first_link,)
+    for below, forest_node in links:
+        if length == 1:
+            yield below, (forest_node,)
+        else:
+            for bottom, children in _paths(below, length - 1):
+                yield bottom, children + (forest_node,)
+
+
+def _state_stack(node):
+    # Only used for error reporting, so any path to the bottom will do.
+    states = [node.state]
+    while node.links:
+        node = node.links[0][0]
+        states.append(node.state)
+    states.reverse()
+    return states
+
+
+def parse_forest(
+    parse_table,
+    tokens,
+    *,
+    token_symbol=_default_token_symbol,
+    token_value=_default_token_value,
+):
+    """
+    Parses a sequence of tokens with a generalized LR parser, and returns the
+    :class:`ForestNode` at the root of a forest containing every parse.
+
+    Intended for use with tables built with `generalized=True`.  The parser
+    runs as a plain LR parser, with a single stack, until it reaches a
+    conflict.  From there the stack is split into a graph structured stack,
+    with one top vertex for each state that the parser could be in, and the
+    parses are advanced in lock step.  Parses that reach the same state at the
+    same position share a vertex, and derivations of the same symbol from
+    the same tokens share a forest node, which keeps the worst case
+    polynomial.  Once the parses are reduced to a single top vertex, the
+    parser returns to using a single stack.
+
+    A :class:`lalr.exceptions.ParseError` is raised if none of the parses
+    can continue.  Arguments are as for :func:`lalr.parse`.  Compressed
+    tables are not supported.
+    """
+    tables = parse_table._tables
+    if not isinstance(tables, CompiledTables):
+        raise ValueError("can not parse forests with compressed tables")
+
+    terminals = tables.terminals
+    terminal_ids = tables.terminal_ids
+    nonterminals = tables.nonterminals
+    productions = tables.productions
+    production_lhs = tables.production_lhs
+    production_lengths = tables.production_lengths
+    action_table = tables.action_table
+    goto_table = tables.goto_table
+    conflicts = tables.conflicts
+    n_terminals = len(terminals)
+    n_nonterminals = len(nonterminals)
+
+    def _actions(state, lookahead):
+        cell = state * n_terminals + lookahead
+        act = action_table[cell]
+        if act:
+            return (act,)
+        return conflicts.get(cell, ())
+
+    # While the parse is deterministic, the stack is a list of states and a
+    # list of forest nodes on top of a single base vertex.  Otherwise
+    # `frontier` maps from states to the top vertices of the graph structured
+    # stack.
+    base = _StackNode(0, 0)
+    state_stack = [0]
+    node_stack = []
+    frontier = None
+
+    tokens = iter(tokens)
+    position = 0
+
+    while True:
+        try:
+            lookahead_token = next(tokens)
+        except StopIteration:
+            lookahead_token, lookahead_symbol, lookahead_value = (
+                None,
+                EOF,
+                None,
+            )
+        else:
+            lookahead_symbol = token_symbol(lookahead_token)
+            lookahead_value = token_value(lookahead_token)
+
+        lookahead = terminal_ids.get(lookahead_symbol)
+        if lookahead is None:
+            _raise_parse_error(
+                parse_table,
+                (
+                    _state_stack(base)[:-1] + state_stack
+                    if frontier is None
+                    else _state_stack(next(iter(frontier.values())))
+                ),
+                lookahead_token,
+                lookahead_symbol,
+            )
+
+        leaf = ForestNode(
+            lookahead_symbol,
+            position,
+            position + 1,
+            lookahead_token,
+            lookahead_value,
+            None,
+        )
+
+        while frontier is None:
+            state = state_stack[-1]
+            act = action_table[state * n_terminals + lookahead]
+
+            # Shift
+            if act > 0:
+                state_stack.append(act)
+                node_stack.append(leaf)
+                break
+
+            if act < 0:
+                production_index = ~act
+
+                # Accept
+                if production_index == 0:
+                    if node_stack:
+                        return node_stack[-1]
+                    return base.links[0][1]
+
+                # Reduce, if the whole of the production is on the linear
+                # part of the stack.
+                length = production_lengths[production_index]
+                if length < len(state_stack):
+                    children = tuple(node_stack[-length:])
+                    del node_stack[-length:]
+                    del state_stack[-length:]
+
+                    lhs = production_lhs[production_index]
+                    node_stack.append(
+                        ForestNode(
+                            nonterminals[lhs],
+                            children[0].start,
+                            position,
+                            None,
+                            None,
+                            [(productions[production_index], children)],
+                        )
+                    )
+                    state_stack.append(
+                        goto_table[state_stack[-1] * n_nonterminals + lhs]
+                    )
+                    continue
+
+            elif state * n_terminals + lookahead not in conflicts:
+                _raise_parse_error(
+                    parse_table,
+                    _state_stack(base)[:-1] + state_stack,
+                    lookahead_token,
+                    lookahead_symbol,
+                )
+
+            # Move the linear part of the stack into the graph structured
+            # stack, and continue from there.
+            top = base
+            for state, forest_node in zip(state_stack[1:], node_stack):
+                vertex = _StackNode(state, forest_node.end)
+                vertex.links.append((top, forest_node))
+                top = vertex
+            frontier = {top.state: top}
+
+        if frontier is None:
+            position += 1
+            continue
+
+        # Reduce.  The grammar is epsilon free, so the vertices at the
+        # current position are only ever linked to vertices at earlier
+        # positions.  New links can therefore only extend the paths that
+        # start from the vertex that they are added to.
+        forest = {}
+        packed = set()
+        queue = [(vertex, None) for vertex in frontier.values()]
+        while queue:
+            vertex, first_link = queue.pop()
+            for act in _actions(vertex.state, lookahead):
+                if act >= ~0:
+                    continue
+
+                production_index = ~act
+                production = productions[production_index]
+                lhs = production_lhs[production_index]
+                length = production_lengths[production_index]
+
+                for below, children in _paths(vertex, length, first_link):
+                    key = (lhs, below.position)
+                    forest_node = forest.get(key)
+                    if forest_node is None:
+                        forest_node = forest[key] = ForestNode(
+                            nonterminals[lhs],
+                            below.position,
+                            position,
+                            None,
+                            None,
+                            [],
+                        )
+                    if (forest_node, production, children) not in packed:
+                        packed.add((forest_node, production, children))
+                        forest_node.alternatives.append((production, children))
+
+                    state = goto_table[below.state * n_nonterminals + lhs]
+                    target = frontier.get(state)
+                    if target is None:
+                        target = frontier[state] = _StackNode(state, position)
+                        target.links.append((below, forest_node))
+                        queue.append((target, None))
+                    elif all(other is not below for other, _ in target.links):
+                        link = (below, forest_node)
+                        target.links.append(link)
+                        queue.append((target, link))
+
+        # Accept
+        if lookahead_symbol is EOF:
+            for vertex in frontier.values():
+                if action_table[vertex.state * n_terminals] == ~0:
+                    return vertex.links[0][1]
+
+        # Shift
+        shifted = {}
+        for vertex in frontier.values():
+            for act in _actions(vertex.state, lookahead):
+                if act > 0:
+                    target = shifted.get(act)
+                    if target is None:
+                        target = shifted[act] = _StackNode(act, position + 1)
+                    target.links.append((vertex, leaf))
+
+        if not shifted:
+            _raise_parse_error(
+                parse_table,
+                _state_stack(next(iter(frontier.values()))),
+                lookahead_token,
+                lookahead_symbol,
+            )
+
+        if len(shifted) == 1:
+            (base,) = shifted.values()
+            state_stack = [base.state]
+            node_stack = []
+            frontier = None
+        else:
+            frontier = shifted
+
+        position += 1
@@ -2,7 +2,8 @@ import enum
 import typing
 from types import MappingProxyType
 
-from lalr.utils import Queue
+from lalr.constants import EOF
+from lalr.utils import Queue, iter_bits
 
 
 class Associativity(enum.Enum):
@@ -42,6 +43,9 @@ class Production(object):
     def __hash__(self):
         return hash(self.name) ^ hash(self.symbols)
 
+    def __reduce__(self):
+        return (type(self), (self.name, self.symbols))
+
     def __repr__(self):
         return "Production({name}, {symbols})".format(
             name=self.name,
@@ -83,17 +87,22 @@ class Right(Precedence):
 
 class Grammar(object):
     def __init__(self, productions, *, precedence_sets=None):
+        # Duplicates are removed, but the original order is preserved so that
+        # symbols are numbered consistently between runs.
+        productions = tuple(dict.fromkeys(productions))
         self._productions = frozenset(productions)
 
-        symbols = set()
+        # A dictionary, used as an ordered set, of all symbols in the order in
+        # which they first appear.
+        symbols = {}
         nonterminals = set()
         # A map from symbols to sets of symbols for which there exist
         # productions where the first symbol is the first element
         has_first_symbol = {}
-        for production in self._productions:
-            symbols.add(production.name)
+        for production in productions:
+            symbols.setdefault(production.name)
             nonterminals.add(production.name)
-            symbols.update(production.symbols)
+            symbols.update(dict.fromkeys(production.symbols))
             has_first_symbol.setdefault(production.symbols[0], set()).add(
                 production.name
             )
@@ -102,14 +111,30 @@ class Grammar(object):
         self._nonterminals = frozenset(nonterminals)
         self._terminals = self._symbols - self._nonterminals
 
-        # A map from symbols to the set of terminals which can appear as the
-        # first terminal in a string that the symbol matches
+        # Terminals are numbered densely so that sets of terminals can be
+        # represented as integer bitmasks.  Index zero is reserved for the end
+        # of file marker, which can appear in lookahead sets but never on the
+        # right hand side of a production.
+        self._indexed_terminals = (
+            EOF,
+            *(symbol for symbol in symbols if symbol in self._terminals),
+        )
+        self._terminal_indexes = MappingProxyType(
+            {
+                terminal: index
+                for index, terminal in enumerate(self._indexed_terminals)
+            }
+        )
+
+        # A map from symbols to a bitmask of the terminals which can appear as
+        # the first terminal in a string that the symbol matches
         first_sets = {}
 
         for terminal in self._terminals:
             # TODO if this is needed it should be folded into the inner loop.
             # kept separate for now so that it's very clear what is happening
-            first_sets[terminal] = {terminal}
+            terminal_bit = 1 << self._terminal_indexes[terminal]
+            first_sets[terminal] = terminal_bit
 
             if terminal not in has_first_symbol:
                 continue
@@ -118,15 +143,12 @@ class Grammar(object):
 
             while queue:
                 nonterminal = queue.pop()
-                first_sets.setdefault(nonterminal, set()).add(terminal)
+                first_sets[nonterminal] = (
+                    first_sets.get(nonterminal, 0) | terminal_bit
+                )
 
                 queue.update(has_first_symbol.get(nonterminal, set()))
-        self._first_sets = MappingProxyType(
-            {
-                nonterminal: frozenset(terminals)
-                for nonterminal, terminals in first_sets.items()
-            }
-        )
+        self._first_sets = MappingProxyType(first_sets)
 
         # There must be a first set for every symbol in the grammar
         assert frozenset(self._first_sets) == frozenset.union(
@@ -134,11 +156,79 @@ class Grammar(object):
         )
 
         # First sets should contain only terminals
-        assert not any(
-            first_set - self._terminals
-            for first_set in self._first_sets.values()
+        assert not any(first_set & 1 for first_set in first_sets.values())
+
+        # Productions are numbered in the order in which they were passed in.
+        self._indexed_productions = productions
+        self._production_indexes = MappingProxyType(
+            {
+                production: index
+                for index, production in enumerate(self._indexed_productions)
+            }
+        )
+
+        # Non-terminals are numbered densely, in order of first appearance.
+        self._indexed_nonterminals = tuple(
+            symbol for symbol in symbols if symbol in self._nonterminals
+        )
+        self._nonterminal_indexes = MappingProxyType(
+            {
+                nonterminal: index
+                for index, nonterminal in enumerate(self._indexed_nonterminals)
+            }
         )
 
+        # A map from non-terminals to the productions that expand them, and
+        # a map from symbols to the productions with the symbol on their right
+        # hand side.
+        productions_by_name = {}
+        productions_containing = {}
+        for production in productions:
+            productions_by_name.setdefault(production.name, []).append(
+                production
+            )
+            for symbol in dict.fromkeys(production.symbols):
+                productions_containing.setdefault(symbol, []).append(
+                    production
+                )
+        self._productions_by_name = MappingProxyType(
+            {
+                name: frozenset(name_productions)
+                for name, name_productions in productions_by_name.items()
+            }
+        )
+        self._productions_containing = MappingProxyType(
+            {
+                symbol: frozenset(symbol_productions)
+                for symbol, symbol_productions in productions_containing.items()
+            }
+        )
+
+        # A map from symbols to a bitmask of the terminals that can appear
+        # immediately after them.  Anything that can follow a non-terminal can
+        # also follow the last symbol in each of its productions.
+        follow_sets = dict.fromkeys(symbols, 0)
+        last_symbols = {}
+        for production in productions:
+            for symbol, next_symbol in zip(
+                production.symbols, production.symbols[1:]
+            ):
+                follow_sets[symbol] |= first_sets[next_symbol]
+            last_symbols.setdefault(production.name, set()).add(
+                production.symbols[-1]
+            )
+
+        worklist = list(last_symbols)
+        while worklist:
+            name = worklist.pop()
+            for symbol in last_symbols[name]:
+                follow_set = follow_sets[symbol] | follow_sets[name]
+                if follow_set != follow_sets[symbol]:
+                    follow_sets[symbol] = follow_set
+                    if symbol in last_symbols:
+                        worklist.append(symbol)
+        self._follow_sets = MappingProxyType(follow_sets)
+
         # There should be a first set for every terminal and non-terminal
         assert self._symbols == frozenset(self._first_sets.keys())
 
@@ -196,13 +286,78 @@ class Grammar(object):
         return symbol in self._symbols
 
     def productions(self, name=None):
+        """
+        Returns the set of all productions in the grammar or, if a name is
+        given, the set of productions that expand that non-terminal.
+        """
         if name is None:
             return self._productions
 
+        return self._productions_by_name.get(name, frozenset())
+
+    def indexed_productions(self):
+        """
+        A tuple of all productions, ordered by their index.  Productions are
+        numbered in the order in which they were passed to the grammar.
+        """
+        return self._indexed_productions
+
+    def production_index(self, production):
+        """
+        Returns the dense integer identifier for a production.
+        """
+        return self._production_indexes[production]
+
+    def productions_containing(self, symbol):
+        """
+        Returns the set of productions with the given symbol somewhere on their
+        right hand side.
+        """
+        return self._productions_containing.get(symbol, frozenset())
+
+    def indexed_nonterminals(self):
+        """
+        A tuple of all non-terminals, ordered by their index.
+        """
+        return self._indexed_nonterminals
+
+    def nonterminal_index(self, nonterminal):
+        """
+        Returns the dense integer identifier for a non-terminal symbol.
+        """
+        return self._nonterminal_indexes[nonterminal]
+
+    def indexed_terminals(self):
+        """
+        A tuple of all terminals, ordered by their index.  The first item is
+        always the end of file marker.
+        """
+        return self._indexed_terminals
+
+    def terminal_index(self, terminal):
+        """
+        Returns the dense integer identifier for a terminal symbol, or for the
+        end of file marker, which is always zero.
+        """
+        return self._terminal_indexes[terminal]
+
+    def terminal_mask(self, terminals):
+        """
+        Returns an integer bitmask with the bit corresponding to the index of
+        each of the given terminals set.
+        """
+        mask = 0
+        for terminal in terminals:
+            mask |= 1 << self._terminal_indexes[terminal]
+        return mask
+
+    def masked_terminals(self, mask):
+        """
+        Returns the frozen set of terminals that are included in a bitmask
+        built by :meth:`terminal_mask`.
+        """
         return frozenset(
-            production
-            for production in self._productions
-            if production.name == name
+            self._indexed_terminals[index] for index in iter_bits(mask)
         )
 
     def first_set(self, symbol):
@@ -211,8 +366,28 @@ class Grammar(object):
         a symbol.  If passed a terminal symbol will just return a one item
         set containing the terminal itself.
         """
+        return self.masked_terminals(self._first_sets[symbol])
+
+    def first_set_mask(self, symbol):
+        """
+        Returns the first set of a symbol as a bitmask of terminal indexes.
+        """
         return self._first_sets[symbol]
 
+    def follow_set(self, symbol):
+        """
+        Returns the set of terminals that can appear immediately after a
+        symbol in a string matched by any production in the grammar.  As the
+        grammar has no start symbol, the end of file marker is never included.
+        """
+        return self.masked_terminals(self._follow_sets[symbol])
+
+    def follow_set_mask(self, symbol):
+        """
+        Returns the follow set of a symbol as a bitmask of terminal indexes.
+        """
+        return self._follow_sets[symbol]
+
     def associativity(self, symbol):
         return self._associativities.get(symbol)
 
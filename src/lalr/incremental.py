@@ -0,0 +1,295 @@
+from lalr.parsing import _advance, _default_token_symbol, _default_token_value
+
+
+class _Node(object):
+    """
+    A node in the parse tree kept by :class:`IncrementalParser`.
+
+    Leaves have no production and no children, and hold a token.  Symbols
+    are identified as in the expected symbol table of
+    :class:`lalr.tables.CompiledTables`.
+    """
+
+    __slots__ = (
+        "symbol_id",
+        "production",
+        "token",
+        "value",
+        "children",
+        "parent",
+    )
+
+    def __init__(self, symbol_id, production, token, value, children):
+        self.symbol_id = symbol_id
+        self.production = production
+        self.token = token
+        self.value = value
+        self.children = children
+        self.parent = None
+
+
+class IncrementalParser(object):
+    """
+    Parses a sequence of tokens, and then efficiently reparses it after parts
+    of it are replaced.
+
+    The parser keeps the tree of reductions from the last parse.  The
+    configuration of the parser before any token, its state and result
+    stacks, can be recovered from the tree, so after an edit, parsing resumes
+    from the configuration just before the first changed token.  Once the new
+    tokens have been consumed, parsing continues only until the configuration
+    lines up with the one the previous parse had at the same point.  From
+    there on, the previous parse would have made exactly the same reductions.
+    The new subtrees are grafted into the old tree in place of the ones that
+    they replace, and only the actions for the productions enclosing them are
+    rerun.
+
+    Work is proportional to the size of the edit plus the number of
+    reductions that enclose it.  For long left or right recursive lists,
+    this includes one reduction for each item between the edit and the end
+    or start of the list respectively.
+
+    Other arguments are as for :func:`lalr.parse`.  `token_symbol` and
+    `token_value` may be called more than once for each token.  Actions
+    should not have side effects, as the results of previous actions are
+    reused.
+    """
+
+    def _configuration(self, position):
+        """
+        Yields the nodes on the result stack of the last parse just after the
+        token before `position` was shifted, from the top of the stack down.
+        """
+        if position == 0:
+            return
+
+        node = self._leaves[position - 1]
+        yield node
+
+        # Nodes are pushed from left to right, so the nodes below a node on
+        # the stack are its left siblings followed by the left siblings of
+        # each of its ancestors.
+        parent = node.parent
+        while parent is not None:
+            siblings = parent.children
+            index = len(siblings) - 1
+            while siblings[index] is not node:
+                index -= 1
+            for sibling in reversed(siblings[:index]):
+                yield sibling
+            node, parent = parent, parent.parent
+
+    def _lines_up(self, result_stack, position):
+        """
+        Returns true if the result stack of the new parse has the same
+        symbols as the stack of the last parse just before `position`.  The
+        states on the state stacks are determined by the symbols, so they
+        will also match.
+        """
+        depth = len(result_stack)
+        for node in self._configuration(position):
+            depth -= 1
+            if depth < 0:
+                return False
+            if result_stack[depth] is node:
+                # Nodes below this point are shared.
+                return True
+            if result_stack[depth].symbol_id != node.symbol_id:
+                return False
+        return depth == 0
+
+    def _commit_reparse(self, start, end, leaves, created, replaced=None):
+        # Find the nodes that enclose replaced nodes, and so need their
+        # actions to be rerun.
+        dirty = set()
+        for node in replaced or ():
+            parent = node.parent
+            while parent is not None and parent not in dirty:
+                dirty.add(parent)
+                parent = parent.parent
+
+        # Rerun the actions in the order that the reductions would happen in
+        # a full parse, children before parents and from left to right.
+        # Nothing is modified until all of the actions have succeeded.
+        values = {}
+        if dirty:
+            order = []
+            stack = [self._root]
+            while stack:
+                node = stack.pop()
+                order.append(node)
+                stack.extend(
+                    child for child in node.children if child in dirty
+                )
+
+            for node in reversed(order):
+                children = [
+                    replaced.get(child, child) for child in node.children
+                ]
+                values[node] = (
+                    children,
+                    self._action(
+                        node.production,
+                        *[
+                            (
+                                values[child][1]
+                                if child in values
+                                else child.value
+                            )
+                            for child in children
+                        ],
+                    ),
+                )
+
+        for node in created:
+            for child in node.children:
+                child.parent = node
+        for old, new in (replaced or {}).items():
+            new.parent = old.parent
+        for node, (children, value) in values.items():
+            node.children = tuple(children)
+            node.value = value
+            for child in children:
+                child.parent = node
+
+        self._leaves[start:end] = leaves
+
+    def _reparse(self, start, end, tokens):
+        tables = self._parse_table._tables
+        terminal_ids = tables.terminal_ids
+        action = self._action
+        token_symbol = self._token_symbol
+        token_value = self._token_value
+        lhs_ids = self._lhs_ids
+
+        leaves = []
+        created = []
+
+        def _leaf(token):
+            leaf = _Node(
+                terminal_ids.get(token_symbol(token), -1),
+                None,
+                token,
+                token_value(token),
+                (),
+            )
+            leaves.append(leaf)
+            return leaf
+
+        def _reduce(production, *children):
+            node = _Node(
+                lhs_ids[production],
+                production,
+                None,
+                action(production, *[child.value for child in children]),
+                children,
+            )
+            created.append(node)
+            return node
+
+        def _run(tokens, final):
+            return _advance(
+                self._parse_table,
+                state_stack,
+                result_stack,
+                tokens,
+                action=_reduce,
+                token_symbol=token_symbol,
+                token_value=_leaf,
+                final=final,
+            )
+
+        # Restore the configuration from just before the edit.
+        result_stack = list(self._configuration(start))
+        result_stack.reverse()
+        state_stack = [0]
+        for node in result_stack:
+            if node.production is None:
+                state = tables.action(state_stack[-1], node.symbol_id)
+            else:
+                state = tables.goto(
+                    state_stack[-1], node.symbol_id - len(tables.terminals)
+                )
+            state_stack.append(state)
+
+        _run(tokens, False)
+
+        # Feed the tokens after the edit one at a time until the parse lines
+        # up with the last one.  On the first parse there is nothing to line
+        # up with, so the end of file is always fed, even for empty input.
+        position = end
+        while self._root is None or not self._lines_up(result_stack, position):
+            if position == len(self._leaves):
+                root = _run((), True)
+                self._commit_reparse(start, position, leaves, created)
+                self._root = root
+                return
+            _run((self._leaves[position].token,), False)
+            position += 1
+
+        # Graft the new nodes into the old tree in place of the nodes of the
+        # last parse that they replace.
+        replaced = {}
+        depth = len(result_stack)
+        for node in self._configuration(position):
+            depth -= 1
+            if result_stack[depth] is node:
+                break
+            replaced[node] = result_stack[depth]
+
+        self._commit_reparse(start, position, leaves, created, replaced)
+
+    def __init__(
+        self,
+        parse_table,
+        tokens,
+        *,
+        action,
+        token_symbol=_default_token_symbol,
+        token_value=_default_token_value,
+    ):
+        self._parse_table = parse_table
+        self._action = action
+        self._token_symbol = token_symbol
+        self._token_value = token_value
+
+        tables = parse_table._tables
+        self._lhs_ids = {
+            production: len(tables.terminals) + lhs
+            for production, lhs in zip(
+                tables.productions, tables.production_lhs
+            )
+        }
+
+        self._leaves = []
+        self._root = None
+
+        self._reparse(0, 0, list(tokens))
+
+    @property
+    def result(self):
+        """
+        The result of the action for the target production.
+        """
+        return self._root.value
+
+    @property
+    def tokens(self):
+        """
+        The current list of tokens.
+        """
+        return [leaf.token for leaf in self._leaves]
+
+    def update(self, start, end, tokens):
+        """
+        Replaces the tokens between `start` and `end` with new tokens,
+        reparses, and returns the new result.
+
+        If the new tokens can't be parsed then a
+        :class:`lalr.exceptions.ParseError` is raised, and the parser is left
+        unchanged.
+        """
+        if not 0 <= start <= end <= len(self._leaves):
+            raise IndexError("edit out of range")
+        self._reparse(start, end, list(tokens))
+        return self.result
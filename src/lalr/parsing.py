@@ -1,3 +1,15 @@
+import asyncio
+import inspect
+
+from lalr.actions import (
+    _APPEND,
+    _CALL,
+    _CHILD,
+    _KEEP_LAST,
+    _MAKE_LIST,
+    Actions,
+)
+from lalr.compression import CompressedTables
 from lalr.constants import EOF
 from lalr.exceptions import ParseError
 
@@ -19,6 +31,401 @@ def _default_token_value(token):
     return token
 
 
+def _raise_parse_error(
+    parse_table, state_stack, lookahead_token, lookahead_symbol
+):
+    tables = parse_table._tables
+    production_lhs = tables.production_lhs
+    production_lengths = tables.production_lengths
+
+    state = state_stack[-1]
+
+    # Any symbol that can be shifted in the current state.
+    expected_symbols = {
+        tables.symbol(symbol_id) for symbol_id in tables.expected(state)
+    }
+
+    # Symbols that can be shifted after the reductions for each terminal that
+    # the current state reduces on.  The reductions are followed without
+    # copying the state stack: `pushed` holds the states added by the
+    # reductions, on top of the first `depth` states of the real stack.
+    for terminal in tables.reducing(state):
+        depth = len(state_stack)
+        pushed = []
+        top = state
+        act = tables.action(top, terminal)
+        while act < ~0:
+            production_index = ~act
+            length = production_lengths[production_index]
+            if length < len(pushed):
+                del pushed[-length:]
+            else:
+                depth -= length - len(pushed)
+                pushed = []
+            below = pushed[-1] if pushed else state_stack[depth - 1]
+            top = tables.goto(below, production_lhs[production_index])
+            pushed.append(top)
+            act = tables.action(top, terminal)
+
+        for symbol_id in tables.expected(top):
+            expected_symbols.add(tables.symbol(symbol_id))
+
+    if expected_symbols:
+        message = (
+            f"expected {_or_list(expected_symbols)} "
+            f"before {lookahead_token if lookahead_symbol is not EOF else 'EOF'}"
+        )
+    else:
+        message = f"expected EOF instead of {lookahead_symbol}"
+
+    raise ParseError(
+        message,
+        lookahead_token=lookahead_token,
+        expected_symbols=expected_symbols,
+    )
+
+
+def _advance_dispatch(
+    parse_table,
+    state_stack,
+    result_stack,
+    tokens,
+    *,
+    actions,
+    token_symbol,
+    token_value,
+    final,
+):
+    """
+    A copy of the parser loop in :func:`_advance` that computes the value for
+    each reduction from the handlers in a :class:`lalr.actions.Actions`
+    registry, rather than calling a single action.
+    """
+    tables = parse_table._tables
+    terminal_ids = tables.terminal_ids
+    production_lhs = tables.production_lhs
+    production_lengths = tables.production_lengths
+    action_table = tables.action_table
+    goto_table = tables.goto_table
+    n_terminals = len(tables.terminals)
+    n_nonterminals = len(tables.nonterminals)
+
+    kinds, handlers, offsets = actions._resolve(tables)
+
+    tokens = iter(tokens)
+
+    state = state_stack[-1]
+
+    while True:
+        try:
+            lookahead_token = next(tokens)
+        except StopIteration:
+            if not final:
+                return None
+            lookahead_token, lookahead_symbol, lookahead_value = (
+                None,
+                EOF,
+                None,
+            )
+        else:
+            lookahead_symbol = token_symbol(lookahead_token)
+            lookahead_value = token_value(lookahead_token)
+
+        lookahead = terminal_ids.get(lookahead_symbol)
+        if lookahead is None:
+            _raise_parse_error(
+                parse_table, state_stack, lookahead_token, lookahead_symbol
+            )
+
+        while True:
+            act = action_table[state * n_terminals + lookahead]
+
+            # Shift
+            if act > 0:
+                state = act
+                state_stack.append(state)
+                result_stack.append(lookahead_value)
+                break
+
+            # Error
+            if act == 0:
+                _raise_parse_error(
+                    parse_table, state_stack, lookahead_token, lookahead_symbol
+                )
+
+            production_index = ~act
+
+            # Accept
+            if production_index == 0:
+                assert len(result_stack) == 1
+                return result_stack[0]
+
+            # Reduce
+            #
+            # Values that are passed through from the last symbol are left
+            # where they are on the stack.  Everything else is computed
+            # before the stack is modified, as in `_advance`.
+            length = production_lengths[production_index]
+            kind = kinds[production_index]
+            if kind == _KEEP_LAST:
+                if length > 1:
+                    del result_stack[-length:-1]
+            else:
+                if kind == _CALL:
+                    value = handlers[production_index](*result_stack[-length:])
+                elif kind == _CHILD:
+                    value = result_stack[offsets[production_index]]
+                elif kind == _APPEND:
+                    list_offset, item_offset = offsets[production_index]
+                    value = result_stack[list_offset]
+                    value.append(result_stack[item_offset])
+                elif kind == _MAKE_LIST:
+                    value = [
+                        result_stack[offset]
+                        for offset in offsets[production_index]
+                    ]
+                else:
+                    value = None
+                del result_stack[-length:]
+                result_stack.append(value)
+
+            del state_stack[-length:]
+            state = goto_table[
+                state_stack[-1] * n_nonterminals
+                + production_lhs[production_index]
+            ]
+            state_stack.append(state)
+
+
+def _advance_compressed(
+    parse_table,
+    state_stack,
+    result_stack,
+    tokens,
+    *,
+    action,
+    token_symbol,
+    token_value,
+    final,
+):
+    """
+    A copy of the parser loop in :func:`_advance` that reads actions and gotos
+    from :class:`lalr.compression.CompressedTables`.
+    """
+    tables = parse_table._tables
+    terminal_ids = tables.terminal_ids
+    productions = tables.productions
+    production_lhs = tables.production_lhs
+    production_lengths = tables.production_lengths
+    action_default = tables.action_default
+    action_base = tables.action_base
+    action_check = tables.action_check
+    action_next = tables.action_next
+    goto_base = tables.goto_base
+    goto_next = tables.goto_next
+
+    tokens = iter(tokens)
+
+    state = state_stack[-1]
+
+    while True:
+        try:
+            lookahead_token = next(tokens)
+        except StopIteration:
+            if not final:
+                return None
+            lookahead_token, lookahead_symbol, lookahead_value = (
+                None,
+                EOF,
+                None,
+            )
+        else:
+            lookahead_symbol = token_symbol(lookahead_token)
+            lookahead_value = token_value(lookahead_token)
+
+        lookahead = terminal_ids.get(lookahead_symbol)
+        if lookahead is None:
+            _raise_parse_error(
+                parse_table, state_stack, lookahead_token, lookahead_symbol
+            )
+
+        while True:
+            base = action_base[state]
+            if action_check[base + lookahead] == base:
+                act = action_next[base + lookahead]
+            else:
+                act = action_default[state]
+
+            # Shift
+            if act > 0:
+                state = act
+                state_stack.append(state)
+                result_stack.append(lookahead_value)
+                break
+
+            # Error
+            if act == 0:
+                _raise_parse_error(
+                    parse_table, state_stack, lookahead_token, lookahead_symbol
+                )
+
+            production_index = ~act
+
+            # Accept
+            if production_index == 0:
+                assert len(result_stack) == 1
+                return result_stack[0]
+
+            # Reduce
+            length = production_lengths[production_index]
+            value = action(
+                productions[production_index], *result_stack[-length:]
+            )
+            del result_stack[-length:]
+            result_stack.append(value)
+
+            del state_stack[-length:]
+
+            # Gotos are always defined after a reduction, so there is no need
+            # to consult the check array.
+            state = goto_next[
+                goto_base[state_stack[-1]] + production_lhs[production_index]
+            ]
+            state_stack.append(state)
+
+
+def _advance(
+    parse_table,
+    state_stack,
+    result_stack,
+    tokens,
+    *,
+    action,
+    token_symbol,
+    token_value,
+    final,
+):
+    """
+    Runs the parser automaton, starting from the configuration on the state
+    and result stacks, until the tokens are exhausted.  If `final` is true,
+    this is followed by the end of file, and the final result is returned.
+    The stacks are updated in place.
+
+    Actions are called before the stacks are modified for the reduction, so
+    if an action raises an exception the stacks are left as they were just
+    before the reduction began.
+    """
+    tables = parse_table._tables
+    if isinstance(tables, CompressedTables):
+        return _advance_compressed(
+            parse_table,
+            state_stack,
+            result_stack,
+            tokens,
+            action=action,
+            token_symbol=token_symbol,
+            token_value=token_value,
+            final=final,
+        )
+
+    if isinstance(action, Actions):
+        return _advance_dispatch(
+            parse_table,
+            state_stack,
+            result_stack,
+            tokens,
+            actions=action,
+            token_symbol=token_symbol,
+            token_value=token_value,
+            final=final,
+        )
+
+    terminal_ids = tables.terminal_ids
+    productions = tables.productions
+    production_lhs = tables.production_lhs
+    production_lengths = tables.production_lengths
+    action_table = tables.action_table
+    goto_table = tables.goto_table
+    n_terminals = len(tables.terminals)
+    n_nonterminals = len(tables.nonterminals)
+
+    tokens = iter(tokens)
+
+    state = state_stack[-1]
+
+    while True:
+        try:
+            lookahead_token = next(tokens)
+        except StopIteration:
+            if not final:
+                return None
+            lookahead_token, lookahead_symbol, lookahead_value = (
+                None,
+                EOF,
+                None,
+            )
+        else:
+            lookahead_symbol = token_symbol(lookahead_token)
+            lookahead_value = token_value(lookahead_token)
+
+        lookahead = terminal_ids.get(lookahead_symbol)
+        if lookahead is None:
+            _raise_parse_error(
+                parse_table, state_stack, lookahead_token, lookahead_symbol
+            )
+
+        while True:
+            act = action_table[state * n_terminals + lookahead]
+
+            # Shift
+            if act > 0:
+                state = act
+                state_stack.append(state)
+                result_stack.append(lookahead_value)
+                break
+
+            # Error
+            if act == 0:
+                _raise_parse_error(
+                    parse_table, state_stack, lookahead_token, lookahead_symbol
+                )
+
+            production_index = ~act
+
+            # Accept
+            if production_index == 0:
+                assert len(result_stack) == 1
+                return result_stack[0]
+
+            # Reduce
+            #
+            # Pass the results for each of the symbols making up the
+            # production to the action, and replace them on the stack with
+            # the result.  The grammar is epsilon free, so every production
+            # has at least one symbol.
+            length = production_lengths[production_index]
+            value = action(
+                productions[production_index], *result_stack[-length:]
+            )
+            del result_stack[-length:]
+            result_stack.append(value)
+
+            # Remove the intermediate states that have been added since the
+            # production started.  These are no longer needed as they cannot
+            # now appear just before the start of a new symbol.
+            del state_stack[-length:]
+
+            # The top of the stack is now a state that contains an item with
+            # the cursor just before the symbol that was just parsed.  From
+            # here we essentially do a shift, but with a non-terminal not a
+            # terminal.
+            state = goto_table[
+                state_stack[-1] * n_nonterminals
+                + production_lhs[production_index]
+            ]
+            state_stack.append(state)
+
+
 def parse(
     parse_table,
     tokens,
@@ -51,125 +458,183 @@ def parse(
         should be pushed onto the result stack when the token is shifted.  The
         default implementation just returns the token.
     """
-    tokens = iter(tokens)
-    lookahead_token = None
-    lookahead_symbol = None
-    lookahead_value = None
+    return _advance(
+        parse_table,
+        [0],
+        [],
+        tokens,
+        action=action,
+        token_symbol=token_symbol,
+        token_value=token_value,
+        final=True,
+    )
+
+
+class Parser(object):
+    """
+    A push parser.  Rather than pulling tokens from an iterator, the parser
+    is fed tokens as they become available and keeps its state between calls.
 
-    state_stack = [parse_table.start_state()]
-    result_stack = []
+    Arguments are as for :func:`parse`.  Actions are invoked as soon as the
+    tokens that they depend on have been fed.
 
-    def _top():
-        return state_stack[-1]
+    If any call raises an exception, including a :class:`ParseError`, the
+    parser can not be used any further.
+    """
+
+    __slots__ = (
+        "_parse_table",
+        "_action",
+        "_token_symbol",
+        "_token_value",
+        "_state_stack",
+        "_result_stack",
+    )
+
+    def __init__(
+        self,
+        parse_table,
+        *,
+        action,
+        token_symbol=_default_token_symbol,
+        token_value=_default_token_value,
+    ):
+        self._parse_table = parse_table
+        self._action = action
+        self._token_symbol = token_symbol
+        self._token_value = token_value
+        self._state_stack = [0]
+        self._result_stack = []
+
+    def feed(self, token):
+        """
+        Advances the parser by a single token.
+        """
+        self.feed_many((token,))
+
+    def _run(self, tokens, *, final):
+        if self._state_stack is None:
+            raise ValueError("parser has already finished or failed")
 
-    def _advance():
         try:
-            token = next(tokens)
-        except StopIteration:
-            token, symbol, value = None, EOF, None
-        else:
-            symbol, value = token_symbol(token), token_value(token)
-
-        # We modify the state variables at the end of the function to avoid
-        # partially clobbering them as a result of an error in either of the
-        # token lookup functions.
-        nonlocal lookahead_token, lookahead_symbol, lookahead_value
-        lookahead_token, lookahead_symbol, lookahead_value = (
-            token,
-            symbol,
-            value,
-        )
+            result = _advance(
+                self._parse_table,
+                self._state_stack,
+                self._result_stack,
+                tokens,
+                action=self._action,
+                token_symbol=self._token_symbol,
+                token_value=self._token_value,
+                final=final,
+            )
+        except BaseException:
+            self._state_stack = self._result_stack = None
+            raise
 
-    _advance()
-    while True:
-        if lookahead_symbol == EOF and parse_table.accepts(_top()):
-            break
+        if final:
+            self._state_stack = self._result_stack = None
+        return result
 
-        # Shift
-        elif lookahead_symbol in parse_table.shifts(_top()):
-            state_stack.append(
-                parse_table.shifts(_top())[lookahead_symbol],
-            )
+    def feed_many(self, tokens):
+        """
+        Advances the parser by each token in an iterable.
+        """
+        self._run(tokens, final=False)
 
-            result_stack.append(lookahead_value)
+    def finish(self):
+        """
+        Signals the end of the input, and returns the result of the action for
+        the target production.
+        """
+        return self._run((), final=True)
 
-            _advance()
 
-        # Reduce
-        elif lookahead_symbol in parse_table.reductions(_top()):
-            production = parse_table.reductions(_top())[lookahead_symbol]
+class _Suspend(Exception):
+    """
+    Raised by the action wrapper in :func:`parse_async` to unwind the parser
+    loop so that an awaitable can be awaited.
+    """
 
-            # Pull the results for each of the symbols making up the production
-            # from the stack.
-            assert len(result_stack) >= len(production)
-            values = tuple(result_stack[-len(production) :])
-            del result_stack[-len(production) :]
+    def __init__(self, awaitable):
+        super().__init__(awaitable)
+        self.awaitable = awaitable
 
-            value = action(production, *values)
-            result_stack.append(value)
 
-            # Remove the intermediate states that have been added since the
-            # production started.  These are no longer needed as they cannot
-            # now appear just before the start of a new symbol.
-            assert len(state_stack) > len(production)
-            del state_stack[-len(production) :]
+async def _yield_result(result):
+    if inspect.isawaitable(result):
+        result = await result
+    await asyncio.sleep(0)
+    return result
 
-            # The top of the stack is now a state that contains an item with
-            # the cursor just before the symbol that was just parsed.  From
-            # here we essentially do a shift, but with a non-terminal not a
-            # terminal.
-            state_stack.append(
-                parse_table.gotos(_top())[production.name],
-            )
 
-        else:
-            expected_tokens = {
-                *parse_table.shifts(_top()),
-                *parse_table.reductions(_top()),
-            }
-            expected_symbols = set()
-
-            for token in expected_tokens:
-                state_stack_ = list(state_stack)
-
-                # Apply as many reductions as possible with the candidate
-                # lookahead token.
-                while True:
-                    if token not in parse_table.reductions(state_stack_[-1]):
-                        break
-
-                    if token == EOF:
-                        break
-
-                    production = parse_table.reductions(state_stack_[-1])[
-                        token
-                    ]
+async def parse_async(
+    parse_table,
+    tokens,
+    *,
+    action,
+    token_symbol=_default_token_symbol,
+    token_value=_default_token_value,
+    reduction_budget=1000,
+):
+    """
+    Parses tokens from an asynchronous iterable.
+
+    Arguments are as for :func:`parse`, except that `tokens` should be an
+    async iterable and that `action` may return an awaitable, which will be
+    awaited before parsing continues.  `token_symbol` and `token_value` may
+    be called more than once for each token.
+
+    :param reduction_budget:
+        The number of reductions after which control is returned to the event
+        loop, so that parsing a large document does not block other tasks.
+        Set to `None` to only yield while waiting for tokens or actions.
+    """
+    state_stack = [0]
+    result_stack = []
 
-                    del state_stack_[-len(production) :]
-                    state_stack_.append(
-                        parse_table.gotos(state_stack_[-1])[production.name]
-                    )
-
-                # Find all symbols that can follow it at the same level of
-                # abstraction.
-                for item in parse_table.item_set(state_stack_[-1]).kernel:
-                    if not item.expected:
-                        continue
-                    expected_symbols.add(item.expected[0])
-
-            if expected_symbols:
-                message = (
-                    f"expected {_or_list(expected_symbols)} "
-                    f"before {lookahead_token if lookahead_symbol is not EOF else 'EOF'}"
+    # The results of an interrupted reduction, to be returned when the parser
+    # loop retries it.
+    pending = []
+    reductions = 0
+
+    def _action(production, *values):
+        nonlocal reductions
+
+        if pending:
+            return pending.pop()
+
+        result = action(production, *values)
+
+        reductions += 1
+        if reduction_budget is not None and reductions >= reduction_budget:
+            reductions = 0
+            raise _Suspend(_yield_result(result))
+
+        if inspect.isawaitable(result):
+            raise _Suspend(result)
+
+        return result
+
+    async def _run(tokens, *, final):
+        while True:
+            try:
+                return _advance(
+                    parse_table,
+                    state_stack,
+                    result_stack,
+                    tokens,
+                    action=_action,
+                    token_symbol=token_symbol,
+                    token_value=token_value,
+                    final=final,
                 )
-            else:
-                message = f"expected EOF instead of {lookahead_symbol}"
+            except _Suspend as suspend:
+                # Actions are called before anything is removed from the
+                # stacks, so the loop can simply be restarted with the same
+                # lookahead token once the result is available.
+                pending.append(await suspend.awaitable)
 
-            raise ParseError(
-                message,
-                lookahead_token=lookahead_token,
-                expected_symbols=expected_symbols,
-            )
+    async for token in tokens:
+        await _run((token,), final=False)
 
-    assert len(result_stack) == 1
-    return result_stack[0]
+    return await _run((), final=True)
@@ -0,0 +1,192 @@
+from lalr.constants import EOF
+from lalr.parsing import (
+    _default_token_symbol,
+    _default_token_value,
+    _raise_parse_error,
+)
+
+
+class _Frame(object):
+    """
+    An entry in a persistent parser stack.
+
+    Frames are immutable, and each one points to the frame below it, so a
+    single frame identifies the entire configuration of the parser.  Pushing
+    creates a new frame that shares everything below it with the original
+    stack, so taking a snapshot of a configuration costs nothing and
+    configurations that share a prefix share its frames.
+    """
+
+    __slots__ = ("state", "value", "below")
+
+    def __init__(self, state, value, below):
+        self.state = state
+        self.value = value
+        self.below = below
+
+
+# The configuration of a parser that has not yet seen any tokens.
+_START_FRAME = _Frame(0, None, None)
+
+
+def _state_stack(frame):
+    states = []
+    while frame is not None:
+        states.append(frame.state)
+        frame = frame.below
+    states.reverse()
+    return states
+
+
+def _feed(
+    parse_table,
+    frame,
+    lookahead_token,
+    lookahead_symbol,
+    lookahead_value,
+    action,
+):
+    """
+    Advances a persistent parser configuration by one lookahead token.
+
+    Returns the frame after the token has been shifted or, if the lookahead
+    symbol is `EOF`, the frame holding the result of the parse.
+    """
+    tables = parse_table._tables
+    production_lhs = tables.production_lhs
+    production_lengths = tables.production_lengths
+
+    lookahead = tables.terminal_ids.get(lookahead_symbol)
+    if lookahead is None:
+        _raise_parse_error(
+            parse_table, _state_stack(frame), lookahead_token, lookahead_symbol
+        )
+
+    while True:
+        act = tables.action(frame.state, lookahead)
+
+        # Shift
+        if act > 0:
+            return _Frame(act, lookahead_value, frame)
+
+        # Error
+        if act == 0:
+            _raise_parse_error(
+                parse_table,
+                _state_stack(frame),
+                lookahead_token,
+                lookahead_symbol,
+            )
+
+        production_index = ~act
+
+        # Accept
+        if production_index == 0:
+            assert lookahead_symbol is EOF
+            return frame
+
+        # Reduce
+        length = production_lengths[production_index]
+        values = [None] * length
+        for index in range(length - 1, -1, -1):
+            values[index] = frame.value
+            frame = frame.below
+
+        frame = _Frame(
+            tables.goto(frame.state, production_lhs[production_index]),
+            action(tables.productions[production_index], *values),
+            frame,
+        )
+
+
+class PersistentParser(object):
+    """
+    A push parser that can be forked in constant time.
+
+    The parser's stack is a persistent linked list, shared between the parser
+    and any forks of it, rather than a pair of python lists.  Forking copies
+    a reference to the top of the stack, and feeding a token to one fork
+    pushes new entries without touching those that it shares with the
+    others.  This makes it cheap to try several continuations of the same
+    input, or to keep a snapshot to back off to.
+
+    Unlike :class:`lalr.parsing.Parser`, a parser that fails is left as it was
+    before the call that failed, and can continue to be used.
+
+    Arguments are as for :func:`lalr.parse`.  Results of actions are shared
+    between forks, so actions should not modify their arguments.
+    """
+
+    __slots__ = (
+        "_parse_table",
+        "_action",
+        "_token_symbol",
+        "_token_value",
+        "_frame",
+    )
+
+    def __init__(
+        self,
+        parse_table,
+        *,
+        action,
+        token_symbol=_default_token_symbol,
+        token_value=_default_token_value,
+    ):
+        self._parse_table = parse_table
+        self._action = action
+        self._token_symbol = token_symbol
+        self._token_value = token_value
+        self._frame = _START_FRAME
+
+    def fork(self):
+        """
+        Returns a new parser in the same configuration as this one.
+        """
+        forked = object.__new__(type(self))
+        forked._parse_table = self._parse_table
+        forked._action = self._action
+        forked._token_symbol = self._token_symbol
+        forked._token_value = self._token_value
+        forked._frame = self._frame
+        return forked
+
+    def feed(self, token):
+        """
+        Advances the parser by a single token.
+        """
+        self._frame = _feed(
+            self._parse_table,
+            self._frame,
+            token,
+            self._token_symbol(token),
+            self._token_value(token),
+            self._action,
+        )
+
+    def feed_many(self, tokens):
+        """
+        Advances the parser by each token in an iterable.  If any of the
+        tokens can not be parsed, none of them are consumed.
+        """
+        frame = self._frame
+        for token in tokens:
+            frame = _feed(
+                self._parse_table,
+                frame,
+                token,
+                self._token_symbol(token),
+                self._token_value(token),
+                self._action,
+            )
+        self._frame = frame
+
+    def finish(self):
+        """
+        Returns the result of the action for the target production, as if the
+        input ended after the tokens fed so far.  The parser is not changed,
+        and more tokens can still be fed to it.
+        """
+        return _feed(
+            self._parse_table, self._frame, EOF, EOF, None, self._action
+        ).value
@@ -0,0 +1,158 @@
+import collections
+
+from lalr.constants import EOF
+from lalr.parsing import _default_token_symbol, _default_token_value
+from lalr.persistent import _START_FRAME, _feed
+
+
+class _TrieNode(object):
+    """
+    A configuration cached by :class:`PrefixCache`, reached by following the
+    keys of a sequence of tokens from the root of the trie.
+    """
+
+    __slots__ = ("key", "frame", "parent", "children")
+
+    def __init__(self, key, frame, parent):
+        self.key = key
+        self.frame = frame
+        self.parent = parent
+        self.children = {}
+
+
+class PrefixCache(object):
+    """
+    Parses token streams, reusing work done for any prefix that they share
+    with streams that were parsed before.
+
+    After each token is shifted, the configuration of the parser is cached in
+    a trie keyed by the tokens seen so far.  Configurations are stored as
+    persistent stacks, so each one costs a single stack frame and shares the
+    rest with the configuration before it.  Parsing a new stream starts from
+    the configuration after the longest prefix of it that is in the cache.
+    This helps when many inputs begin with the same header or preamble.
+
+    Tokens are identified by the result of `token_key`, which must be
+    hashable.  By default this is a tuple of the token's symbol and value,
+    as two token streams that have the same symbols can only share the values
+    computed for them if the token values also match.
+
+    At most `max_size` configurations are kept.  When the cache is full, the
+    least recently used configurations are evicted.  Each time a stream is
+    parsed, the configurations for its prefixes are marked as used from the
+    longest to the shortest, so a configuration is always at least as recent
+    as any configuration for a longer prefix that extends it.  Eviction
+    therefore only ever removes configurations at the ends of cached
+    prefixes, and never leaves one cut off from the root.
+
+    Other arguments are as for :func:`lalr.parse`.  The results of actions
+    are shared between parses, so actions should not modify their arguments.
+    """
+
+    def __init__(
+        self,
+        parse_table,
+        *,
+        action,
+        token_symbol=_default_token_symbol,
+        token_value=_default_token_value,
+        token_key=None,
+        max_size=100000,
+    ):
+        if max_size < 0:
+            raise ValueError("max_size must not be negative")
+
+        if token_key is None:
+
+            def token_key(token):
+                return token_symbol(token), token_value(token)
+
+        self._parse_table = parse_table
+        self._action = action
+        self._token_symbol = token_symbol
+        self._token_value = token_value
+        self._token_key = token_key
+        self._max_size = max_size
+
+        self._root = _TrieNode(None, _START_FRAME, None)
+
+        # Maps every node in the trie, other than the root, to `None`, from
+        # least to most recently used.
+        self._lru = collections.OrderedDict()
+
+    def clear(self):
+        """
+        Discards all cached configurations.
+        """
+        self._root.children.clear()
+        self._lru.clear()
+
+    def _touch(self, path):
+        lru = self._lru
+
+        # Ancestors are marked as used after their descendants, so that they
+        # are never evicted first.
+        for node in reversed(path):
+            lru[node] = None
+            lru.move_to_end(node)
+
+        while len(lru) > self._max_size:
+            node, _ = lru.popitem(last=False)
+            del node.parent.children[node.key]
+
+    def parse(self, tokens):
+        """
+        Parses a stream of tokens, and returns the result of the action for
+        the target production.
+        """
+        parse_table = self._parse_table
+        action = self._action
+        token_symbol = self._token_symbol
+        token_value = self._token_value
+        token_key = self._token_key
+
+        node = self._root
+        frame = node.frame
+        path = []
+
+        try:
+            for token in tokens:
+                if node is not None:
+                    key = token_key(token)
+                    child = node.children.get(key)
+                    if child is not None:
+                        node = child
+                        frame = child.frame
+                        path.append(child)
+                        continue
+
+                frame = _feed(
+                    parse_table,
+                    frame,
+                    token,
+                    token_symbol(token),
+                    token_value(token),
+                    action,
+                )
+
+                if node is not None:
+                    if len(path) < self._max_size:
+                        child = _TrieNode(key, frame, node)
+                        node.children[key] = child
+                        node = child
+                        path.append(node)
+                    else:
+                        # The rest of the stream could never be cached
+                        # without evicting its own start.
+                        node = None
+
+            return _feed(parse_table, frame, EOF, EOF, None, action).value
+
+        finally:
+            self._touch(path)
+
+    def __len__(self):
+        """
+        Returns the number of cached configurations.
+        """
+        return len(self._lru)
@@ -0,0 +1,164 @@
+from lalr.tables import CompiledTables
+
+
+class Recognition(object):
+    """
+    The result of :func:`recognize`.  This is true if the symbols were
+    accepted, and otherwise `position` is the position of the first symbol
+    that can't be parsed, which is the length of the input if it ended too
+    soon.  `position` is `None` if the symbols were accepted.
+    """
+
+    __slots__ = ("accepted", "position")
+
+    def __init__(self, accepted, position):
+        self.accepted = accepted
+        self.position = position
+
+    def __eq__(self, other):
+        if not isinstance(other, Recognition):
+            return NotImplemented
+        return (self.accepted, self.position) == (
+            other.accepted,
+            other.position,
+        )
+
+    def __hash__(self):
+        return hash((self.accepted, self.position))
+
+    def __bool__(self):
+        return self.accepted
+
+    def __repr__(self):
+        if self.accepted:
+            return "<Recognition accepted>"
+        return f"<Recognition rejected at {self.position}>"
+
+
+# Shared result for accepted inputs.
+_ACCEPTED = Recognition(True, None)
+
+
+def _recognize_compressed(parse_table, symbols):
+    """
+    A copy of the loop in :func:`recognize` that reads actions and gotos
+    through the methods of :class:`lalr.compression.CompressedTables`.
+    """
+    tables = parse_table._tables
+    terminal_ids = tables.terminal_ids
+    production_lhs = tables.production_lhs
+    production_lengths = tables.production_lengths
+    action = tables.action
+    goto = tables.goto
+
+    state_stack = [0]
+
+    position = 0
+    for symbol in symbols:
+        lookahead = terminal_ids.get(symbol)
+        if lookahead is None:
+            return Recognition(False, position)
+
+        while True:
+            act = action(state_stack[-1], lookahead)
+            if act > 0:
+                state_stack.append(act)
+                break
+            if act >= ~0:
+                return Recognition(False, position)
+
+            production_index = ~act
+            del state_stack[-production_lengths[production_index] :]
+            state_stack.append(
+                goto(state_stack[-1], production_lhs[production_index])
+            )
+
+        position += 1
+
+    while True:
+        act = action(state_stack[-1], 0)
+        if act == ~0:
+            return _ACCEPTED
+        if act >= 0:
+            return Recognition(False, position)
+
+        production_index = ~act
+        del state_stack[-production_lengths[production_index] :]
+        state_stack.append(
+            goto(state_stack[-1], production_lhs[production_index])
+        )
+
+
+def recognize(parse_table, symbols):
+    """
+    Checks whether a sequence of symbols is in the language of a parse
+    table, without computing any values.
+
+    Returns a :class:`Recognition`, which is true if the symbols are
+    accepted, and otherwise has the `position` of the first symbol that
+    can't be parsed.
+
+    Unlike :func:`lalr.parse`, this takes symbols rather than tokens, and
+    does not call any user code.  The parser keeps only a stack of states, so
+    it is considerably faster when only a yes or no answer is needed.
+    """
+    tables = parse_table._tables
+    if not isinstance(tables, CompiledTables):
+        return _recognize_compressed(parse_table, symbols)
+
+    terminal_ids = tables.terminal_ids
+    production_lhs = tables.production_lhs
+    production_lengths = tables.production_lengths
+    action_table = tables.action_table
+    goto_table = tables.goto_table
+    n_terminals = len(tables.terminals)
+    n_nonterminals = len(tables.nonterminals)
+
+    state = 0
+    state_stack = [state]
+    push = state_stack.append
+
+    position = 0
+    for symbol in symbols:
+        lookahead = terminal_ids.get(symbol)
+        if lookahead is None:
+            return Recognition(False, position)
+
+        while True:
+            act = action_table[state * n_terminals + lookahead]
+
+            # Shift
+            if act > 0:
+                state = act
+                push(state)
+                break
+
+            # Error.  Accept can only happen on the end of file.
+            if act >= ~0:
+                return Recognition(False, position)
+
+            # Reduce
+            production_index = ~act
+            del state_stack[-production_lengths[production_index] :]
+            state = goto_table[
+                state_stack[-1] * n_nonterminals
+                + production_lhs[production_index]
+            ]
+            push(state)
+
+        position += 1
+
+    # The end of file is always terminal zero.
+    while True:
+        act = action_table[state * n_terminals]
+        if act == ~0:
+            return _ACCEPTED
+        if act >= 0:
+            return Recognition(False, position)
+
+        production_index = ~act
+        del state_stack[-production_lengths[production_index] :]
+        state = goto_table[
+            state_stack[-1] * n_nonterminals + production_lhs[production_index]
+        ]
+        push(state)
@@ -0,0 +1,175 @@
+import itertools
+
+from lalr.constants import EOF, ERROR
+from lalr.exceptions import ParseError
+from lalr.parsing import _advance, _default_token_symbol, _default_token_value
+
+# The number of tokens that must be shifted after recovering from an error
+# before another error is reported.  Errors before then are most likely
+# caused by the first, and are dealt with by discarding the token.
+_QUIET_TOKENS = 3
+
+_END = object()
+
+
+def parse_with_recovery(
+    parse_table,
+    tokens,
+    *,
+    action,
+    token_symbol=_default_token_symbol,
+    token_value=_default_token_value,
+    sync_symbols=(),
+):
+    """
+    Parses a sequence of tokens, recovering from syntax errors so that every
+    error can be reported in a single pass.  Returns a tuple of the result of
+    the action for the target production and a list of
+    :class:`lalr.exceptions.ParseError` objects, one for each error.
+
+    Recovery follows yacc.  Productions can include the
+    :data:`lalr.constants.ERROR` pseudo-terminal, for example
+    `Production("statement", (ERROR, "semicolon"))`.  After an error, states
+    are popped off the stack until one is found that can shift `ERROR`.
+    `ERROR` is then shifted, with the `ParseError` as its value, and tokens
+    are discarded until one can be parsed.  No further errors are reported
+    until three tokens have been shifted successfully.
+
+    If no state on the stack can shift `ERROR`, the parser falls back to panic
+    mode.  Tokens are discarded until one of the terminals in `sync_symbols`
+    is found, and states are popped until one is found that has an action
+    for it.  The values for the discarded tokens and states are lost.
+
+    If the parser can not recover, the result is `None` and the last error in
+    the list is the one that it could not recover from.
+
+    Other arguments are as for :func:`lalr.parse`.
+    """
+    tables = parse_table._tables
+    terminal_ids = tables.terminal_ids
+
+    error_terminal = terminal_ids.get(ERROR)
+    sync_terminals = {
+        terminal_ids[symbol]
+        for symbol in sync_symbols
+        if symbol in terminal_ids
+    }
+    # The end of the input is always a synchronizing token, as panic mode
+    # can not discard it.
+    sync_terminals.add(terminal_ids[EOF])
+
+    state_stack = [0]
+    result_stack = []
+    errors = []
+
+    exhausted = False
+
+    def _remaining():
+        nonlocal exhausted
+        yield from tokens
+        exhausted = True
+
+    remaining = _remaining()
+    source = remaining
+    quiet = 0
+
+    # The token that caused the last error, to be retried after recovering.
+    lookahead_token = None
+
+    def _run(tokens, final):
+        return _advance(
+            parse_table,
+            state_stack,
+            result_stack,
+            tokens,
+            action=action,
+            token_symbol=token_symbol,
+            token_value=token_value,
+            final=final,
+        )
+
+    def _resynchronize(depth, target):
+        del state_stack[depth + 1 :]
+        del result_stack[depth:]
+        if target is not None:
+            state_stack.append(target)
+            result_stack.append(errors[-1])
+
+    while True:
+        try:
+            if not quiet:
+                return _run(source, True), errors
+
+            # Feed tokens one at a time while errors are being suppressed.
+            token = next(source, _END)
+            if token is _END:
+                return _run((), True), errors
+            _run((token,), False)
+            quiet -= 1
+            continue
+
+        except ParseError as error:
+            if exhausted:
+                if quiet:
+                    errors.append(error)
+                    return None, errors
+                lookahead_token = None
+            else:
+                if quiet:
+                    # Discard the token.
+                    continue
+                lookahead_token = error.lookahead_token
+            errors.append(error)
+
+        # Pop states until one can shift `ERROR`.
+        if error_terminal is not None:
+            for depth in range(len(state_stack) - 1, -1, -1):
+                target = tables.action(state_stack[depth], error_terminal)
+                if target > 0:
+                    break
+            else:
+                target = None
+
+            if target is not None:
+                _resynchronize(depth, target)
+                source = (
+                    remaining
+                    if exhausted
+                    else itertools.chain((lookahead_token,), remaining)
+                )
+                quiet = _QUIET_TOKENS
+                continue
+
+        if not sync_symbols:
+            return None, errors
+
+        # Panic mode.  Discard tokens up to the next synchronizing token, and
+        # pop states until one is found that has an action for it.
+        while True:
+            if exhausted:
+                terminal = terminal_ids[EOF]
+            else:
+                terminal = terminal_ids.get(token_symbol(lookahead_token))
+
+            if terminal in sync_terminals:
+                for depth in range(len(state_stack) - 1, -1, -1):
+                    if tables.action(state_stack[depth], terminal) != 0:
+                        break
+                else:
+                    depth = None
+
+                if depth is not None:
+                    _resynchronize(depth, None)
+                    break
+
+                if exhausted:
+                    return None, errors
+
+            lookahead_token = next(remaining, _END)
+
+        source = (
+            remaining
+            if exhausted
+            else itertools.chain((lookahead_token,), remaining)
+        )
+        quiet = _QUIET_TOKENS
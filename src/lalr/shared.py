@@ -0,0 +1,66 @@
+import mmap
+import os
+
+
+def _shared_memory_module():
+    # Imported lazily as `multiprocessing.shared_memory` is only available
+    # from python 3.8.
+    try:
+        from multiprocessing import shared_memory
+    except ImportError:  # pragma: no cover
+        raise RuntimeError(
+            "shared memory requires python 3.8 or later.  Use a memory mapped "
+            "file with `ParseTable.from_buffer` instead"
+        )
+    return shared_memory
+
+
+def create(data, name=None):
+    """
+    Returns a new :class:`multiprocessing.shared_memory.SharedMemory` block
+    containing a copy of `data`.
+    """
+    shared_memory = _shared_memory_module()
+
+    block = shared_memory.SharedMemory(name=name, create=True, size=len(data))
+    block.buf[: len(data)] = data
+    return block
+
+
+def attach(name):
+    """
+    Maps the existing shared memory block with the given name into memory.
+    Returns a bytes-like object for its contents and an object that must be
+    kept alive for as long as the contents are in use.
+
+    Attaching to a block does not register it with the resource tracker, so
+    the block will not be unlinked when the current process exits.  That is
+    left to the process that created it.
+    """
+    shared_memory = _shared_memory_module()
+
+    if os.name != "posix":
+        block = shared_memory.SharedMemory(name=name)
+        return block.buf, block
+
+    # `SharedMemory` registers every block that it opens with the resource
+    # tracker, which unlinks them when the process that opened them exits.
+    # This is done even if the block was created by another process, so the
+    # block is mapped directly, as `SharedMemory` would.  `_posixshmem` is
+    # private, so if it goes away the block is opened normally and then
+    # unregistered from the resource tracker instead.
+    try:
+        import _posixshmem  # type: ignore
+    except ImportError:  # pragma: no cover
+        from multiprocessing import resource_tracker
+
+        block = shared_memory.SharedMemory(name=name)
+        resource_tracker.unregister("/" + name, "shared_memory")
+        return block.buf, block
+
+    fd = _posixshmem.shm_open("/" + name, os.O_RDWR, mode=0o600)
+    try:
+        contents = mmap.mmap(fd, os.fstat(fd).st_size)
+    finally:
+        os.close(fd)
+    return contents, contents
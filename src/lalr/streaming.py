@@ -0,0 +1,265 @@
+import itertools
+import typing
+import weakref
+
+from lalr.exceptions import ParseError
+from lalr.parsing import _advance, _default_token_symbol, _default_token_value
+
+# The number of tokens passed to the parser loop at a time.  Events are
+# collected while the loop runs and yielded in between, so this bounds both
+# the delay before an event is seen and the number of events held at once.
+_BATCH_SIZE = 256
+
+
+def _tuple_action(production, *values):
+    return values
+
+
+def _enclosed(productions, names):
+    """
+    Returns the set of non-terminals that can be derived from any of the
+    non-terminals in `names`, including the non-terminals themselves.
+    """
+    children = {}
+    for production in productions:
+        children.setdefault(production.name, set()).update(production.symbols)
+
+    enclosed = set()
+    queue = list(names)
+    while queue:
+        name = queue.pop()
+        if name in enclosed or name not in children:
+            continue
+        enclosed.add(name)
+        queue.extend(children[name])
+    return enclosed
+
+
+# Maps from parse tables to a tuple of the result of `_predecessors` and a
+# dictionary mapping from sets of emitted non-terminals to the result of
+# `_needed_states`.
+_needed_cache: "weakref.WeakKeyDictionary[typing.Any, typing.Any]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def _predecessors(tables):
+    """
+    Returns a list, indexed by state, of the sets of states with a shift or
+    goto to that state.
+    """
+    n_states = tables.n_states
+    predecessors = [set() for _ in range(n_states)]
+    for state in range(n_states):
+        for terminal in range(len(tables.terminals)):
+            target = tables.action(state, terminal)
+            if target > 0:
+                predecessors[target].add(state)
+        for nonterminal in range(len(tables.nonterminals)):
+            target = tables.goto(state, nonterminal)
+            if target:
+                predecessors[target].add(state)
+    return predecessors
+
+
+def _needed_states(parse_table, emitted):
+    """
+    Returns the set of states that are entered by pushing a value that might
+    end up as part of the value of one of the `emitted` non-terminals.
+
+    A value is popped by a reduction in a state further along a path of
+    transitions from the state it was pushed on entering.  It becomes part
+    of the value of the production, which is either emitted or is itself
+    pushed on taking the goto from the state at the start of the path.  The
+    states are found by walking back from every reduction in the action
+    table, and propagating backwards until nothing changes.  Walking back
+    may find paths that the parser can never take, so this errs towards
+    keeping values.
+
+    Results are cached for each parse table and set of emitted non-terminals.
+    """
+    tables = parse_table._tables
+    emitted = frozenset(emitted)
+
+    cached = _needed_cache.get(parse_table)
+    if cached is None:
+        cached = _needed_cache[parse_table] = (_predecessors(tables), {})
+    predecessors, results = cached
+    if emitted in results:
+        return results[emitted]
+
+    n_states = tables.n_states
+    production_lhs = tables.production_lhs
+    production_lengths = tables.production_lengths
+
+    # Maps from a state and a number of steps to the set of states that many
+    # transitions back.
+    back_cache = {}
+
+    def _back(state, steps):
+        key = (state, steps)
+        states = back_cache.get(key)
+        if states is None:
+            if steps == 0:
+                states = frozenset((state,))
+            else:
+                states = frozenset().union(
+                    *(
+                        _back(predecessor, steps - 1)
+                        for predecessor in predecessors[state]
+                    )
+                )
+            back_cache[key] = states
+        return states
+
+    # For each state, the states whose values are needed if the value pushed
+    # on entering this state is needed.
+    dependents = [set() for _ in range(n_states)]
+    needed = set()
+    for state in range(n_states):
+        reduced = set()
+        for terminal in range(len(tables.terminals)):
+            act = tables.action(state, terminal)
+            if act < ~0:
+                reduced.add(~act)
+
+        for production_index in reduced:
+            lhs = production_lhs[production_index]
+            is_emitted = tables.productions[production_index].name in emitted
+            length = production_lengths[production_index]
+            for steps in range(length):
+                for entered in _back(state, steps):
+                    if is_emitted:
+                        needed.add(entered)
+                        continue
+                    for start in _back(entered, length - steps):
+                        target = tables.goto(start, lhs)
+                        if target:
+                            dependents[target].add(entered)
+
+    queue = list(needed)
+    while queue:
+        for state in dependents[queue.pop()]:
+            if state not in needed:
+                needed.add(state)
+                queue.append(state)
+
+    needed = frozenset(needed)
+    results[emitted] = needed
+    return needed
+
+
+def iterparse(
+    parse_table,
+    tokens,
+    *,
+    emit=None,
+    action=_tuple_action,
+    token_symbol=_default_token_symbol,
+    token_value=_default_token_value,
+):
+    """
+    Parses a sequence of tokens, and returns a generator that yields a tuple
+    of a production and its value each time that a production for one of the
+    non-terminals in `emit` is reduced.  If `emit` is `None`, every reduction
+    is yielded.
+
+    This is intended for long inputs, such as a list of records, that can be
+    processed one piece at a time.  Once a value has been yielded, it is
+    replaced by `None` for the rest of the parse, so the values of enclosing
+    productions don't hold on to it.  The values of non-terminals that can
+    not be part of any emitted value are never computed: the action is not
+    called for them, and their value is `None`.  This is decided from the
+    parser state, so that, for example, a list of records at the top level is
+    not accumulated even if lists of records nested inside an emitted record
+    are.  Memory use is therefore proportional to the depth of the parser
+    stack and the size of the emitted values, rather than to the length of
+    the input.
+
+    Tables built with `transparent` unit productions skip some reductions.
+    A `ValueError` is raised if any of them are for an emitted non-terminal.
+
+    The default action returns a tuple of the values of the production's
+    symbols.  Other arguments are as for :func:`lalr.parse`.  Errors are
+    raised after the events for the tokens before the error have been
+    yielded.  The generator's return value is the value of the target, which
+    is `None` if the target was emitted or can not be part of an emitted
+    value.
+    """
+    productions = parse_table._tables.productions[1:]
+    if emit is None:
+        emitted = {production.name for production in productions}
+    else:
+        emitted = set(emit)
+
+    tables = parse_table._tables
+    for index in tables.skipped_productions:
+        production = tables.productions[index]
+        if production.name in emitted:
+            raise ValueError(
+                f"can not emit {production.name} as the parse table skips "
+                f"reductions by {production}"
+            )
+
+    kept = _enclosed(productions, emitted)
+    needed = _needed_states(parse_table, emitted)
+
+    nonterminal_ids = {
+        nonterminal: index
+        for index, nonterminal in enumerate(tables.nonterminals)
+    }
+
+    state_stack = [0]
+    result_stack = []
+    events = []
+
+    def _action(production, *values):
+        name = production.name
+        if name not in kept:
+            return None
+
+        if name in emitted:
+            events.append((production, action(production, *values)))
+            return None
+
+        # Values of non-terminals that can appear inside an emitted value
+        # might still not be in one here, for example if the records in a
+        # nested list have the same type as the records at the top level.
+        # Actions are called before the reduction is applied to the stack, so
+        # the state that the reduction will go to can be checked first.
+        start = state_stack[-len(values) - 1]
+        if tables.goto(start, nonterminal_ids[name]) not in needed:
+            return None
+
+        return action(production, *values)
+
+    tokens = iter(tokens)
+
+    # The loop is in a nested generator so that the checks above are made
+    # when `iterparse` is called, rather than on the first call to `next`.
+    def _events():
+        while True:
+            batch = list(itertools.islice(tokens, _BATCH_SIZE))
+            final = len(batch) < _BATCH_SIZE
+            try:
+                result = _advance(
+                    parse_table,
+                    state_stack,
+                    result_stack,
+                    batch,
+                    action=_action,
+                    token_symbol=token_symbol,
+                    token_value=token_value,
+                    final=final,
+                )
+            except ParseError:
+                yield from events
+                raise
+
+            yield from events
+            events.clear()
+
+            if final:
+                return result
+
+    return _events()
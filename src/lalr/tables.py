@@ -0,0 +1,316 @@
+import pickle
+import struct
+import sys
+from array import array
+
+from lalr.constants import EOF, START
+from lalr.exceptions import TableFormatError
+from lalr.grammar import Production
+
+# Every serialized table starts with these bytes.
+_MAGIC = b"LALRTBL\0"
+
+# Bumped whenever the layout of the serialized tables changes.  Tables written
+# with a different version are rejected rather than misread.
+FORMAT_VERSION = 3
+
+# Magic, format version, number of states, terminals, non-terminals,
+# productions, expected symbols and reducing terminals, and the length of the
+# pickled symbol table.
+_HEADER = struct.Struct("<8sIIIIIIII")
+
+# All integer arrays are stored as little endian 32 bit values, aligned to
+# eight bytes from the start of the buffer.
+_ALIGNMENT = 8
+
+
+def _padding(length):
+    return -length % _ALIGNMENT
+
+
+def _int_array(values=()):
+    table = array("i", values)
+    assert table.itemsize == 4
+    return table
+
+
+class CompiledTables(object):
+    """
+    The integer coded representation of a parse table.
+
+    States, terminals, non-terminals and productions are all identified by
+    dense integer indexes.  The end of file marker is always terminal zero,
+    and production zero is always the synthetic production that reduces the
+    target to the start symbol.
+
+    Actions are encoded as a single integer per state and terminal.  Zero
+    means error, a positive value `n` means shift and go to state `n`, and a
+    negative value `n` means reduce by production `~n`.  Reducing production
+    zero means accept.  The start state can never be the target of a shift
+    so there is no ambiguity.
+
+    Gotos are indexed by state and non-terminal and contain the index of the
+    state to go to, or zero if there is no transition.
+
+    For error reporting, each state also has a list of the symbols that
+    appear immediately after the cursor in its kernel items.  These are
+    stored as one flat array, with the symbols for state `n` found between
+    offsets `n` and `n + 1`.  Terminals are identified by their index, and
+    non-terminals by their index plus the number of terminals.
+
+    Each state also has a list of the terminals, other than the end of file
+    marker, that it reduces on.  These are stored in the same way as the
+    expected symbols.  When an error is reported, the reductions for each of
+    these terminals are followed to find the symbols that could have been
+    expected once they were done.
+
+    Tables built for generalized parsing may have more than one action for a
+    state and terminal.  These cells are left as zero in the action table,
+    and the conflicting actions are listed in the `conflicts` dictionary,
+    keyed by the index of the cell.  Conflicts are not serialized.
+
+    `skipped_productions` is the set of indexes of the unit productions that
+    were removed from the tables by `ParseTable(transparent=...)`.  The
+    parser never reduces by them, so users of the tables that report every
+    reduction can check for them.
+
+    All of the integer tables are sequences of C integers, either
+    :class:`array.array` objects or :class:`memoryview` objects pointing into
+    a serialized buffer.
+    """
+
+    __slots__ = (
+        "terminals",
+        "terminal_ids",
+        "nonterminals",
+        "productions",
+        "production_lhs",
+        "production_lengths",
+        "action_table",
+        "goto_table",
+        "expected_offsets",
+        "expected_symbols",
+        "reducing_offsets",
+        "reducing_terminals",
+        "conflicts",
+        "skipped_productions",
+    )
+
+    def __init__(
+        self,
+        *,
+        terminals,
+        nonterminals,
+        productions,
+        production_lhs,
+        production_lengths,
+        action_table,
+        goto_table,
+        expected_offsets,
+        expected_symbols,
+        reducing_offsets,
+        reducing_terminals,
+        conflicts=None,
+        skipped_productions=frozenset(),
+    ):
+        assert terminals[0] is EOF
+        assert productions[0].name is START
+
+        self.terminals = terminals
+        self.terminal_ids = {
+            terminal: index for index, terminal in enumerate(terminals)
+        }
+        self.nonterminals = nonterminals
+        self.productions = productions
+        self.production_lhs = production_lhs
+        self.production_lengths = production_lengths
+        self.action_table = action_table
+        self.goto_table = goto_table
+        self.expected_offsets = expected_offsets
+        self.expected_symbols = expected_symbols
+        self.reducing_offsets = reducing_offsets
+        self.reducing_terminals = reducing_terminals
+        self.conflicts = conflicts if conflicts is not None else {}
+        self.skipped_productions = frozenset(skipped_productions)
+
+    @property
+    def n_states(self):
+        return len(self.action_table) // len(self.terminals)
+
+    def action(self, state, terminal):
+        """
+        Returns the encoded action for a state and terminal index.
+        """
+        return self.action_table[state * len(self.terminals) + terminal]
+
+    def goto(self, state, nonterminal):
+        """
+        Returns the state to go to from a state after reducing to a
+        non-terminal, or zero if there is no such state.
+        """
+        return self.goto_table[state * len(self.nonterminals) + nonterminal]
+
+    def symbol(self, symbol_id):
+        """
+        Returns the terminal or non-terminal identified by a symbol id from
+        the expected symbol table.
+        """
+        if symbol_id < len(self.terminals):
+            return self.terminals[symbol_id]
+        return self.nonterminals[symbol_id - len(self.terminals)]
+
+    def expected(self, state):
+        """
+        Returns the ids of the symbols expected by the kernel of a state.
+        """
+        return self.expected_symbols[
+            self.expected_offsets[state] : self.expected_offsets[state + 1]
+        ]
+
+    def reducing(self, state):
+        """
+        Returns the indexes of the terminals, other than the end of file
+        marker, that a state reduces on.
+        """
+        return self.reducing_terminals[
+            self.reducing_offsets[state] : self.reducing_offsets[state + 1]
+        ]
+
+    def dump(self, fp):
+        """
+        Writes the tables to a binary file object.
+
+        Terminals, non-terminals and productions are written using
+        :mod:`pickle`, so must be picklable, and tables should only be loaded
+        from trusted sources.
+        """
+        symbol_table = pickle.dumps(
+            (
+                self.terminals[1:],
+                self.nonterminals,
+                self.productions[0].symbols[0],
+                tuple(
+                    (production.name, production.symbols)
+                    for production in self.productions[1:]
+                ),
+                tuple(sorted(self.skipped_productions)),
+            ),
+            protocol=pickle.HIGHEST_PROTOCOL,
+        )
+
+        fp.write(
+            _HEADER.pack(
+                _MAGIC,
+                FORMAT_VERSION,
+                self.n_states,
+                len(self.terminals),
+                len(self.nonterminals),
+                len(self.productions),
+                len(self.expected_symbols),
+                len(self.reducing_terminals),
+                len(symbol_table),
+            )
+        )
+        fp.write(symbol_table)
+        fp.write(bytes(_padding(_HEADER.size + len(symbol_table))))
+
+        for values in (
+            self.production_lhs,
+            self.production_lengths,
+            self.action_table,
+            self.goto_table,
+            self.expected_offsets,
+            self.expected_symbols,
+            self.reducing_offsets,
+            self.reducing_terminals,
+        ):
+            values = _int_array(values)
+            if sys.byteorder == "big":
+                values.byteswap()
+            fp.write(values.tobytes())
+            fp.write(bytes(_padding(len(values) * 4)))
+
+    @classmethod
+    def from_buffer(cls, buffer):
+        """
+        Reads tables written by :meth:`dump` from a bytes-like object.
+
+        On little endian machines the integer tables are not copied, but are
+        read directly from the buffer.  This means that a memory mapped file
+        can be used without reading it into memory first.  The buffer must
+        not be modified or closed while the tables are in use.
+        """
+        view = memoryview(buffer).cast("B")
+
+        if len(view) < _HEADER.size:
+            raise TableFormatError("truncated parse table header")
+        (
+            magic,
+            version,
+            n_states,
+            n_terminals,
+            n_nonterminals,
+            n_productions,
+            n_expected,
+            n_reducing,
+            symbol_table_length,
+        ) = _HEADER.unpack_from(view)
+
+        if magic != _MAGIC:
+            raise TableFormatError("not a serialized parse table")
+        if version != FORMAT_VERSION:
+            raise TableFormatError(
+                f"unsupported parse table format version {version}"
+            )
+
+        offset = _HEADER.size
+        end = offset + symbol_table_length
+        if end > len(view):
+            raise TableFormatError("truncated parse table")
+        try:
+            (
+                terminals,
+                nonterminals,
+                target,
+                productions,
+                skipped_productions,
+            ) = pickle.loads(view[offset:end])
+        except Exception as error:
+            raise TableFormatError(
+                "corrupt parse table symbol table"
+            ) from error
+        offset = end
+        offset += _padding(offset)
+
+        def _read(length):
+            nonlocal offset
+            end = offset + length * 4
+            if end > len(view):
+                raise TableFormatError("truncated parse table")
+            values = view[offset:end]
+            offset = end + _padding(end)
+
+            if sys.byteorder == "big":
+                values, data = _int_array(), values
+                values.frombytes(data)
+                values.byteswap()
+                return values
+            return values.cast("i")
+
+        return cls(
+            terminals=(EOF, *terminals),
+            nonterminals=nonterminals,
+            productions=(
+                Production(START, (target,)),
+                *(Production(name, symbols) for name, symbols in productions),
+            ),
+            production_lhs=_read(n_productions),
+            production_lengths=_read(n_productions),
+            action_table=_read(n_states * n_terminals),
+            goto_table=_read(n_states * n_nonterminals),
+            expected_offsets=_read(n_states + 1),
+            expected_symbols=_read(n_expected),
+            reducing_offsets=_read(n_states + 1),
+            reducing_terminals=_read(n_reducing),
+            skipped_productions=skipped_productions,
+        )
@@ -0,0 +1,292 @@
+from array import array
+
+from lalr.constants import EOF
+from lalr.parsing import _default_token_symbol, _raise_parse_error
+from lalr.tables import CompiledTables
+
+
+class Node(object):
+    """
+    A lightweight view of a single node in a :class:`ParseTree`.  Nodes
+    compare equal if they refer to the same node of the same tree.
+    """
+
+    __slots__ = ("tree", "ref")
+
+    def __init__(self, tree, ref):
+        self.tree = tree
+        self.ref = ref
+
+    @property
+    def is_leaf(self):
+        return self.ref < 0
+
+    @property
+    def production(self):
+        """
+        The production reduced to make this node, or `None` for leaves.
+        """
+        if self.ref < 0:
+            return None
+        tables = self.tree._tables
+        return tables.productions[self.tree.production_ids[self.ref]]
+
+    @property
+    def symbol(self):
+        if self.ref < 0:
+            tables = self.tree._tables
+            return tables.terminals[self.tree.token_terminals[~self.ref]]
+        return self.production.name
+
+    @property
+    def token(self):
+        """
+        The token for a leaf, or `None` for other nodes.
+        """
+        if self.ref < 0:
+            return self.tree.tokens[~self.ref]
+        return None
+
+    @property
+    def children(self):
+        """
+        A tuple of the nodes for each symbol of the production.  Empty for
+        leaves.
+        """
+        if self.ref < 0:
+            return ()
+        tree = self.tree
+        start = tree.child_starts[self.ref]
+        return tuple(
+            Node(tree, ref)
+            for ref in tree.children[
+                start : start + tree.child_counts[self.ref]
+            ]
+        )
+
+    @property
+    def start(self):
+        """
+        The position of the first token covered by the node.
+        """
+        tree = self.tree
+        ref = self.ref
+        while ref >= 0:
+            ref = tree.children[tree.child_starts[ref]]
+        return ~ref
+
+    @property
+    def end(self):
+        """
+        The position just after the last token covered by the node.
+        """
+        tree = self.tree
+        ref = self.ref
+        while ref >= 0:
+            ref = tree.children[
+                tree.child_starts[ref] + tree.child_counts[ref] - 1
+            ]
+        return ~ref + 1
+
+    def __eq__(self, other):
+        if not isinstance(other, Node):
+            return NotImplemented
+        return self.tree is other.tree and self.ref == other.ref
+
+    def __hash__(self):
+        return hash(self.ref)
+
+    def __repr__(self):
+        return f"<Node {self.symbol!r} {self.start}:{self.end}>"
+
+
+class ParseTree(object):
+    """
+    A parse tree stored as a handful of flat arrays, as built by
+    :func:`parse_tree`.
+
+    Nodes are referred to by integers.  Leaves are numbered by the position
+    of their token in the input, and are referred to by the bitwise
+    complement of that position, so their references are negative.
+    Reductions are numbered from zero in the order that they were made,
+    which is a post-order traversal of the tree.  For each reduction `n`:
+
+      - `production_ids[n]` is the index of the production reduced, in the
+        parse table's list of productions.
+      - `child_counts[n]` is the number of children, and the references for
+        the children are found in `children`, in order, starting at
+        `child_starts[n]`.
+
+    For each token `n`, `tokens[n]` is the token and `token_terminals[n]`
+    is the index of its terminal.
+
+    :class:`Node` objects are only created on request, so a large tree
+    costs a few bytes per node.
+    """
+
+    __slots__ = (
+        "_tables",
+        "tokens",
+        "token_terminals",
+        "production_ids",
+        "child_starts",
+        "child_counts",
+        "children",
+        "root_ref",
+    )
+
+    def __init__(
+        self,
+        tables,
+        *,
+        tokens,
+        token_terminals,
+        production_ids,
+        child_starts,
+        child_counts,
+        children,
+        root_ref,
+    ):
+        self._tables = tables
+        self.tokens = tokens
+        self.token_terminals = token_terminals
+        self.production_ids = production_ids
+        self.child_starts = child_starts
+        self.child_counts = child_counts
+        self.children = children
+        self.root_ref = root_ref
+
+    @property
+    def root(self):
+        """
+        The :class:`Node` for the target symbol.
+        """
+        return Node(self, self.root_ref)
+
+    def node(self, ref):
+        """
+        Returns the :class:`Node` for a reference.
+        """
+        return Node(self, ref)
+
+    def __len__(self):
+        """
+        Returns the number of nodes in the tree, including leaves.
+        """
+        return len(self.tokens) + len(self.production_ids)
+
+
+def parse_tree(parse_table, tokens, *, token_symbol=_default_token_symbol):
+    """
+    Parses a sequence of tokens, and returns a :class:`ParseTree` recording
+    every reduction.
+
+    Equivalent to calling :func:`lalr.parse` with an action that builds a
+    tree, but without calling any python code for each reduction or creating
+    an object for each node.  Arguments are as for :func:`lalr.parse`.
+    Compressed tables are not supported.
+    """
+    tables = parse_table._tables
+    if not isinstance(tables, CompiledTables):
+        raise ValueError("can not build trees with compressed tables")
+
+    terminal_ids = tables.terminal_ids
+    production_lhs = tables.production_lhs
+    production_lengths = tables.production_lengths
+    action_table = tables.action_table
+    goto_table = tables.goto_table
+    n_terminals = len(tables.terminals)
+    n_nonterminals = len(tables.nonterminals)
+
+    token_list = []
+    token_terminals = array("i")
+    production_ids = array("i")
+    child_starts = array("i")
+    child_counts = array("i")
+    children = array("i")
+
+    append_token = token_list.append
+    append_token_terminal = token_terminals.append
+    append_production_id = production_ids.append
+    append_child_start = child_starts.append
+    append_child_count = child_counts.append
+    append_child = children.append
+    extend_children = children.extend
+
+    tokens = iter(tokens)
+
+    state = 0
+    state_stack = [state]
+    ref_stack = []
+
+    while True:
+        try:
+            lookahead_token = next(tokens)
+        except StopIteration:
+            lookahead_token, lookahead_symbol = None, EOF
+        else:
+            lookahead_symbol = token_symbol(lookahead_token)
+
+        lookahead = terminal_ids.get(lookahead_symbol)
+        if lookahead is None:
+            _raise_parse_error(
+                parse_table, state_stack, lookahead_token, lookahead_symbol
+            )
+
+        while True:
+            act = action_table[state * n_terminals + lookahead]
+
+            # Shift
+            if act > 0:
+                state = act
+                state_stack.append(state)
+                ref_stack.append(~len(token_list))
+                append_token(lookahead_token)
+                append_token_terminal(lookahead)
+                break
+
+            # Error
+            if act == 0:
+                _raise_parse_error(
+                    parse_table, state_stack, lookahead_token, lookahead_symbol
+                )
+
+            production_index = ~act
+
+            # Accept
+            if production_index == 0:
+                assert len(ref_stack) == 1
+                return ParseTree(
+                    tables,
+                    tokens=token_list,
+                    token_terminals=token_terminals,
+                    production_ids=production_ids,
+                    child_starts=child_starts,
+                    child_counts=child_counts,
+                    children=children,
+                    root_ref=ref_stack[0],
+                )
+
+            # Reduce
+            #
+            # The references to the children are copied from the stack into
+            # the tree, and replaced on the stack with a reference to the new
+            # node.  Single symbol productions are common enough to be worth
+            # handling without slicing.
+            length = production_lengths[production_index]
+            append_child_start(len(children))
+            append_child_count(length)
+            if length == 1:
+                append_child(ref_stack[-1])
+            else:
+                extend_children(ref_stack[-length:])
+                del ref_stack[1 - length :]
+                del state_stack[1 - length :]
+            ref_stack[-1] = len(production_ids)
+            append_production_id(production_index)
+
+            state = goto_table[
+                state_stack[-2] * n_nonterminals
+                + production_lhs[production_index]
+            ]
+            state_stack[-1] = state
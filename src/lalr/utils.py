@@ -1,4 +1,4 @@
-from typing import Generic, Hashable, Iterable, List, Set, TypeVar
+from typing import Generic, Hashable, Iterable, Iterator, List, Set, TypeVar
 
 T = TypeVar("T", bound=Hashable)
 
@@ -95,3 +95,14 @@ class Queue(Iterable[T], Generic[T]):
         Returns True if there are any items that are waiting to be processed.
         """
         return self._cursor != len(self._by_order)
+
+
+def iter_bits(mask: int) -> Iterator[int]:
+    """
+    Yields the index of each bit that is set in a non-negative integer, in
+    ascending order.
+    """
+    while mask:
+        lowest = mask & -mask
+        yield lowest.bit_length() - 1
+        mask ^= lowest
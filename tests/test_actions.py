@@ -0,0 +1,133 @@
+import pickle
+
+import pytest
+
+from lalr import Actions, Grammar, Parser, ParseTable, Production, parse
+from lalr.actions import append, child, drop, make_list
+
+
+def _list_grammar():
+    return Grammar(
+        [
+            Production("document", ("items", "semicolon")),
+            Production("items", ("item",)),
+            Production("items", ("items", "comma", "item")),
+            Production("item", ("lparen", "item", "rparen")),
+            Production("item", ("word",)),
+            Production("item", ("number",)),
+        ]
+    )
+
+
+def _list_actions():
+    actions = Actions()
+    actions.on_production(
+        Production("document", ("items", "semicolon")), child(0)
+    )
+    actions.on_production(Production("items", ("item",)), make_list())
+    actions.on_production(
+        Production("items", ("items", "comma", "item")), append()
+    )
+    actions.on_production(
+        Production("item", ("lparen", "item", "rparen")), child(1)
+    )
+    actions.on_production(Production("item", ("word",)), str.upper)
+    actions.on_production(Production("item", ("number",)), int)
+    return actions
+
+
+def _tokens():
+    return [
+        ("word", "a"),
+        ("comma", ","),
+        ("lparen", "("),
+        ("lparen", "("),
+        ("number", "12"),
+        ("rparen", ")"),
+        ("rparen", ")"),
+        ("comma", ","),
+        ("word", "b"),
+        ("semicolon", ";"),
+    ]
+
+
+@pytest.mark.parametrize("compressed", [False, True])
+def test_builtin_handlers(compressed):
+    parse_table = ParseTable(
+        _list_grammar(), "document", compressed=compressed
+    )
+
+    result = parse(
+        parse_table,
+        _tokens(),
+        action=_list_actions(),
+        token_symbol=lambda token: token[0],
+        token_value=lambda token: token[1],
+    )
+    assert result == ["A", 12, "B"]
+
+
+def test_push_parser():
+    parse_table = ParseTable(_list_grammar(), "document")
+
+    parser = Parser(
+        parse_table,
+        action=_list_actions(),
+        token_symbol=lambda token: token[0],
+        token_value=lambda token: token[1],
+    )
+    for token in _tokens():
+        parser.feed(token)
+    assert parser.finish() == ["A", 12, "B"]
+
+
+def test_nonterminal_handlers_and_default():
+    grammar = Grammar(
+        [
+            Production("sum", ("sum", "+", "term")),
+            Production("sum", ("term",)),
+            Production("term", ("x",)),
+            Production("term", ("(", "sum", ")")),
+        ]
+    )
+    parse_table = ParseTable(grammar, "sum")
+
+    def default(production, *values):
+        return (production.name, *values)
+
+    actions = Actions(default=default)
+    actions.on_nonterminal("term", drop())
+    actions.on_production(Production("term", ("x",)), lambda x: x)
+
+    result = parse(parse_table, ["x", "+", "(", "x", ")"], action=actions)
+    assert result == ("sum", ("sum", "x"), "+", None)
+
+    # Also usable as a plain action.
+    assert actions(Production("term", ("(", "sum", ")")), "(", 1, ")") is None
+    assert actions(Production("sum", ("term",)), "x") == ("sum", "x")
+
+
+def test_missing_handler():
+    parse_table = ParseTable(_list_grammar(), "document")
+    actions = _list_actions()
+    actions.on_production(Production("item", ("word",)), child(3))
+
+    with pytest.raises(ValueError):
+        parse(parse_table, [("word", "a")], action=actions)
+
+    with pytest.raises(ValueError):
+        parse(parse_table, [], action=Actions())
+
+
+def test_pickle():
+    actions = pickle.loads(pickle.dumps(_list_actions()))
+    parse_table = ParseTable(_list_grammar(), "document")
+
+    result = parse(
+        parse_table,
+        _tokens(),
+        action=actions,
+        token_symbol=lambda token: token[0],
+        token_value=lambda token: token[1],
+    )
+    assert result == ["A", 12, "B"]
@@ -2,10 +2,12 @@ import pytest
 
 from lalr.analysis import (
     ParseTable,
-    _build_item_set,
     _build_transition_table,
+    _digraph,
     _Item,
+    _ItemTable,
 )
+from lalr.constants import EOF, START
 from lalr.exceptions import ReduceReduceConflictError
 from lalr.grammar import Grammar, Production
 
@@ -13,14 +15,14 @@ from lalr.grammar import Grammar, Production
 def test_zero():
     grammar = Grammar([])
 
-    starting_item = _Item(
-        Production("S", ("a",)),
-        0,
-        {"$"},
-    )
+    sets, transitions = _build_transition_table(grammar, "a")
 
-    item_set = _build_item_set(grammar, {starting_item})
-    assert item_set.items == {starting_item}
+    assert sets[0].items == {
+        _Item(Production(START, ("a",)), 0, {EOF}),
+    }
+    assert sets[transitions[0]["a"]].items == {
+        _Item(Production(START, ("a",)), 1, {EOF}),
+    }
 
 
 def test_one():
@@ -30,17 +32,11 @@ def test_one():
         ]
     )
 
-    starting_item = _Item(
-        Production("S", ("A",)),
-        0,
-        {"$"},
-    )
-
-    item_set = _build_item_set(grammar, {starting_item})
+    sets, transitions = _build_transition_table(grammar, "A")
 
-    assert item_set.items == {
-        _Item(Production("S", ("A",)), 0, {"$"}),
-        _Item(Production("A", ("a",)), 0, {"$"}),
+    assert sets[0].items == {
+        _Item(Production(START, ("A",)), 0, {EOF}),
+        _Item(Production("A", ("a",)), 0, {EOF}),
     }
 
 
@@ -68,6 +64,45 @@ def test_example():
         print(transitions[num])
 
 
+def test_closure_cache():
+    grammar = Grammar(
+        [
+            Production("N", ("V", "=", "E")),
+            Production("N", ("E",)),
+            Production("E", ("V",)),
+            Production("V", ("x",)),
+            Production("V", ("*", "E")),
+        ]
+    )
+    table = _ItemTable(grammar, Production(START, ("N",)))
+
+    closure = table.closure("E")
+    assert {
+        (table.production(item), table.item_cursors[item]) for item in closure
+    } == {
+        (Production("E", ("V",)), 0),
+        (Production("V", ("x",)), 0),
+        (Production("V", ("*", "E")), 0),
+    }
+    assert table.closure("E") is closure
+
+    derived = table.derived_items(("E", "V"))
+    assert sorted(derived) == sorted(closure)
+
+    successors = table.derived_successors(("E", "V"))
+    assert set(successors) == {"V", "x", "*"}
+
+
+def test_digraph():
+    # 0 -> 1 -> 2 -> 1, 3 -> 0
+    relation = [[1], [2], [1], [0]]
+    initial = [0b0001, 0b0010, 0b0100, 0b1000]
+
+    result = _digraph(relation, initial)
+
+    assert result == [0b0111, 0b0110, 0b0110, 0b1111]
+
+
 def test_lalr_reduce_reduce():
     grammar = Grammar(
         [
@@ -82,3 +117,33 @@ def test_lalr_reduce_reduce():
 
     with pytest.raises(ReduceReduceConflictError):
         ParseTable(grammar, "S")
+
+
+def test_parse_table_accessors():
+    grammar = Grammar(
+        [
+            Production("N", ("V", "=", "E")),
+            Production("N", ("E",)),
+            Production("E", ("V",)),
+            Production("V", ("x",)),
+            Production("V", ("*", "E")),
+        ]
+    )
+    parse_table = ParseTable(grammar, "N")
+
+    start = parse_table.start_state()
+    assert set(parse_table.shifts(start)) == {"x", "*"}
+    assert set(parse_table.gotos(start)) == {"N", "V", "E"}
+    assert not parse_table.reductions(start)
+    assert not parse_table.accepts(start)
+
+    state = parse_table.shifts(start)["x"]
+    assert state in set(parse_table.states())
+    assert not parse_table.shifts(state)
+    assert set(parse_table.reductions(state).values()) == {
+        Production("V", ("x",))
+    }
+
+    state = parse_table.gotos(start)["N"]
+    assert parse_table.accepts(state)
+    assert parse_table.reductions(state) == {EOF: Production(START, ("N",))}
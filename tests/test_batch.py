@@ -0,0 +1,90 @@
+import pickle
+
+import pytest
+
+from lalr import Grammar, ParseTable, Production, parse, parse_many
+from lalr.exceptions import ParseError
+
+grammar = Grammar(
+    [
+        Production("N", ("V", "=", "E")),
+        Production("N", ("E",)),
+        Production("E", ("V",)),
+        Production("V", ("x",)),
+        Production("V", ("*", "E")),
+    ]
+)
+
+parse_table = ParseTable(grammar, "N")
+
+token_streams = ["x", "x=x", "x=", "*x=**x", "==", "***x"] * 10
+
+
+def tree(production, *args):
+    return (production.name, *args)
+
+
+def _expected(tokens):
+    try:
+        return parse(parse_table, tokens, action=tree)
+    except ParseError as exc:
+        return str(exc)
+
+
+def _normalize(result):
+    if isinstance(result, ParseError):
+        return str(result)
+    return result
+
+
+def test_parse_error_pickle():
+    exc = ParseError("message", lookahead_token="x", expected_symbols={"y"})
+    restored = pickle.loads(pickle.dumps(exc))
+
+    assert str(restored) == "message"
+    assert restored.lookahead_token == "x"
+    assert restored.expected_symbols == {"y"}
+
+
+@pytest.mark.parametrize("workers", [None, 2])
+def test_parse_many_ordered(workers):
+    results = parse_many(
+        parse_table,
+        token_streams,
+        action=tree,
+        workers=workers,
+        chunksize=4,
+    )
+
+    assert [_normalize(result) for result in results] == [
+        _expected(tokens) for tokens in token_streams
+    ]
+
+
+@pytest.mark.parametrize("workers", [None, 2])
+def test_parse_many_unordered(workers):
+    results = parse_many(
+        parse_table,
+        iter(token_streams),
+        action=tree,
+        workers=workers,
+        chunksize=4,
+        ordered=False,
+    )
+
+    assert sorted(
+        (index, _normalize(result)) for index, result in results
+    ) == [
+        (index, _expected(tokens))
+        for index, tokens in enumerate(token_streams)
+    ]
+
+
+def _fail(production, *args):
+    raise KeyError(production.name)
+
+
+@pytest.mark.parametrize("workers", [None, 2])
+def test_parse_many_action_error(workers):
+    with pytest.raises(KeyError):
+        list(parse_many(parse_table, ["x"], action=_fail, workers=workers))
@@ -0,0 +1,86 @@
+import os
+
+from lalr import Grammar, Left, ParseTable, Production, parse
+from lalr.cache import TableCache, fingerprint
+from lalr.tables import _HEADER
+
+
+def nop(production, *args):
+    return production.name
+
+
+productions = [
+    Production("E", ("E", "+", "E")),
+    Production("E", ("E", "*", "E")),
+    Production("E", ("x",)),
+]
+
+
+def test_cache_miss_then_hit(tmp_path):
+    grammar = Grammar(productions, precedence_sets=[Left("+"), Left("*")])
+
+    built = ParseTable.cached(grammar, "E", cache_dir=tmp_path)
+    assert len(os.listdir(tmp_path)) == 1
+    # Freshly built tables still have their item sets.
+    built.item_set(built.start_state())
+
+    loaded = ParseTable.cached(grammar, "E", cache_dir=tmp_path)
+    assert len(os.listdir(tmp_path)) == 1
+    assert parse(loaded, ["x", "+", "x", "*", "x"], action=nop) == "E"
+
+
+def test_fingerprint_covers_precedence_and_target():
+    left = Grammar(productions, precedence_sets=[Left("+"), Left("*")])
+    swapped = Grammar(productions, precedence_sets=[Left("*"), Left("+")])
+
+    assert fingerprint(left, "E") == fingerprint(
+        Grammar(productions, precedence_sets=[Left("+"), Left("*")]), "E"
+    )
+    assert fingerprint(left, "E") != fingerprint(swapped, "E")
+    assert fingerprint(left, "E") != fingerprint(left, "x")
+    assert fingerprint(left, "E") != fingerprint(
+        Grammar(productions[:2] + [Production("E", ("y",))]), "E"
+    )
+
+
+def test_corrupt_entry_is_rebuilt(tmp_path):
+    grammar = Grammar(productions, precedence_sets=[Left("+"), Left("*")])
+    ParseTable.cached(grammar, "E", cache_dir=tmp_path)
+
+    (path,) = tmp_path.iterdir()
+    path.write_bytes(b"garbage")
+
+    parse_table = ParseTable.cached(grammar, "E", cache_dir=tmp_path)
+    assert parse(parse_table, ["x"], action=nop) == "E"
+    assert path.read_bytes() != b"garbage"
+
+
+def test_truncated_entry_is_rebuilt(tmp_path):
+    grammar = Grammar(productions, precedence_sets=[Left("+"), Left("*")])
+    ParseTable.cached(grammar, "E", cache_dir=tmp_path)
+
+    # Cut the entry off part way through the symbol table.
+    (path,) = tmp_path.iterdir()
+    data = path.read_bytes()
+    path.write_bytes(data[: _HEADER.size + 4])
+
+    parse_table = ParseTable.cached(grammar, "E", cache_dir=tmp_path)
+    assert parse(parse_table, ["x", "*", "x"], action=nop) == "E"
+    assert path.read_bytes() == data
+
+
+def test_eviction(tmp_path):
+    cache = TableCache(tmp_path, max_size=25)
+
+    cache.write("a", lambda fp: fp.write(b"a" * 10))
+    os.utime(tmp_path / "a.lalr", (1, 1))
+    cache.write("b", lambda fp: fp.write(b"b" * 10))
+    os.utime(tmp_path / "b.lalr", (2, 2))
+
+    # Reading marks an entry as recently used.
+    assert cache.read("a") == b"a" * 10
+
+    cache.write("c", lambda fp: fp.write(b"c" * 10))
+
+    assert sorted(os.listdir(tmp_path)) == ["a.lalr", "c.lalr"]
+    assert cache.read("b") is None
@@ -0,0 +1,95 @@
+import ast
+import types
+
+import pytest
+
+from lalr import Grammar, ParseTable, Production, parse
+from lalr.codegen import generate
+from lalr.exceptions import ParseError
+
+grammar = Grammar(
+    [
+        Production("N", ("V", "=", "E")),
+        Production("N", ("E",)),
+        Production("E", ("V",)),
+        Production("V", ("x",)),
+        Production("V", ("*", "E")),
+    ]
+)
+
+
+def tree(production, *args):
+    return (production.name, *args)
+
+
+def _load(source, name="generated"):
+    # A namespace rather than a module, as linters can't tell what a module
+    # built at run time contains.
+    namespace = {"__name__": name}
+    exec(compile(source, f"{name}.py", "exec"), namespace)
+    return types.SimpleNamespace(**namespace)
+
+
+def test_generate():
+    parse_table = ParseTable(grammar, "N")
+    module = _load(generate(parse_table, "generated"))
+
+    for tokens in ["x", "x=x", "*x=**x", "***x"]:
+        assert module.parse(tokens, action=tree) == parse(
+            parse_table, tokens, action=tree
+        )
+
+
+def test_generate_productions():
+    module = _load(generate(ParseTable(grammar, "N"), "generated"))
+
+    productions = []
+
+    def _action(production, *args):
+        productions.append(production)
+
+    module.parse("x", action=_action)
+    assert productions == [
+        Production("V", ("x",)),
+        Production("E", ("V",)),
+        Production("N", ("E",)),
+    ]
+    assert hash(productions[0]) == hash(Production("V", ("x",)))
+
+
+def test_generate_error():
+    parse_table = ParseTable(grammar, "N")
+    module = _load(generate(parse_table, "generated"))
+
+    for tokens in ["", "x=", "x=x=", "*y"]:
+        with pytest.raises(ParseError) as expected:
+            parse(parse_table, tokens, action=tree)
+        with pytest.raises(module.ParseError) as actual:
+            module.parse(tokens, action=tree)
+
+        assert str(actual.value) == str(expected.value)
+        assert actual.value.lookahead_token == expected.value.lookahead_token
+
+
+def test_generate_no_imports():
+    source = generate(ParseTable(grammar, "N"), "generated")
+
+    imported = set()
+    for node in ast.walk(ast.parse(source)):
+        if isinstance(node, ast.Import):
+            imported.update(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom):
+            imported.add(node.module)
+
+    assert imported == {"array", "sys", "zlib"}
+
+
+def test_generate_unrepresentable_symbol():
+    class Symbol(object):
+        pass
+
+    symbol = Symbol()
+    parse_table = ParseTable(Grammar([Production("N", (symbol,))]), "N")
+
+    with pytest.raises(ValueError):
+        generate(parse_table, "generated")
@@ -0,0 +1,114 @@
+import random
+
+import pytest
+
+from lalr import Grammar, Left, ParseTable, Production, parse
+from lalr.compression import CompressedTables
+from lalr.exceptions import ParseError
+
+
+def tree(production, *args):
+    return (production.name, *args)
+
+
+grammar = Grammar(
+    [
+        Production("list", ("lparen", "rparen")),
+        Production("list", ("lparen", "list_body", "rparen")),
+        Production("list_body", ("expression",)),
+        Production("list_body", ("list_body", "expression")),
+        Production("expression", ("list",)),
+        Production("expression", ("string",)),
+        Production("expression", ("number",)),
+        Production("expression", ("symbol",)),
+    ]
+)
+
+
+def _random_list(rng, depth=0):
+    tokens = ["lparen"]
+    for _ in range(rng.randrange(4)):
+        if depth < 4 and rng.random() < 0.3:
+            tokens += _random_list(rng, depth + 1)
+        else:
+            tokens.append(rng.choice(["string", "number", "symbol"]))
+    tokens.append("rparen")
+    return tokens
+
+
+def test_compressed_parse():
+    parse_table = ParseTable(grammar, "expression")
+    compressed = ParseTable(grammar, "expression", compressed=True)
+    assert isinstance(compressed._tables, CompressedTables)
+
+    rng = random.Random(0)
+    for _ in range(50):
+        tokens = _random_list(rng)
+        assert parse(compressed, tokens, action=tree) == parse(
+            parse_table, tokens, action=tree
+        )
+
+
+def test_compressed_actions():
+    parse_table = ParseTable(grammar, "expression")
+    compressed = ParseTable(grammar, "expression", compressed=True)
+    tables = parse_table._tables
+    compressed_tables = compressed._tables
+
+    for state in range(tables.n_states):
+        default = compressed_tables.action_default[state]
+        for terminal in range(len(tables.terminals)):
+            action = tables.action(state, terminal)
+            compressed_action = compressed_tables.action(state, terminal)
+            if action == 0:
+                assert compressed_action in (0, default)
+            else:
+                assert compressed_action == action
+
+        for nonterminal in range(len(tables.nonterminals)):
+            assert compressed_tables.goto(state, nonterminal) == tables.goto(
+                state, nonterminal
+            )
+
+    assert compressed_tables.size() < len(tables.action_table) + len(
+        tables.goto_table
+    )
+
+
+def test_compressed_precedence():
+    grammar = Grammar(
+        [
+            Production("E", ("E", "+", "E")),
+            Production("E", ("E", "*", "E")),
+            Production("E", ("x",)),
+        ],
+        precedence_sets=[Left("+"), Left("*")],
+    )
+    parse_table = ParseTable(grammar, "E", compressed=True)
+
+    assert parse(parse_table, "x+x*x+x", action=tree) == (
+        "E",
+        ("E", ("E", "x"), "+", ("E", ("E", "x"), "*", ("E", "x"))),
+        "+",
+        ("E", "x"),
+    )
+
+
+def test_compressed_error():
+    parse_table = ParseTable(grammar, "expression", compressed=True)
+
+    with pytest.raises(ParseError) as exc_context:
+        parse(parse_table, ["lparen", "string"], action=tree)
+    assert exc_context.value.lookahead_token is None
+
+    with pytest.raises(ParseError):
+        parse(parse_table, ["lparen", "rparen", "rparen"], action=tree)
+
+
+def test_compressed_not_serializable():
+    parse_table = ParseTable(grammar, "expression", compressed=True)
+
+    with pytest.raises(ValueError):
+        parse_table.item_set(parse_table.start_state())
+    with pytest.raises(ValueError):
+        parse_table.dump(None)
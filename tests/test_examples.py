@@ -64,3 +64,48 @@ def test_extra_closing_paren():
     assert str(exc) == "expected EOF instead of rparen"
     assert exc.lookahead_token == "rparen"
     assert exc.expected_symbols == set()
+
+
+def test_transparent_unit_productions():
+    transparent_table = ParseTable(
+        grammar,
+        "expression",
+        transparent=[
+            Production("expression", ("list",)),
+            Production("expression", ("string",)),
+            Production("list_body", ("expression",)),
+        ],
+    )
+
+    reductions = []
+
+    def _record(production, *args):
+        reductions.append(production)
+        return production.name
+
+    tokens = ["lparen", "string", "lparen", "number", "rparen", "rparen"]
+    assert parse(transparent_table, tokens, action=_record) == "list"
+
+    assert reductions == [
+        Production("expression", ("number",)),
+        Production("list", ("lparen", "list_body", "rparen")),
+        Production("list_body", ("list_body", "expression")),
+        Production("list", ("lparen", "list_body", "rparen")),
+    ]
+
+    for tokens in (
+        ["lparen", "string"],
+        ["lparen", "rparen", "rparen"],
+        ["string", "string"],
+    ):
+        with pytest.raises(ParseError):
+            parse(transparent_table, tokens, action=nop)
+
+
+def test_transparent_not_unit_production():
+    with pytest.raises(ValueError):
+        ParseTable(
+            grammar,
+            "expression",
+            transparent=[Production("list", ("lparen", "rparen"))],
+        )
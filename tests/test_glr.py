@@ -0,0 +1,159 @@
+import io
+import pickle
+
+import pytest
+
+from lalr import Grammar, ParseTable, Production, parse, parse_forest
+from lalr.exceptions import ParseError, ShiftReduceConflictError
+
+ambiguous_grammar = Grammar(
+    [
+        Production("expr", ("expr", "plus", "expr")),
+        Production("expr", ("number",)),
+    ]
+)
+
+
+def _count(production, *counts):
+    result = 1
+    for count in counts:
+        result *= count
+    return result
+
+
+def _sum(node, counts):
+    return sum(counts)
+
+
+def _tokens(n_numbers):
+    return ["number"] + ["plus", "number"] * (n_numbers - 1)
+
+
+def _count_trees(parse_table, tokens):
+    forest = parse_forest(parse_table, tokens, token_value=lambda token: 1)
+    return forest.evaluate(_count, merge=_sum)
+
+
+def test_conflicts_raise_by_default():
+    with pytest.raises(ShiftReduceConflictError):
+        ParseTable(ambiguous_grammar, "expr")
+
+
+def test_ambiguous():
+    parse_table = ParseTable(ambiguous_grammar, "expr", generalized=True)
+
+    # The number of ways of bracketing a sum are the catalan numbers.
+    catalan = [1, 1, 2, 5, 14, 42, 132, 429, 1430, 4862]
+    for n_numbers, expected in enumerate(catalan, 1):
+        forest = parse_forest(parse_table, _tokens(n_numbers))
+        assert forest.symbol == "expr"
+        assert (forest.start, forest.end) == (0, 2 * n_numbers - 1)
+        assert forest.is_ambiguous == (expected > 1)
+        assert _count_trees(parse_table, _tokens(n_numbers)) == expected
+
+
+def test_ambiguous_forest_is_shared():
+    parse_table = ParseTable(ambiguous_grammar, "expr", generalized=True)
+
+    # Exponentially many trees, but polynomially many nodes.
+    forest = parse_forest(parse_table, _tokens(60))
+    nodes = set()
+    stack = [forest]
+    while stack:
+        node = stack.pop()
+        if node in nodes or node.is_leaf:
+            continue
+        nodes.add(node)
+        for _, children in node.alternatives:
+            stack.extend(children)
+    assert len(nodes) == 60 * 61 // 2
+    assert _count_trees(parse_table, _tokens(60)) > 2**100
+
+
+def test_unmerged_ambiguity():
+    parse_table = ParseTable(ambiguous_grammar, "expr", generalized=True)
+    forest = parse_forest(parse_table, _tokens(3), token_value=lambda token: 1)
+
+    with pytest.raises(ValueError):
+        forest.evaluate(_count)
+
+
+def test_lalr_reduce_reduce():
+    grammar = Grammar(
+        [
+            Production("S", ("a", "E", "c")),
+            Production("S", ("a", "F", "d")),
+            Production("S", ("b", "F", "c")),
+            Production("S", ("b", "E", "d")),
+            Production("E", ("e",)),
+            Production("F", ("e",)),
+        ]
+    )
+    parse_table = ParseTable(grammar, "S", generalized=True)
+
+    def tree(production, *args):
+        return (production.name, *args)
+
+    for tokens, expected in [
+        (["a", "e", "c"], ("S", "a", ("E", "e"), "c")),
+        (["a", "e", "d"], ("S", "a", ("F", "e"), "d")),
+        (["b", "e", "c"], ("S", "b", ("F", "e"), "c")),
+        (["b", "e", "d"], ("S", "b", ("E", "e"), "d")),
+    ]:
+        assert parse_forest(parse_table, tokens).evaluate(tree) == expected
+
+    with pytest.raises(ParseError):
+        parse_forest(parse_table, ["a", "e", "e"])
+
+
+def test_deterministic():
+    grammar = Grammar(
+        [
+            Production("list", ("lparen", "rparen")),
+            Production("list", ("lparen", "list_body", "rparen")),
+            Production("list_body", ("expression",)),
+            Production("list_body", ("list_body", "expression")),
+            Production("expression", ("list",)),
+            Production("expression", ("string",)),
+        ]
+    )
+    parse_table = ParseTable(grammar, "expression")
+
+    def tree(production, *args):
+        return (production.name, *args)
+
+    tokens = ["lparen", "string", "lparen", "rparen", "string", "rparen"]
+    assert parse_forest(parse_table, tokens).evaluate(tree) == parse(
+        parse_table, tokens, action=tree
+    )
+
+    with pytest.raises(ParseError):
+        parse_forest(parse_table, ["lparen", "string"])
+
+    with pytest.raises(ParseError):
+        parse_forest(parse_table, ["lparen", "unknown"])
+
+
+def test_errors_after_conflict():
+    parse_table = ParseTable(ambiguous_grammar, "expr", generalized=True)
+
+    with pytest.raises(ParseError):
+        parse_forest(parse_table, ["number", "plus", "number", "plus"])
+
+    with pytest.raises(ParseError):
+        parse_forest(parse_table, ["number", "plus", "number", "plus", "plus"])
+
+
+def test_generalized_tables_are_not_serialized():
+    parse_table = ParseTable(ambiguous_grammar, "expr", generalized=True)
+
+    with pytest.raises(ValueError):
+        parse_table.dump(io.BytesIO())
+
+    with pytest.raises(ValueError):
+        ParseTable(
+            ambiguous_grammar, "expr", generalized=True, compressed=True
+        )
+
+    restored = pickle.loads(pickle.dumps(parse_table))
+    assert _count_trees(restored, _tokens(4)) == 5
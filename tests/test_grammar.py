@@ -1,5 +1,6 @@
 import pytest
 
+from lalr.constants import EOF
 from lalr.grammar import Grammar, Production
 
 
@@ -70,3 +71,70 @@ def test_first_set_example():
     assert grammar.first_set("N") == {"*", "x"}
     assert grammar.first_set("E") == {"*", "x"}
     assert grammar.first_set("V") == {"*", "x"}
+
+
+def test_terminal_masks():
+    grammar = Grammar(
+        [
+            Production("N", ("V", "=", "E")),
+            Production("N", ("E",)),
+            Production("E", ("V",)),
+            Production("V", ("x",)),
+            Production("V", ("*", "E")),
+        ]
+    )
+
+    assert grammar.indexed_terminals() == (EOF, "=", "x", "*")
+    assert grammar.terminal_index(EOF) == 0
+    assert grammar.terminal_index("*") == 3
+
+    assert grammar.first_set_mask("V") == grammar.terminal_mask({"*", "x"})
+    assert grammar.masked_terminals(0b1001) == {EOF, "*"}
+
+
+def test_indexes():
+    productions = [
+        Production("N", ("V", "=", "E")),
+        Production("N", ("E",)),
+        Production("E", ("V",)),
+        Production("V", ("x",)),
+        Production("V", ("*", "E")),
+    ]
+    grammar = Grammar(productions)
+
+    assert grammar.productions("V") == {
+        Production("V", ("x",)),
+        Production("V", ("*", "E")),
+    }
+    assert grammar.productions("x") == set()
+
+    assert grammar.indexed_productions() == tuple(productions)
+    assert grammar.production_index(Production("E", ("V",))) == 2
+
+    assert grammar.indexed_nonterminals() == ("N", "V", "E")
+    assert grammar.nonterminal_index("E") == 2
+
+    assert grammar.productions_containing("E") == {
+        Production("N", ("V", "=", "E")),
+        Production("N", ("E",)),
+        Production("V", ("*", "E")),
+    }
+
+
+def test_follow_set_example():
+    grammar = Grammar(
+        [
+            Production("N", ("V", "=", "E")),
+            Production("N", ("E",)),
+            Production("E", ("V",)),
+            Production("V", ("x",)),
+            Production("V", ("*", "E")),
+        ]
+    )
+
+    assert grammar.follow_set("N") == set()
+    assert grammar.follow_set("E") == {"="}
+    assert grammar.follow_set("V") == {"="}
+    assert grammar.follow_set("x") == {"="}
+    assert grammar.follow_set("=") == {"x", "*"}
+    assert grammar.follow_set("*") == {"x", "*"}
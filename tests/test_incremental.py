@@ -0,0 +1,122 @@
+import random
+
+import pytest
+
+from lalr import Grammar, IncrementalParser, ParseTable, Production, parse
+from lalr.exceptions import ParseError
+
+grammar = Grammar(
+    [
+        Production("list", ("lparen", "rparen")),
+        Production("list", ("lparen", "list_body", "rparen")),
+        Production("list_body", ("expression",)),
+        Production("list_body", ("list_body", "expression")),
+        Production("expression", ("list",)),
+        Production("expression", ("string",)),
+        Production("expression", ("number",)),
+        Production("expression", ("symbol",)),
+    ]
+)
+
+parse_table = ParseTable(grammar, "expression")
+
+
+def tree(production, *args):
+    return (production.name, *args)
+
+
+def _random_list(rng, depth=0):
+    tokens = ["lparen"]
+    for _ in range(rng.randrange(5)):
+        if depth < 3 and rng.random() < 0.3:
+            tokens += _random_list(rng, depth + 1)
+        else:
+            tokens.append(rng.choice(["string", "number", "symbol"]))
+    tokens.append("rparen")
+    return tokens
+
+
+def test_initial_parse():
+    tokens = ["lparen", "string", "lparen", "number", "rparen", "rparen"]
+    parser = IncrementalParser(parse_table, tokens, action=tree)
+
+    assert parser.result == parse(parse_table, tokens, action=tree)
+    assert parser.tokens == tokens
+
+
+@pytest.mark.parametrize("tokens", [[], ["lparen", "string"]])
+def test_initial_parse_incomplete(tokens):
+    with pytest.raises(ParseError):
+        parse(parse_table, tokens, action=tree)
+
+    with pytest.raises(ParseError):
+        IncrementalParser(parse_table, tokens, action=tree)
+
+
+def test_random_edits():
+    rng = random.Random(0)
+
+    tokens = _random_list(rng)
+    parser = IncrementalParser(parse_table, tokens, action=tree)
+
+    for _ in range(500):
+        start = rng.randrange(len(tokens) + 1)
+        end = rng.randrange(start, min(len(tokens), start + 4) + 1)
+        replacement = rng.choice(
+            [
+                [],
+                ["string"],
+                ["number", "symbol"],
+                ["lparen", "rparen"],
+                _random_list(rng, 2),
+                ["rparen"],
+                ["lparen"],
+            ]
+        )
+        new_tokens = tokens[:start] + replacement + tokens[end:]
+
+        try:
+            expected = parse(parse_table, new_tokens, action=tree)
+        except ParseError:
+            with pytest.raises(ParseError):
+                parser.update(start, end, replacement)
+            # A failed update should leave the parser unchanged.
+            assert parser.tokens == tokens
+            assert parser.result == parse(parse_table, tokens, action=tree)
+            continue
+
+        assert parser.update(start, end, replacement) == expected
+        assert parser.tokens == new_tokens
+        tokens = new_tokens
+
+
+def test_edit_reuses_reductions():
+    # A list containing many nested lists.  Editing one of them should only
+    # rerun the actions for that list, and for the reductions enclosing it.
+    tokens = ["lparen"]
+    for _ in range(100):
+        tokens += ["lparen", "string", "number", "symbol", "rparen"]
+    tokens += ["rparen"]
+
+    calls = 0
+
+    def _counting_tree(production, *args):
+        nonlocal calls
+        calls += 1
+        return tree(production, *args)
+
+    parser = IncrementalParser(parse_table, tokens, action=_counting_tree)
+    full_calls = calls
+
+    calls = 0
+    parser.update(len(tokens) - 4, len(tokens) - 3, ["lparen", "rparen"])
+
+    assert calls < full_calls / 20
+    assert parser.result == parse(parse_table, parser.tokens, action=tree)
+
+
+def test_edit_out_of_range():
+    parser = IncrementalParser(parse_table, ["string"], action=tree)
+
+    with pytest.raises(IndexError):
+        parser.update(0, 2, [])
@@ -1,9 +1,18 @@
+import asyncio
 import enum
 
 import pytest
 
 import lalr.exceptions
-from lalr import Grammar, Left, ParseTable, Production, parse
+from lalr import (
+    Grammar,
+    Left,
+    Parser,
+    ParseTable,
+    Production,
+    parse,
+    parse_async,
+)
 
 
 def nop(production, *args):
@@ -45,6 +54,27 @@ def test_bad_example():
     assert exc.expected_symbols == {"="}
 
 
+def test_bad_example_deep_stack():
+    grammar = Grammar(
+        [
+            Production("N", ("V", "=", "E")),
+            Production("N", ("E",)),
+            Production("E", ("V",)),
+            Production("V", ("x",)),
+            Production("V", ("*", "E")),
+        ]
+    )
+    parse_table = ParseTable(grammar, "N")
+
+    # Following the reductions for `=` unwinds the whole stack.
+    with pytest.raises(lalr.exceptions.ParseError) as exc_context:
+        parse(parse_table, ["*"] * 1000 + ["x", "x"], action=nop)
+
+    exc = exc_context.value
+    assert exc.lookahead_token == "x"
+    assert exc.expected_symbols == {"="}
+
+
 def test_enum_terminals():
     class Terminal(enum.Enum):
         VAR = enum.auto()
@@ -130,3 +160,177 @@ def test_precedence():
         action=_action,
     )
     assert actual == expected
+
+
+def test_push_parser():
+    grammar = Grammar(
+        [
+            Production("N", ("V", "=", "E")),
+            Production("N", ("E",)),
+            Production("E", ("V",)),
+            Production("V", ("x",)),
+            Production("V", ("*", "E")),
+        ]
+    )
+    parse_table = ParseTable(grammar, "N")
+
+    reductions = []
+
+    def _action(production, *args):
+        reductions.append(production.name)
+        return (production.name, *args)
+
+    parser = Parser(parse_table, action=_action)
+    parser.feed("x")
+    assert reductions == []
+
+    parser.feed("=")
+    assert reductions == ["V"]
+
+    parser.feed_many(["*", "x"])
+    assert parser.finish() == (
+        "N",
+        ("V", "x"),
+        "=",
+        ("E", ("V", "*", ("E", ("V", "x")))),
+    )
+
+    with pytest.raises(ValueError):
+        parser.feed("x")
+
+
+def test_push_parser_error():
+    grammar = Grammar(
+        [
+            Production("N", ("V", "=", "E")),
+            Production("N", ("E",)),
+            Production("E", ("V",)),
+            Production("V", ("x",)),
+            Production("V", ("*", "E")),
+        ]
+    )
+    parse_table = ParseTable(grammar, "N")
+
+    parser = Parser(parse_table, action=nop)
+    parser.feed_many(["x", "="])
+
+    with pytest.raises(lalr.exceptions.ParseError) as exc_context:
+        parser.feed("=")
+    assert exc_context.value.lookahead_token == "="
+
+    with pytest.raises(ValueError):
+        parser.finish()
+
+
+def test_push_parser_independent():
+    grammar = Grammar(
+        [
+            Production("L", ("L", "x")),
+            Production("L", ("x",)),
+        ]
+    )
+    parse_table = ParseTable(grammar, "L")
+
+    parsers = [Parser(parse_table, action=nop) for _ in range(3)]
+    for count, parser in enumerate(parsers):
+        parser.feed_many("x" * (count + 1))
+
+    assert [parser.finish() for parser in parsers] == ["L", "L", "L"]
+
+
+def _run(coroutine):
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coroutine)
+    finally:
+        loop.close()
+
+
+async def _async_iter(values):
+    for value in values:
+        yield value
+
+
+def test_parse_async():
+    grammar = Grammar(
+        [
+            Production("N", ("V", "=", "E")),
+            Production("N", ("E",)),
+            Production("E", ("V",)),
+            Production("V", ("x",)),
+            Production("V", ("*", "E")),
+        ]
+    )
+    parse_table = ParseTable(grammar, "N")
+
+    def _action(production, *args):
+        return (production.name, *args)
+
+    async def _async_action(production, *args):
+        await asyncio.sleep(0)
+        return (production.name, *args)
+
+    expected = parse(parse_table, "x=*x", action=_action)
+
+    for action in (_action, _async_action):
+        for reduction_budget in (None, 1, 2):
+            assert (
+                _run(
+                    parse_async(
+                        parse_table,
+                        _async_iter("x=*x"),
+                        action=action,
+                        reduction_budget=reduction_budget,
+                    )
+                )
+                == expected
+            )
+
+
+def test_parse_async_yields():
+    grammar = Grammar(
+        [
+            Production("L", ("L", "x")),
+            Production("L", ("x",)),
+        ]
+    )
+    parse_table = ParseTable(grammar, "L")
+
+    ticks = 0
+
+    async def _ticker():
+        nonlocal ticks
+        while True:
+            ticks += 1
+            await asyncio.sleep(0)
+
+    async def _tokens():
+        # Tokens are produced without ever yielding to the event loop.
+        for _ in range(100):
+            yield "x"
+
+    async def _main():
+        ticker = asyncio.ensure_future(_ticker())
+        await asyncio.sleep(0)
+        try:
+            return await parse_async(
+                parse_table, _tokens(), action=nop, reduction_budget=10
+            )
+        finally:
+            ticker.cancel()
+
+    assert _run(_main()) == "L"
+    assert ticks >= 10
+
+
+def test_parse_async_error():
+    grammar = Grammar(
+        [
+            Production("L", ("L", "x")),
+            Production("L", ("x",)),
+        ]
+    )
+    parse_table = ParseTable(grammar, "L")
+
+    with pytest.raises(lalr.exceptions.ParseError):
+        _run(parse_async(parse_table, _async_iter("xxy"), action=nop))
@@ -0,0 +1,76 @@
+import pytest
+
+from lalr import Grammar, ParseTable, PersistentParser, Production, parse
+from lalr.exceptions import ParseError
+
+grammar = Grammar(
+    [
+        Production("list", ("lparen", "rparen")),
+        Production("list", ("lparen", "list_body", "rparen")),
+        Production("list_body", ("expression",)),
+        Production("list_body", ("list_body", "expression")),
+        Production("expression", ("list",)),
+        Production("expression", ("string",)),
+        Production("expression", ("number",)),
+        Production("expression", ("symbol",)),
+    ]
+)
+
+parse_table = ParseTable(grammar, "expression")
+
+
+def tree(production, *args):
+    return (production.name, *args)
+
+
+def test_feed():
+    tokens = ["lparen", "string", "lparen", "number", "rparen", "rparen"]
+
+    parser = PersistentParser(parse_table, action=tree)
+    for token in tokens:
+        parser.feed(token)
+
+    assert parser.finish() == parse(parse_table, tokens, action=tree)
+
+
+def test_fork():
+    parser = PersistentParser(parse_table, action=tree)
+    parser.feed_many(["lparen", "string"])
+
+    forked = parser.fork()
+    forked.feed_many(["number", "rparen"])
+    parser.feed_many(["symbol", "rparen"])
+
+    assert forked.finish() == parse(
+        parse_table, ["lparen", "string", "number", "rparen"], action=tree
+    )
+    assert parser.finish() == parse(
+        parse_table, ["lparen", "string", "symbol", "rparen"], action=tree
+    )
+
+
+def test_finish_does_not_consume():
+    parser = PersistentParser(parse_table, action=tree)
+    parser.feed("string")
+    assert parser.finish() == ("expression", "string")
+    assert parser.finish() == ("expression", "string")
+
+    parser = PersistentParser(parse_table, action=tree)
+    parser.feed("lparen")
+    with pytest.raises(ParseError):
+        parser.finish()
+    parser.feed("rparen")
+    assert parser.finish() == ("expression", ("list", "lparen", "rparen"))
+
+
+def test_failed_feed_leaves_parser_unchanged():
+    parser = PersistentParser(parse_table, action=tree)
+    parser.feed("lparen")
+
+    with pytest.raises(ParseError):
+        parser.feed_many(["string", "rparen", "rparen"])
+
+    parser.feed_many(["number", "rparen"])
+    assert parser.finish() == parse(
+        parse_table, ["lparen", "number", "rparen"], action=tree
+    )
@@ -0,0 +1,97 @@
+import random
+
+import pytest
+
+from lalr import Grammar, ParseTable, PrefixCache, Production, parse
+from lalr.exceptions import ParseError
+
+grammar = Grammar(
+    [
+        Production("list", ("lparen", "rparen")),
+        Production("list", ("lparen", "list_body", "rparen")),
+        Production("list_body", ("expression",)),
+        Production("list_body", ("list_body", "expression")),
+        Production("expression", ("list",)),
+        Production("expression", ("string",)),
+        Production("expression", ("number",)),
+        Production("expression", ("symbol",)),
+    ]
+)
+
+parse_table = ParseTable(grammar, "expression")
+
+
+def tree(production, *args):
+    return (production.name, *args)
+
+
+def test_shared_prefix():
+    calls = []
+
+    def action(production, *args):
+        calls.append(production)
+        return tree(production, *args)
+
+    cache = PrefixCache(parse_table, action=action)
+
+    header = ["lparen", "lparen", "string", "number", "rparen"]
+    first = header + ["symbol", "rparen"]
+    second = header + ["number", "string", "rparen"]
+
+    assert cache.parse(first) == parse(parse_table, first, action=tree)
+    assert len(cache) == len(first)
+
+    del calls[:]
+    parse(parse_table, second, action=action)
+    n_calls = len(calls)
+
+    del calls[:]
+    assert cache.parse(second) == parse(parse_table, second, action=tree)
+    assert len(cache) == len(first) + 3
+
+    # Only the reductions after the shared header are repeated.
+    assert len(calls) < n_calls
+
+
+def test_values_are_part_of_key():
+    cache = PrefixCache(
+        parse_table,
+        action=tree,
+        token_symbol=lambda token: token[0],
+        token_value=lambda token: token[1],
+    )
+
+    assert cache.parse([("string", "a")]) == ("expression", "a")
+    assert cache.parse([("string", "b")]) == ("expression", "b")
+
+
+def test_eviction():
+    rng = random.Random(0)
+    cache = PrefixCache(parse_table, action=tree, max_size=20)
+
+    header = ["lparen", "string", "number"]
+    for _ in range(50):
+        body = [rng.choice(["string", "number", "symbol"]) for _ in range(8)]
+        tokens = header + body + ["rparen"]
+        assert cache.parse(tokens) == parse(parse_table, tokens, action=tree)
+        assert len(cache) <= 20
+
+        # The shared header is always used most recently, so it is kept.
+        node = cache._root
+        for token in header:
+            node = node.children[(token, token)]
+
+
+def test_error():
+    cache = PrefixCache(parse_table, action=tree)
+
+    with pytest.raises(ParseError):
+        cache.parse(["lparen", "string", "rparen", "rparen"])
+
+    # The configurations before the error are still valid.
+    tokens = ["lparen", "string", "rparen"]
+    assert cache.parse(tokens) == parse(parse_table, tokens, action=tree)
+    assert len(cache) == 3
+
+    with pytest.raises(ParseError):
+        cache.parse(["lparen", "string"])
@@ -0,0 +1,69 @@
+import random
+
+import pytest
+
+from lalr import Grammar, ParseTable, Production, parse, recognize
+from lalr.exceptions import ParseError
+from lalr.recognizer import Recognition
+
+grammar = Grammar(
+    [
+        Production("list", ("lparen", "rparen")),
+        Production("list", ("lparen", "list_body", "rparen")),
+        Production("list_body", ("expression",)),
+        Production("list_body", ("list_body", "expression")),
+        Production("expression", ("list",)),
+        Production("expression", ("string",)),
+        Production("expression", ("number",)),
+        Production("expression", ("symbol",)),
+    ]
+)
+
+
+@pytest.mark.parametrize("compressed", [False, True])
+def test_recognize(compressed):
+    parse_table = ParseTable(grammar, "expression", compressed=compressed)
+
+    assert recognize(parse_table, ["string"])
+    assert recognize(parse_table, ["lparen", "string", "rparen"])
+
+    # A failure at position zero is still false.
+    result = recognize(parse_table, [])
+    assert not result
+    assert result.position == 0
+    assert result == Recognition(False, 0)
+
+    assert recognize(parse_table, ["lparen", "string"]).position == 2
+    assert recognize(parse_table, ["lparen", "rparen", "rparen"]).position == 2
+    assert recognize(parse_table, ["lparen", "bogus", "rparen"]).position == 1
+    assert recognize(parse_table, ["string"]) == Recognition(True, None)
+
+
+@pytest.mark.parametrize("compressed", [False, True])
+def test_matches_parse(compressed):
+    parse_table = ParseTable(grammar, "expression", compressed=compressed)
+    symbols = ["lparen", "rparen", "string", "number", "bogus"]
+
+    rng = random.Random(0)
+    for _ in range(2000):
+        tokens = [rng.choice(symbols) for _ in range(rng.randint(0, 10))]
+
+        # Record the position of each token passed to the parser, so that
+        # the position of the error can be recovered.
+        positions = []
+
+        def _tokens():
+            for position, token in enumerate(tokens):
+                positions.append(position)
+                yield token
+            positions.append(len(tokens))
+
+        result = recognize(parse_table, tokens)
+        try:
+            parse(parse_table, _tokens(), action=lambda *args: None)
+        except ParseError:
+            assert not result.accepted
+            assert result.position == positions[-1]
+        else:
+            assert result.accepted
+            assert result.position is None
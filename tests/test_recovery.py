@@ -0,0 +1,136 @@
+import pytest
+
+from lalr import Grammar, ParseTable, Production, parse, parse_with_recovery
+from lalr.constants import ERROR
+from lalr.exceptions import ParseError
+
+
+def tree(production, *args):
+    return (production.name, *args)
+
+
+def _statements(result):
+    # Flattens the left recursive list of statements.
+    statements = []
+    while result[0] == "statements":
+        statements.append(result[-1])
+        result = result[1]
+    statements.reverse()
+    return statements
+
+
+grammar = Grammar(
+    [
+        Production("statements", ("statement",)),
+        Production("statements", ("statements", "statement")),
+        Production("statement", ("id", "equals", "id", "semicolon")),
+        Production("statement", (ERROR, "semicolon")),
+    ]
+)
+
+parse_table = ParseTable(grammar, "statements")
+
+
+def test_no_errors():
+    tokens = ["id", "equals", "id", "semicolon"] * 3
+
+    result, errors = parse_with_recovery(parse_table, tokens, action=tree)
+
+    assert result == parse(parse_table, tokens, action=tree)
+    assert errors == []
+
+
+def test_error_productions():
+    tokens = [
+        *("id", "equals", "id", "semicolon"),
+        *("id", "id", "semicolon"),
+        *("id", "equals", "id", "semicolon"),
+        *("id", "equals", "semicolon"),
+        *("id", "equals", "id", "semicolon"),
+    ]
+
+    result, errors = parse_with_recovery(parse_table, tokens, action=tree)
+
+    assert len(errors) == 2
+    assert all(isinstance(error, ParseError) for error in errors)
+    assert [statement[1] for statement in _statements(result)] == [
+        "id",
+        errors[0],
+        "id",
+        errors[1],
+        "id",
+    ]
+    assert errors[0].expected_symbols == {"equals"}
+    assert errors[1].expected_symbols == {"id"}
+
+
+def test_errors_are_not_reported_until_tokens_shifted():
+    tokens = [
+        *("id", "id", "id", "id", "semicolon"),
+        *("id", "equals", "id", "semicolon"),
+    ]
+
+    result, errors = parse_with_recovery(parse_table, tokens, action=tree)
+
+    assert len(errors) == 1
+    assert len(_statements(result)) == 2
+
+
+def test_unrecoverable():
+    tokens = ["id", "equals", "id", "semicolon", "id", "equals"]
+
+    result, errors = parse_with_recovery(parse_table, tokens, action=tree)
+
+    assert result is None
+    assert len(errors) == 2
+    assert errors[0].lookahead_token is None
+    assert errors[0].expected_symbols == {"id"}
+
+    # The end of the input also can't follow the error token, and that is the
+    # error that the parser could not recover from.
+    assert errors[1].lookahead_token is None
+    assert errors[1].expected_symbols == {"semicolon"}
+
+
+def test_panic_mode():
+    grammar = Grammar(
+        [
+            Production("statements", ("statement",)),
+            Production("statements", ("statements", "statement")),
+            Production("statement", ("id", "equals", "id", "semicolon")),
+        ]
+    )
+    parse_table = ParseTable(grammar, "statements")
+
+    tokens = [
+        *("id", "equals", "id", "semicolon"),
+        *("id", "id", "semicolon"),
+        *("id", "equals", "id", "semicolon"),
+    ]
+
+    with pytest.raises(ParseError):
+        parse(parse_table, tokens, action=tree)
+
+    result, errors = parse_with_recovery(parse_table, tokens, action=tree)
+    assert result is None
+    assert len(errors) == 1
+
+    result, errors = parse_with_recovery(
+        parse_table, tokens, action=tree, sync_symbols={"id"}
+    )
+    assert len(errors) == 1
+    assert result is not None
+
+
+def test_unrecoverable_error_while_suppressed():
+    # The input ends before the statement after the first error is complete,
+    # while further errors are still being suppressed.
+    tokens = ["id", "equals", "id", "semicolon", "id", "id"]
+
+    result, errors = parse_with_recovery(parse_table, tokens, action=tree)
+
+    assert result is None
+    assert len(errors) == 2
+    assert errors[0].lookahead_token == "id"
+    assert errors[1].lookahead_token is None
+    assert errors[1].expected_symbols == {"semicolon"}
@@ -0,0 +1,87 @@
+import multiprocessing
+import os
+import pickle
+import subprocess
+import sys
+import time
+
+import pytest
+
+from lalr import Grammar, ParseTable, Production, parse
+
+shared_memory = pytest.importorskip("multiprocessing.shared_memory")
+
+grammar = Grammar(
+    [
+        Production("N", ("V", "=", "E")),
+        Production("N", ("E",)),
+        Production("E", ("V",)),
+        Production("V", ("x",)),
+        Production("V", ("*", "E")),
+    ]
+)
+
+
+def nop(production, *args):
+    return production.name
+
+
+def _parse_shared(name, tokens):
+    return parse(ParseTable.attach(name), tokens, action=nop)
+
+
+def test_share_and_attach():
+    block = ParseTable(grammar, "N").share()
+    try:
+        parse_table = ParseTable.attach(block.name)
+        assert parse(parse_table, ["x", "=", "*", "x"], action=nop) == "N"
+        del parse_table
+    finally:
+        block.close()
+        block.unlink()
+
+
+def test_attach_from_worker():
+    block = ParseTable(grammar, "N").share()
+    try:
+        with multiprocessing.Pool(2) as pool:
+            results = pool.starmap(
+                _parse_shared, [(block.name, "x=*x"), (block.name, "**x")]
+            )
+        assert results == ["N", "N"]
+
+        # Attaching from an unrelated process, with its own resource
+        # tracker, should not cause the block to be unlinked when that process
+        # exits.
+        subprocess.run(
+            [
+                sys.executable,
+                "-c",
+                "import sys; from lalr import ParseTable; "
+                "ParseTable.attach(sys.argv[1])",
+                block.name,
+            ],
+            env={**os.environ, "PYTHONPATH": os.pathsep.join(sys.path)},
+            check=True,
+        )
+        # The resource tracker cleans up asynchronously after the process
+        # exits.
+        time.sleep(0.5)
+        shared_memory.SharedMemory(name=block.name).close()
+    finally:
+        block.close()
+        block.unlink()
+
+
+def test_pickle():
+    parse_table = ParseTable(grammar, "N")
+    restored = pickle.loads(pickle.dumps(parse_table))
+
+    assert parse(restored, "x=*x", action=nop) == "N"
+
+
+def test_pickle_compressed():
+    parse_table = ParseTable(grammar, "N", compressed=True)
+    restored = pickle.loads(pickle.dumps(parse_table))
+
+    assert parse(restored, "x=*x", action=nop) == "N"
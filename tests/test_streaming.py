@@ -0,0 +1,215 @@
+import pytest
+
+from lalr import Grammar, ParseTable, Production, iterparse
+from lalr.exceptions import ParseError
+
+grammar = Grammar(
+    [
+        Production("document", ("records",)),
+        Production("records", ("record",)),
+        Production("records", ("records", "record")),
+        Production("record", ("key", "equals", "value", "semicolon")),
+        Production("value", ("word",)),
+        Production("value", ("lbrace", "records", "rbrace")),
+    ]
+)
+
+parse_table = ParseTable(grammar, "document")
+
+
+def _tokens(n):
+    for index in range(n):
+        yield ("key", f"k{index}")
+        yield ("equals", "=")
+        yield ("word", f"v{index}")
+        yield ("semicolon", ";")
+
+
+def _token_symbol(token):
+    return token[0]
+
+
+def _token_value(token):
+    return token[1]
+
+
+def test_emit_records():
+    events = iterparse(
+        parse_table,
+        _tokens(1000),
+        emit={"record"},
+        token_symbol=_token_symbol,
+        token_value=_token_value,
+    )
+
+    count = 0
+    for production, value in events:
+        assert production.name == "record"
+        assert value == (f"k{count}", "=", (f"v{count}",), ";")
+        count += 1
+    assert count == 1000
+
+
+def test_nested_records_are_dropped():
+    tokens = [
+        ("key", "a"),
+        ("equals", "="),
+        ("lbrace", "{"),
+        ("key", "b"),
+        ("equals", "="),
+        ("word", "c"),
+        ("semicolon", ";"),
+        ("rbrace", "}"),
+        ("semicolon", ";"),
+    ]
+
+    events = list(
+        iterparse(
+            parse_table,
+            tokens,
+            emit={"record"},
+            token_symbol=_token_symbol,
+            token_value=_token_value,
+        )
+    )
+    assert [value for _, value in events] == [
+        ("b", "=", ("c",), ";"),
+        ("a", "=", ("{", (None,), "}"), ";"),
+    ]
+
+
+def test_emit_everything():
+    events = list(
+        iterparse(
+            parse_table,
+            _tokens(2),
+            token_symbol=_token_symbol,
+            token_value=_token_value,
+        )
+    )
+    assert [production.name for production, _ in events] == [
+        "value",
+        "record",
+        "records",
+        "value",
+        "record",
+        "records",
+        "document",
+    ]
+    assert events[1][1] == ("k0", "=", None, ";")
+
+
+def test_return_value():
+    events = iterparse(
+        parse_table,
+        _tokens(3),
+        emit={"value"},
+        action=lambda production, *values: production.name,
+        token_symbol=_token_symbol,
+        token_value=_token_value,
+    )
+    with pytest.raises(StopIteration) as exc_context:
+        while True:
+            next(events)
+    assert exc_context.value.value is None
+
+
+def test_error_after_events():
+    def _bad_tokens():
+        yield from _tokens(300)
+        yield ("key", "k300")
+        yield ("semicolon", ";")
+
+    events = iterparse(
+        parse_table,
+        _bad_tokens(),
+        emit={"record"},
+        token_symbol=_token_symbol,
+        token_value=_token_value,
+    )
+
+    seen = []
+    with pytest.raises(ParseError):
+        for event in events:
+            seen.append(event)
+    assert len(seen) == 300
+
+
+@pytest.mark.parametrize("compressed", [False, True])
+def test_top_level_list_not_accumulated(compressed):
+    table = ParseTable(grammar, "document", compressed=compressed)
+
+    tokens = [
+        ("key", "a"),
+        ("equals", "="),
+        ("word", "b"),
+        ("semicolon", ";"),
+        ("key", "c"),
+        ("equals", "="),
+        ("lbrace", "{"),
+        ("key", "d"),
+        ("equals", "="),
+        ("word", "e"),
+        ("semicolon", ";"),
+        ("rbrace", "}"),
+        ("semicolon", ";"),
+    ]
+
+    computed = []
+
+    def _action(production, *values):
+        computed.append(production.name)
+        return values
+
+    events = list(
+        iterparse(
+            table,
+            tokens,
+            emit={"record"},
+            action=_action,
+            token_symbol=_token_symbol,
+            token_value=_token_value,
+        )
+    )
+    assert len(events) == 3
+
+    # Only the list of records nested inside a value is built.
+    assert computed.count("records") == 1
+    assert "document" not in computed
+
+    # Only the integer tables are used to work this out.
+    assert table._item_sets is None
+
+
+def test_transparent_tables():
+    transparent_table = ParseTable(
+        grammar,
+        "document",
+        transparent=[
+            Production("document", ("records",)),
+            Production("value", ("word",)),
+        ],
+    )
+
+    # Reductions by `value -> word` are skipped.
+    for emit in ({"value"}, None):
+        with pytest.raises(ValueError):
+            iterparse(transparent_table, _tokens(1), emit=emit)
+
+    # The state that reduces `document -> records` also shifts, so those
+    # reductions are kept.
+    iterparse(transparent_table, _tokens(1), emit={"document"})
+
+    def _events(parse_table):
+        return list(
+            iterparse(
+                parse_table,
+                _tokens(3),
+                emit={"record"},
+                action=lambda production, *values: values[0],
+                token_symbol=_token_symbol,
+                token_value=_token_value,
+            )
+        )
+
+    assert _events(transparent_table) == _events(parse_table)
@@ -0,0 +1,117 @@
+import io
+import mmap
+
+import pytest
+
+from lalr import Grammar, ParseTable, Production, parse
+from lalr.exceptions import ParseError, TableFormatError
+from lalr.tables import _HEADER
+
+
+def nop(production, *args):
+    return production.name
+
+
+grammar = Grammar(
+    [
+        Production("N", ("V", "=", "E")),
+        Production("N", ("E",)),
+        Production("E", ("V",)),
+        Production("V", ("x",)),
+        Production("V", ("*", "E")),
+    ]
+)
+
+
+def _round_trip(parse_table):
+    buffer = io.BytesIO()
+    parse_table.dump(buffer)
+    buffer.seek(0)
+    return ParseTable.load(buffer)
+
+
+def test_round_trip():
+    parse_table = ParseTable(grammar, "N")
+    loaded = _round_trip(parse_table)
+
+    assert parse(loaded, ["x", "=", "*", "x"], action=nop) == "N"
+
+    for state, loaded_state in zip(parse_table.states(), loaded.states()):
+        assert set(parse_table.shifts(state)) == set(
+            loaded.shifts(loaded_state)
+        )
+        assert dict(parse_table.reductions(state)) == dict(
+            loaded.reductions(loaded_state)
+        )
+        assert set(parse_table.gotos(state)) == set(loaded.gotos(loaded_state))
+        assert parse_table.accepts(state) == loaded.accepts(loaded_state)
+
+
+def test_round_trip_skipped_productions():
+    parse_table = ParseTable(
+        grammar, "N", transparent=[Production("V", ("x",))]
+    )
+    assert parse_table._tables.skipped_productions
+
+    loaded = _round_trip(parse_table)
+    assert (
+        loaded._tables.skipped_productions
+        == parse_table._tables.skipped_productions
+    )
+
+
+def test_round_trip_error():
+    loaded = _round_trip(ParseTable(grammar, "N"))
+
+    with pytest.raises(ParseError) as exc_context:
+        parse(loaded, ["x", "*", "x"], action=nop)
+
+    exc = exc_context.value
+    assert exc.lookahead_token == "*"
+    assert exc.expected_symbols == {"="}
+
+
+def test_load_from_mmap(tmp_path):
+    path = tmp_path / "table.bin"
+    with open(path, "wb") as fp:
+        ParseTable(grammar, "N").dump(fp)
+
+    with open(path, "rb") as fp:
+        with mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            loaded = ParseTable.from_buffer(buffer)
+            assert parse(loaded, ["*", "x"], action=nop) == "N"
+            del loaded
+
+
+def test_load_bad_magic():
+    with pytest.raises(TableFormatError):
+        ParseTable.load(io.BytesIO(b"not a parse table at all, honest"))
+
+
+def test_load_bad_version():
+    buffer = io.BytesIO()
+    ParseTable(grammar, "N").dump(buffer)
+    data = bytearray(buffer.getvalue())
+    data[8] += 1
+
+    with pytest.raises(TableFormatError):
+        ParseTable.from_buffer(data)
+
+
+def test_load_truncated_symbol_table():
+    buffer = io.BytesIO()
+    ParseTable(grammar, "N").dump(buffer)
+    data = buffer.getvalue()
+
+    with pytest.raises(TableFormatError):
+        ParseTable.from_buffer(data[: _HEADER.size + 4])
+
+
+def test_load_corrupt_symbol_table():
+    buffer = io.BytesIO()
+    ParseTable(grammar, "N").dump(buffer)
+    data = bytearray(buffer.getvalue())
+    data[_HEADER.size : _HEADER.size + 4] = b"\xff" * 4
+
+    with pytest.raises(TableFormatError):
+        ParseTable.from_buffer(data)
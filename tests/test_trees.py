@@ -0,0 +1,79 @@
+import pytest
+
+from lalr import Grammar, ParseTable, Production, parse, parse_tree
+from lalr.exceptions import ParseError
+
+grammar = Grammar(
+    [
+        Production("list", ("lparen", "rparen")),
+        Production("list", ("lparen", "list_body", "rparen")),
+        Production("list_body", ("expression",)),
+        Production("list_body", ("list_body", "expression")),
+        Production("expression", ("list",)),
+        Production("expression", ("string",)),
+        Production("expression", ("number",)),
+    ]
+)
+
+parse_table = ParseTable(grammar, "expression")
+
+
+def tree(production, *args):
+    return (production.name, *args)
+
+
+def _as_tuples(node):
+    if node.is_leaf:
+        return node.token
+    return (node.production.name, *map(_as_tuples, node.children))
+
+
+def test_matches_parse():
+    tokens = [
+        *("lparen", "string", "lparen", "number", "rparen"),
+        *("lparen", "rparen", "rparen"),
+    ]
+
+    result = parse_tree(parse_table, tokens)
+
+    assert _as_tuples(result.root) == parse(parse_table, tokens, action=tree)
+    assert len(result) == len(tokens) + len(result.production_ids)
+    assert list(result.tokens) == tokens
+
+
+def test_nodes():
+    tokens = ["lparen", "string", "number", "rparen"]
+    result = parse_tree(parse_table, tokens)
+
+    root = result.root
+    assert root.symbol == "expression"
+    assert (root.start, root.end) == (0, 4)
+    assert root.token is None
+
+    (list_node,) = root.children
+    lparen, body, rparen = list_node.children
+    assert lparen.is_leaf
+    assert lparen.symbol == "lparen"
+    assert lparen.token == "lparen"
+    assert lparen.production is None
+    assert lparen.children == ()
+    assert (body.start, body.end) == (1, 3)
+    assert body.production == Production(
+        "list_body", ("list_body", "expression")
+    )
+
+    assert list_node == result.root.children[0]
+    assert list_node != body
+
+
+def test_errors():
+    with pytest.raises(ParseError):
+        parse_tree(parse_table, ["lparen", "string"])
+
+    with pytest.raises(ParseError):
+        parse_tree(parse_table, ["lparen", "unknown"])
+
+    with pytest.raises(ValueError):
+        parse_tree(
+            ParseTable(grammar, "expression", compressed=True), ["string"]
+        )